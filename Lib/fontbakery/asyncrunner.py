@@ -0,0 +1,190 @@
+"""
+Font Bakery asyncrunner runs the checks of a CheckRunner on an asyncio
+event loop, e.g. to embed Font Bakery in an asyncio based service.
+
+`AsyncCheckRunner.run` is an async generator of the events of the check
+runner protocol. The events of each check execution are emitted together,
+but in the order the executions finish, not in the execution order: START
+is always the first event, STARTSECTION is emitted before the first check
+of its section, ENDSECTION after the last one and END is always the last
+event. Reporters must be created with `is_async=True`.
+
+Checks can be coroutine functions or async generators, these run
+concurrently on the event loop. All other checks run one after another in
+a worker thread, checks marked as `io_bound` in threads of their own, so
+that the event loop is never blocked. Time limits, TIMING events and the
+result store apply only to the checks that are not coroutines.
+
+Separation of Concerns Disclaimer:
+While created specifically for checking fonts and font-families this
+module has no domain knowledge about fonts. It can be used for any kind
+of (document) checking. Please keep it so. It will be valuable for other
+domains as well.
+Domain specific knowledge should be encoded only in the Profile (Checks,
+Conditions) and MAYBE in *customized* reporters e.g. subclasses.
+"""
+import asyncio
+import inspect
+import types
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from fontbakery.checkrunner import (
+              CheckRunner
+            , FailedCheckError
+            , ERROR
+            , START
+            , STARTSECTION
+            , ENDSECTION
+            , END
+            )
+
+# The loop of the running coroutine, `get_running_loop` needs Python 3.7.
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+def _shutdown(executor):
+  """ Shuts `executor` down without blocking the event loop: the checks
+  that are still waiting for a thread are cancelled, a running one finishes
+  in the background.
+  """
+  try:
+    executor.shutdown(wait=False, cancel_futures=True)
+  except TypeError:
+    # Python < 3.9, the futures of the cancelled tasks are cancelled anyway
+    executor.shutdown(wait=False)
+
+def is_coroutine_check(check):
+  func = getattr(check, '_func', check)
+  return inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+
+class AsyncCheckRunner(CheckRunner):
+  def __init__(self, profile, values, max_concurrency=16, **kwds):
+    """
+    max_concurrency: the maximum number of coroutine checks awaited at the
+    same time.
+    """
+    super(AsyncCheckRunner, self).__init__(profile, values, **kwds)
+    self._max_concurrency = max_concurrency
+
+  async def _exec_check_async(self, check, args):
+    """ Like `_exec_check`, for coroutine checks, returns a list of the
+    check results.
+    """
+    results = []
+    try:
+      result = check(**args)  # Might raise.
+      if inspect.isasyncgen(result):
+        async for sub_result in result:  # Might raise.
+          results.append(self._check_result(sub_result))
+        return results
+      if inspect.isawaitable(result):
+        result = await result  # Might raise.
+      if isinstance(result, types.GeneratorType):
+        for sub_result in result:  # Might raise.
+          results.append(self._check_result(sub_result))
+        return results
+    except Exception as e:
+      result = (ERROR, FailedCheckError(e))
+    results.append(self._check_result(result))
+    return results
+
+  async def _run_coroutine_check(self, executor, semaphore, check, iterargs):
+    loop = _get_running_loop()
+    # conditions are evaluated in the worker thread, like for all checks
+    skipped, args = await loop.run_in_executor(executor, self._in_scope,
+                                         self._prepare_check, check, iterargs)
+    results = None
+    if skipped is None:
+      async with semaphore:
+        results = await self._exec_check_async(check, args)
+    events = list(self._check_events(check, skipped, results))
+    with self._cache_lock:
+      self._cache['conditions'].release((check.id, iterargs))
+    return events
+
+  async def _run_in_executor(self, executor, check, iterargs,
+                             background=False):
+    future = executor.submit(list, self._run_check(check, iterargs))
+    if background:
+      # supervised checks wait for it before forking
+      self.add_background_task(future)
+    return await asyncio.wrap_future(future)
+
+  async def _run_indexed(self, index, coroutine):
+    return index, await coroutine
+
+  async def run(self, order=None):
+    if order is not None:
+      order = self.check_order(order)
+    else:
+      order = self.order
+    self._expect_condition_keys(order)
+
+    # sections are not hashable, they are identified by their index
+    section_indexes = []
+    section_orders = []
+    for section, check, iterargs in order:
+      if not section_orders or section_orders[-1][0] != section:
+        section_orders.append((section, []))
+      section_orders[-1][1].append((check, iterargs))
+      section_indexes.append(len(section_orders) - 1)
+    remaining = Counter(section_indexes)
+    summaries = [Counter() for _ in section_orders]
+    checkrun_summary = Counter()
+
+    yield START, order, (None, None, None)
+    semaphore = asyncio.Semaphore(self._max_concurrency)
+    io_bound = self._get_io_bound(order)
+    # Not `with` blocks: their exit would wait for the running checks on
+    # the event loop, e.g. when the consumer of the events is cancelled.
+    executor = ThreadPoolExecutor(1)
+    io_executor = ThreadPoolExecutor(max(self._io_threads, 1))
+    try:
+      coroutine_checks, io_bound_checks, other_checks = [], [], []
+      for index, (_, check, iterargs) in enumerate(order):
+        if is_coroutine_check(check):
+          coroutine_checks.append((index, self._run_coroutine_check(
+                                  executor, semaphore, check, iterargs)))
+        elif index in io_bound:
+          io_bound_checks.append((index, self._run_in_executor(
+                                  io_executor, check, iterargs,
+                                  background=True)))
+        else:
+          other_checks.append((index, self._run_in_executor(
+                                  executor, check, iterargs)))
+      io_bound_checks.sort(key=lambda item: -self._get_cost(order[item[0]][1]))
+      # Tasks start in the order they are created. The coroutine checks
+      # come first, their conditions are evaluated in the same worker
+      # thread as the other checks and should not wait for all of them.
+      tasks = [asyncio.ensure_future(self._run_indexed(index, coroutine))
+                for index, coroutine in coroutine_checks
+                                      + io_bound_checks
+                                      + other_checks]
+      try:
+        for next_done in asyncio.as_completed(tasks):
+          index, events = await next_done
+          identity = order[index]
+          section_index = section_indexes[index]
+          section, section_order = section_orders[section_index]
+          if remaining[section_index] == len(section_order):
+            yield STARTSECTION, tuple(section_order), (section, None, None)
+          for status, message in events:
+            yield status, message, identity
+          # the last status is ENDCHECK, its message the summary status
+          summaries[section_index][message.name] += 1
+          remaining[section_index] -= 1
+          if not remaining[section_index]:
+            yield ENDSECTION, summaries[section_index], (section, None, None)
+            checkrun_summary.update(summaries[section_index])
+      finally:
+        for task in tasks:
+          task.cancel()
+    finally:
+      _shutdown(executor)
+      _shutdown(io_executor)
+    yield END, checkrun_summary, (None, None, None)
+
+async def distribute_async_generator(gen, targets_callbacks):
+  async for item in gen:
+    for target in targets_callbacks:
+      target(item)
@@ -101,14 +101,33 @@ class FontBakeryCondition(FontbakeryCallable):
        name = None, # very short text
        description = None, # short text
        documentation=None, # long text, markdown?
-       force=False
+       force=False,
+       persistent=False,
+       version=0,
+       tables=None
       ):
+    """
+    persistent: if True, the value of the condition may be stored in a
+    persistent condition cache, shared between runs. It must be picklable
+    and depend only on the contents of the files used via its iterargs.
+
+    version: must be changed whenever the implementation of a persistent
+    condition changes its result, so that stored values are not used
+    anymore. It can also be a callable returning the version, called once
+    per run, e.g. to include the version of the external tool the
+    condition runs. If it raises, the value is not stored.
+
+    tables: see FontBakeryCheck.
+    """
     super(FontBakeryCondition, self).__init__(func)
     # self.id = id
     self.name = func.__name__ if name is None else name
     self.description, self.documentation = get_doc_desc(
                                         func, description, documentation)
     self.force = force
+    self.persistent = persistent
+    self.version = version
+    self.tables = tuple(tables) if tables is not None else None
 
 class FontBakeryCheck(FontbakeryCallable):
   def __init__(
@@ -122,6 +141,7 @@ class FontBakeryCheck(FontbakeryCallable):
        conditions=None,
        # arguments_setup=None,
        rationale=None, # long text explaining why this check is needed. Using markdown, perhaps?
+       tables=None, # the parts of the checked documents read by the check
        misc_metadata=None, # miscelaneous free-form metadata fields
                            # some of them may be promoted to first-class metadata fields
                            # if they start being used by the check-runner.
@@ -189,8 +209,22 @@ class FontBakeryCheck(FontbakeryCallable):
       looking at an advancedMessage.
     TODO: The naming is a bit odd.
 
+    tables: the names of the parts of the checked documents (e.g. the font
+    tables) the check reads itself, not via its conditions. Parts that are
+    loaded on demand are recorded in the TIMING events, with whether the
+    check or condition that loaded them declared them.
+
     priority: inherited from our legacy checks. Need to see if we
     use this at all now.
+
+    misc_metadata: a dict of free-form metadata. Some keys are used by
+    the CheckRunner:
+      timeout: the maximum wall time of the check in seconds.
+      max_rss: the maximum resident memory of the check in bytes.
+      io_bound: True if the check mostly waits for a subprocess or the
+        network. It is executed in a thread, in parallel to other checks,
+        and must not use values that are not thread safe (e.g. the shared
+        ttFont objects).
     """
     super(FontBakeryCheck, self).__init__(checkfunc)
     self.id = id
@@ -198,6 +232,9 @@ class FontBakeryCheck(FontbakeryCallable):
     self.conditions = conditions or []
     self.description, self.documentation = get_doc_desc(
                                       checkfunc, description, documentation)
+    self.rationale = rationale
+    self.misc_metadata = misc_metadata or {}
+    self.tables = tuple(tables) if tables is not None else None
     if not self.description:
       raise TypeError('{} needs a description.'.format(type(self).__name__))
     # self._arguments_setup = arguments_setup
@@ -11,8 +11,20 @@ Domain specific knowledge should be encoded only in the Profile (Checks,
 Conditions) and MAYBE in *customized* reporters e.g. subclasses.
 
 """
+import os
+import sys
 import types
+import hashlib
+import inspect
+import mmap
+import pickle
+import select
+import signal
+import tempfile
+import threading
+import time
 from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import partial
 from itertools import chain
 import importlib
@@ -21,6 +33,7 @@ import json
 import logging
 from typing import Dict, Any, Iterable
 
+from fontbakery.message import Message
 from fontbakery.callable import ( FontbakeryCallable
                                 , FontBakeryCheck
                                 , FontBakeryCondition
@@ -83,6 +96,11 @@ class Status:
 
   __repr__ = __str__
 
+  def __reduce__(self):
+    # Statuses are singletons, unpickling must return the registered
+    # instance. This is used e.g. to send events between processes.
+    return (Status, (self.__name, self.__weight))
+
 # Status messages of the check runner protocol
 
 # Structuring statuses
@@ -146,8 +164,106 @@ ENDSECTION = Status('ENDSECTION', -3)
 # results of all checks in all sections.
 END = Status('END', -5)
 
+# Metadata statuses
+#  * have weights < START.weight, they are neither structuring nor log
+#    statuses and don't count for the check result
+#  * reporters that don't know them must ignore them
+#
+# Only emitted if the CheckRunner is created with `timing=True`.
+# Only between STARTCHECK and ENDCHECK, directly before ENDCHECK.
+# Message is a dict with the timing of the check execution:
+#   start, end: the start and end time, seconds since the epoch
+#   wall, cpu: the wall and CPU time in seconds, spent in the check only
+#   pid, thread: where the check was executed
+#   stored: True if the events were replayed from a ResultStore
+#   conditions: a list of dicts, one for each condition lookup, with
+#     name, iterargs, cached (True if the value was already known),
+#     start, wall and cpu
+#   loads: a list of dicts, one for each part of a checked document that
+#     was loaded on demand (e.g. a font table), see `record_load`
+TIMING = Status('TIMING', -10)
+
+# CPU time of the current thread, if available.
+_thread_time = getattr(time, 'thread_time', time.process_time)
+
+# The TIMING state of the check that is executed in the current thread:
+#   spans: the condition lookups
+#   loads: the parts of documents loaded on demand
+#   callables: the stack of the check and the conditions being called
+_timing_state = threading.local()
+
+# The CheckRunner executing a check in the current thread.
+_runner_state = threading.local()
+
+def get_current_runner():
+  """ The CheckRunner that executes the current check in this thread, or
+  None.
+  """
+  return getattr(_runner_state, 'runner', None)
+
+def get_runner_scoped(key, factory):
+  """ Returns the value of `key` for the CheckRunner that executes the
+  current check in this thread, created with `factory()` on first use, e.g.
+  to share objects between the checks and conditions of a run. Without
+  such a runner (e.g. when a check is called directly) a new value is
+  created on each call.
+  """
+  runner = get_current_runner()
+  if runner is None:
+    return factory()
+  return runner.get_scoped(key, factory)
+
+def add_background_task(future):
+  """ Registers `future`, a `concurrent.futures.Future` of work started for
+  the CheckRunner that executes the current check in this thread, but
+  running in other threads (e.g. validators started for all fonts at once).
+  The runner waits for it before forking a supervised check, see
+  `CheckRunner.add_background_task`. Does nothing without such a runner.
+  """
+  runner = get_current_runner()
+  if runner is not None:
+    runner.add_background_task(future)
+
+def record_load(name, subject, start, wall, cpu, dependency=False):
+  """ Records that the part `name` of the checked document `subject`
+  (e.g. a font table) was loaded on demand, taking `wall` and `cpu` time
+  in seconds, in the TIMING of the check that is currently executed in this
+  thread. Does nothing if the runner doesn't measure timing.
+
+  The load is attributed to the innermost check or condition being called.
+  `declared` is whether `name` is in its `tables`, or None if it declares
+  none or if the part was loaded as a `dependency` of another part.
+  """
+  loads = getattr(_timing_state, 'loads', None)
+  if loads is None:
+    return
+  callables = getattr(_timing_state, 'callables', None)
+  by = callables[-1] if callables else None
+  declared = None
+  if not dependency and by is not None \
+                    and getattr(by, 'tables', None) is not None:
+    declared = name in by.tables
+  loads.append({
+      'name': name
+    , 'subject': subject
+    , 'by': getattr(by, 'id', getattr(by, 'name', None))
+    , 'declared': declared
+    , 'start': start
+    , 'wall': wall
+    , 'cpu': cpu
+  })
+
+def _unpickle_error(cls, args, state):
+  error = cls.__new__(cls, *args)
+  error.args = args
+  error.__dict__.update(state)
+  return error
+
 class FontBakeryRunnerError(Exception):
-  pass
+  def __reduce__(self):
+    # The default pickling of exceptions calls `cls(*self.args)`, which
+    # doesn't fit the constructors of most of the subclasses below.
+    return (_unpickle_error, (type(self), self.args, self.__dict__))
 
 class CircularDependencyError(FontBakeryRunnerError):
   pass
@@ -226,13 +342,380 @@ def is_negated(name):
     return True, stripped[1:].strip()
   return False, stripped
 
+def deep_getsizeof(obj):
+  """ Approximate memory footprint of `obj` and of all objects it
+  references, in bytes. Modules, classes and functions are not followed.
+  """
+  seen = set()
+  size = 0
+  stack = [obj]
+  while stack:
+    item = stack.pop()
+    if id(item) in seen or isinstance(item, (types.ModuleType, type
+                                           , types.FunctionType
+                                           , types.BuiltinFunctionType)):
+      continue
+    seen.add(id(item))
+    size += sys.getsizeof(item)
+    if isinstance(item, (str, bytes, bytearray, int, float)):
+      continue
+    if isinstance(item, dict):
+      stack.extend(item.keys())
+      stack.extend(item.values())
+    elif isinstance(item, (list, tuple, set, frozenset)):
+      stack.extend(item)
+    if hasattr(item, '__dict__'):
+      stack.append(item.__dict__)
+    for name in getattr(type(item), '__slots__', ()):
+      if hasattr(item, name):
+        stack.append(getattr(item, name))
+  return size
+
+class ConditionCache:
+  """ Storage of the evaluated conditions of a CheckRunner.
+
+  Keys are tuples of `(condition name, used iterargs)`, values are the
+  `(error, value)` tuples returned by `CheckRunner._evaluate_condition`.
+
+  This base class keeps all values until the end of the run. Subclasses
+  implement other policies to release values, they can use the
+  information given to `expect` and `release`.
+  """
+  # If True, the runner calls `expect` for each check execution before
+  # running it. Computing the condition keys is not for free.
+  tracks_usage = False
+
+  def __init__(self):
+    self._values = {}
+
+  def __contains__(self, key):
+    return key in self._values
+
+  def __len__(self):
+    return len(self._values)
+
+  def items(self):
+    return list(self._values.items())
+
+  def get(self, key, default=None):
+    return self._values.get(key, default)
+
+  def __setitem__(self, key, value):
+    self._values[key] = value
+
+  def expect(self, user, keys):
+    """ `user` will be executed later and may need the condition `keys`. """
+    pass
+
+  def release(self, user):
+    """ `user`, as announced by `expect`, is done. """
+    pass
+
+class RefCountConditionCache(ConditionCache):
+  """ Releases a condition value when the last check execution that may
+  need it is done.
+
+  Values that were not announced via `expect` are kept until the end.
+  """
+  tracks_usage = True
+
+  def __init__(self):
+    super(RefCountConditionCache, self).__init__()
+    self._users = {}
+    self._refcount = Counter()
+
+  def expect(self, user, keys):
+    keys = tuple(keys)
+    self._users[user] = self._users.get(user, ()) + keys
+    self._refcount.update(keys)
+
+  def release(self, user):
+    for key in self._users.pop(user, ()):
+      self._refcount[key] -= 1
+      if self._refcount[key] <= 0:
+        del self._refcount[key]
+        self._values.pop(key, None)
+
+class LRUConditionCache(ConditionCache):
+  """ Keeps the most recently used values within a memory budget.
+
+  The size of a value is measured using `sizeof` when it is stored.
+  Values like lazily loaded documents can grow after they have been
+  created, hence used values are measured again when a check is done, but
+  at most every `remeasure_interval` checks, because measuring is costly.
+  Values that are needed again after they have been dropped are
+  evaluated again.
+  """
+  def __init__(self, max_bytes, sizeof=deep_getsizeof, remeasure_interval=10):
+    super(LRUConditionCache, self).__init__()
+    self._values = OrderedDict()
+    self._max_bytes = max_bytes
+    self._sizeof = sizeof
+    self._remeasure_interval = remeasure_interval
+    self._sizes = {}
+    self._measured_at = {}
+    self._releases = 0
+    self._touched = set()
+
+  @property
+  def size(self):
+    return sum(self._sizes.values())
+
+  def get(self, key, default=None):
+    if key not in self._values:
+      return default
+    self._values.move_to_end(key)
+    self._touched.add(key)
+    return self._values[key]
+
+  def _measure(self, key):
+    self._sizes[key] = self._sizeof(self._values[key])
+    self._measured_at[key] = self._releases
+
+  def __setitem__(self, key, value):
+    self._values[key] = value
+    self._values.move_to_end(key)
+    self._measure(key)
+    self._evict()
+
+  def release(self, user):
+    self._releases += 1
+    for key in self._touched:
+      if key in self._values and self._releases - self._measured_at[key] \
+                                            >= self._remeasure_interval:
+        self._measure(key)
+    self._touched = set()
+    self._evict()
+
+  def _evict(self):
+    total = self.size
+    # Keep at least the most recently used value, whatever its size.
+    while total > self._max_bytes and len(self._values) > 1:
+      key, _ = self._values.popitem(last=False)
+      total -= self._sizes.pop(key)
+      del self._measured_at[key]
+
+_NOT_STORED = object() # used as a marker
+
+class DirectoryStore:
+  """ Stores pickled values in a directory, so that they can be reused in
+  later runs. Keys are hex digests. Unreadable entries are treated as
+  missing, values that can't be pickled are not stored.
+  """
+  def __init__(self, directory):
+    self._directory = directory
+
+  def _path(self, key):
+    return os.path.join(self._directory, key[:2], f'{key}.pickle')
+
+  def get(self, key, default=None):
+    try:
+      with open(self._path(key), 'rb') as f:
+        return pickle.load(f)
+    except Exception:
+      return default
+
+  def __setitem__(self, key, value):
+    try:
+      data = pickle.dumps(value)
+    except Exception as e:
+      logging.debug('Can\'t store value %s: %s', key, e)
+      return
+    path = self._path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write and rename, so that concurrent runs never read partial entries.
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+      os.replace(temp_path, path)
+    except BaseException:
+      os.unlink(temp_path)
+      raise
+
+class PersistentConditionCache(DirectoryStore):
+  """ Stores the values of conditions marked as `persistent`.
+
+  Keys are computed by `CheckRunner._get_persistent_key` from the
+  condition name, its version and the contents of the files it depends on.
+  """
+
+class ResultStore(DirectoryStore):
+  """ Stores the events of check executions, to replay them in later runs
+  instead of executing the checks again.
+
+  Keys are computed by `CheckRunner._get_result_key` from the check id,
+  the source code of the check and of its conditions and the paths and
+  contents of the files it depends on.
+  """
+
+class TransferredMessage:
+  """ Stand-in for a message that can't be pickled.
+
+  It renders like the original message and keeps the attributes
+  reporters are interested in.
+  """
+  def __init__(self, message):
+    self._text = f'{message}'
+    traceback = getattr(message, 'traceback', None)
+    if traceback is not None:
+      self.traceback = traceback
+    code = getattr(message, 'code', None)
+    if code is not None:
+      self.code = code
+
+  def __str__(self):
+    return self._text
+
+  __repr__ = __str__
+
+def transferable_message(message):
+  try:
+    pickle.dumps(message)
+  except Exception:
+    return TransferredMessage(message)
+  return message
+
+def file_digest(path, chunk_size=2**20):
+  """ SHA-256 hex digest of the contents of the file at `path`. """
+  sha = hashlib.sha256()
+  with open(path, 'rb') as f:
+    try:
+      # hashes the mapped file without copying it
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        sha.update(mapped)
+    except (ValueError, OSError):
+      # empty files can't be mapped
+      for chunk in iter(partial(f.read, chunk_size), b''):
+        sha.update(chunk)
+  return sha.hexdigest()
+
+def run_until_complete(awaitable):
+  """ Returns the result of `awaitable`, using a new event loop. """
+  import asyncio
+  loop = asyncio.new_event_loop()
+  try:
+    return loop.run_until_complete(awaitable)
+  finally:
+    loop.close()
+
+def iterate_async_generator(agen):
+  """ A generator of the items of the async generator `agen`, using a new
+  event loop.
+  """
+  import asyncio
+  loop = asyncio.new_event_loop()
+  try:
+    while True:
+      try:
+        yield loop.run_until_complete(agen.__anext__())
+      except StopAsyncIteration:
+        return
+  finally:
+    loop.close()
+
+def get_rss(pid):
+  """ Resident set size of the process `pid` in bytes, None if unknown. """
+  try:
+    with open(f'/proc/{pid}/status') as f:
+      for line in f:
+        if line.startswith('VmRSS:'):
+          return int(line.split()[1]) * 1024
+  except (OSError, ValueError, IndexError):
+    pass
+  return None
+
+def get_group_rss(pgid):
+  """ Resident set size in bytes of the processes of the process group
+  `pgid` (e.g. a supervised check and the tools it runs), None if unknown.
+  Processes that leave the group (e.g. with setsid) are not counted.
+  """
+  try:
+    pids = [name for name in os.listdir('/proc') if name.isdigit()]
+  except OSError:
+    return None
+  total = None
+  for pid in pids:
+    try:
+      with open(f'/proc/{pid}/stat') as f:
+        stat = f.read()
+      # state, ppid, pgrp, ... follow the command name, which can contain
+      # spaces and parentheses
+      group = int(stat[stat.rindex(')') + 1:].split()[2])
+    except (OSError, ValueError, IndexError):
+      continue
+    if group != pgid:
+      continue
+    rss = get_rss(pid)
+    if rss is not None:
+      total = (total or 0) + rss
+  return total
+
+def source_fingerprint(func):
+  """ SHA-256 hex digest of the source code of `func`, falling back to its
+  byte code if the source is not available.
+  """
+  func = getattr(func, '_func', func)
+  try:
+    source = inspect.getsource(func).encode('utf-8')
+  except (OSError, TypeError):
+    code = getattr(func, '__code__', None)
+    source = code.co_code + repr(code.co_consts).encode('utf-8') \
+                                    if code is not None else repr(func).encode('utf-8')
+  return hashlib.sha256(source).hexdigest()
+
+# The maximum wall time in seconds of supervised checks that only have a
+# memory limit.
+SUPERVISED_CHECK_TIMEOUT = 30 * 60
+
 class CheckRunner:
   def __init__(self, profile, values
              , values_can_override_profile_names=True
              , custom_order=None
              , explicit_checks=None
              , exclude_checks=None
+             , condition_cache=None
+             , persistent_cache=None
+             , result_store=None
+             , timing=False
+             , check_timeout=None
+             , check_max_rss=None
+             , check_costs=None
+             , io_threads=0
              ):
+    """
+    condition_cache: a ConditionCache instance, defining the policy used
+    to keep the evaluated conditions in memory. The default keeps all
+    conditions until the end of the run.
+
+    persistent_cache: a PersistentConditionCache instance, used to store
+    and load the values of conditions marked as `persistent`.
+
+    result_store: a ResultStore instance. Checks whose source code and
+    input files didn't change since they were stored are not executed,
+    their stored events are replayed instead.
+
+    timing: if True, a TIMING event is emitted before each ENDCHECK.
+
+    check_timeout, check_max_rss: the default maximum wall time in seconds
+    and resident memory in bytes of each check execution. Checks can
+    override these with the `timeout` and `max_rss` keys of their
+    `misc_metadata`. Checks with limits are executed in a supervised child
+    process, that is killed if it exceeds them. The memory is that of the
+    process group of the child, i.e. including the subprocesses it starts
+    (e.g. external tools). Checks with only a memory
+    limit are killed after `SUPERVISED_CHECK_TIMEOUT` seconds.
+
+    check_costs: a dict of {check id: expected wall time in seconds}, e.g.
+    from a previous run. Expensive work is started first.
+
+    io_threads: the number of threads used to execute checks marked as
+    `io_bound` in their `misc_metadata`, in parallel to the other checks.
+    The default, 0, executes them in order, like the other checks. The
+    io_bound checks and their conditions must then be thread safe: they
+    must not use the fonts shared with the other checks (e.g. the `ttFont`
+    condition or `get_font`), which are not.
+    """
     # TODO: transform all iterables that are list like to tuples
     # to make sure that they won't change anymore.
     # Also remove duplicates from list like iterables
@@ -262,9 +745,31 @@ class CheckRunner:
     self._values = values
 
     self._cache = {
-      'conditions': {}
+      'conditions': condition_cache if condition_cache is not None \
+                                     else ConditionCache()
     , 'order': None
+    , 'digests': {}
+    , 'scoped': {}
     }
+    self._persistent_cache = persistent_cache
+    self._result_store = result_store
+    self._timing = timing
+    # the condition lookups of the currently running check
+    self._timing_state = _timing_state
+    self._check_timeout = check_timeout
+    self._check_max_rss = check_max_rss
+    self._check_costs = check_costs or {}
+    self._io_threads = io_threads
+    # The condition cache is shared with the threads executing io_bound
+    # checks. Each condition is evaluated only once, holding its lock,
+    # which is dropped after the evaluation (see `_get_condition`).
+    self._cache_lock = threading.Lock()
+    self._condition_locks = {}
+    # futures of work running in other threads, see add_background_task
+    self._background_tasks = []
+    # (iterarg name, [values]) of the shard executed by this runner, see
+    # `shard_items`
+    self._shard = None
 
   @property
   def iterargs(self):
@@ -339,6 +844,12 @@ class CheckRunner:
       # object that we can detect with types.GeneratorType.
       result = check(**args)  # Might raise.
 
+      # Coroutine checks, see also fontbakery.asyncrunner
+      if inspect.isasyncgen(result):
+        result = iterate_async_generator(result)
+      elif inspect.isawaitable(result):
+        result = run_until_complete(result)  # Might raise.
+
       if isinstance(result, types.GeneratorType):
         # Iterate over sub-results one-by-one, list(result) would abort on
         # encountering the first exception.
@@ -373,11 +884,17 @@ class CheckRunner:
       return error, None
 
     path.pop()
+    callables = getattr(self._timing_state, 'callables', None)
+    if callables is not None:
+      callables.append(condition)
     try:
       return None, condition(**args)
     except Exception as err:
       error = FailedConditionError(condition, err)
       return error, None
+    finally:
+      if callables is not None:
+        callables.pop()
 
   def _filter_condition_used_iterargs(self, name, iterargs):
     allArgs = set()
@@ -397,14 +914,232 @@ class CheckRunner:
     usecache = True #False
     used_iterargs = self._filter_condition_used_iterargs(name, iterargs)
     key = (name, used_iterargs)
-    if not usecache or key not in self._cache['conditions']:
-      err, val = self._evaluate_condition(name, used_iterargs, path)
-      if usecache:
-        self._cache['conditions'][key] = err, val
-    else:
-      err, val = self._cache['conditions'][key]
+    spans = getattr(self._timing_state, 'spans', None)
+    if spans is not None:
+      start, wall_start, cpu_start = time.time(), time.perf_counter(), \
+                                                              _thread_time()
+    with self._cache_lock:
+      condition_lock = self._condition_locks.setdefault(key, threading.RLock())
+    with condition_lock:
+      with self._cache_lock:
+        cached = self._cache['conditions'].get(key) if usecache else None
+      if cached is None:
+        err, val = self._get_persistent_condition(name, used_iterargs, path)
+        if usecache:
+          with self._cache_lock:
+            self._cache['conditions'][key] = err, val
+      else:
+        err, val = cached
+      # The lock is only needed while the condition is evaluated, the
+      # threads that wait for it already have it. Later lookups use the
+      # cache, or a new lock if the value was evicted.
+      with self._cache_lock:
+        if self._condition_locks.get(key) is condition_lock:
+          del self._condition_locks[key]
+    if spans is not None:
+      spans.append({
+          'name': name
+        , 'iterargs': used_iterargs
+        , 'cached': cached is not None
+        , 'start': start
+        , 'wall': time.perf_counter() - wall_start
+        , 'cpu': _thread_time() - cpu_start
+      })
     return err, val
 
+  def _get_persistent_condition(self, name, iterargs, path=None):
+    persistent_key = None
+    condition = self._profile.conditions.get(name, None)
+    if self._persistent_cache is not None and condition is not None \
+                                          and condition.persistent:
+      persistent_key = self._get_persistent_key(name, iterargs)
+    if persistent_key is not None:
+      stored = self._persistent_cache.get(persistent_key, _NOT_STORED)
+      if stored is not _NOT_STORED:
+        return None, stored
+
+    err, val = self._evaluate_condition(name, iterargs, path)
+    # Errors are not stored, they may be caused by the environment.
+    if persistent_key is not None and err is None:
+      self._persistent_cache[persistent_key] = val
+    return err, val
+
+  def _get_digest(self, value):
+    if not isinstance(value, str) or not os.path.isfile(value):
+      return None
+    digests = self._cache['digests']
+    if value not in digests:
+      digests[value] = file_digest(value)
+    return digests[value]
+
+  def _get_dependencies_parts(self, names, iterargs, with_paths=False):
+    """ Returns a set of strings identifying the values of the names in
+    `names` and of all their dependencies: the contents (and with
+    `with_paths` the paths) of the files (iterarg values) and simple
+    values. Returns None if a dependency can't be identified this way.
+    """
+    iterargsDict = dict(iterargs)
+    plurals = {plural: singular
+                     for singular, plural in self._profile.iterargs.items()}
+    parts = set()
+    seen = set()
+    # (name, all_iterargs): in derived iterables all values of an iterarg
+    # are used.
+    dependencies = [(name, False) for name in names]
+    while dependencies:
+      dependency = dependencies.pop()
+      if dependency in seen:
+        continue
+      seen.add(dependency)
+      dependency_name, all_iterargs = dependency
+      dependency_name = self._profile.resolve_alias(dependency_name)
+      nametype = self._profile.get_type(dependency_name, None)
+      if dependency_name in plurals:
+        dependency_name, all_iterargs = plurals[dependency_name], True
+        nametype = 'iterargs'
+
+      if nametype == 'iterargs':
+        plural = self._profile.iterargs[dependency_name]
+        if all_iterargs:
+          values = self._values[plural]
+        elif dependency_name in iterargsDict:
+          values = [self._values[plural][iterargsDict[dependency_name]]]
+        else:
+          return None
+        for value in values:
+          digest = self._get_digest(value)
+          if digest is None:
+            return None
+          parts.add(f'{dependency_name}:{all_iterargs}:{digest}')
+          if with_paths:
+            parts.add(f'{dependency_name}:{all_iterargs}:{value}')
+      elif dependency_name in self._values or nametype == 'expected_values':
+        value = self._get(dependency_name, iterargs, None, None)
+        if not isinstance(value, (str, int, float, bool, type(None))):
+          return None
+        parts.add(f'{dependency_name}={value!r}')
+      elif nametype == 'conditions':
+        dependencies += [(arg, all_iterargs) for arg
+                         in self._profile.conditions[dependency_name].args]
+      elif nametype == 'derived_iterables':
+        condition_name, _ = self._profile.get(dependency_name)
+        dependencies.append((condition_name, True))
+      else:
+        return None
+    return parts
+
+  def _hash_parts(self, *parts):
+    sha = hashlib.sha256()
+    for part in parts:
+      sha.update(part.encode('utf-8'))
+      sha.update(b'\0')
+    return sha.hexdigest()
+
+  def _get_persistent_key(self, name, iterargs):
+    """ Returns a key for the persistent cache, made of the condition name
+    and version and of the contents of all files (iterarg values) the
+    condition depends on. Returns None if the condition depends on values
+    that can't be identified this way.
+    """
+    condition = self._profile.conditions[name]
+    version = self._get_condition_version(condition)
+    if version is None:
+      return None
+    parts = self._get_dependencies_parts(condition.args, iterargs)
+    if parts is None:
+      return None
+    return self._hash_parts(name, version, *sorted(parts))
+
+  def _get_condition_version(self, condition):
+    """ The `version` of `condition` as a string, the result of calling it
+    (once per run) if it is callable, or None if that fails.
+    """
+    version = condition.version
+    if not callable(version):
+      return f'{version}'
+    versions = self._cache.setdefault('condition_versions', {})
+    if condition.name not in versions:
+      try:
+        versions[condition.name] = f'{version()}'
+      except Exception:
+        versions[condition.name] = None
+    return versions[condition.name]
+
+  def _get_check_fingerprint(self, check):
+    """ Digest of the source code of `check`, of all conditions it depends
+    on and of the check skip filter of the profile.
+    """
+    fingerprints = self._cache.setdefault('fingerprints', {})
+    if check.id not in fingerprints:
+      parts = [source_fingerprint(check)]
+      for name in sorted(self._profile.get_deep_check_dependencies(check)):
+        condition = self._profile.conditions.get(
+                                    self._profile.resolve_alias(name), None)
+        if condition is not None:
+          parts.append(f'{name}:{source_fingerprint(condition)}'
+                       f':{self._get_condition_version(condition)}')
+      if self._profile.check_skip_filter:
+        parts.append(source_fingerprint(self._profile.check_skip_filter))
+      fingerprints[check.id] = self._hash_parts(*parts)
+    return fingerprints[check.id]
+
+  def _get_result_key(self, check, iterargs):
+    """ Returns a key for the result store, made of the check id, its
+    fingerprint and the paths and contents of all files the check depends
+    on. Returns None if the check depends on values that can't be
+    identified this way.
+    """
+    names = list(check.args) + [name for _, name
+                                in map(is_negated, check.conditions)]
+    parts = self._get_dependencies_parts(names, iterargs, with_paths=True)
+    if parts is None:
+      return None
+    return self._hash_parts(check.id, self._get_check_fingerprint(check),
+                            *sorted(parts))
+
+  def _get_condition_keys(self, check, iterargs):
+    """ Returns the set of all condition cache keys that are possibly
+    used when `check` is executed with `iterargs`.
+    """
+    keys = set()
+    dependencies = [(name, iterargs) for name in check.args]
+    dependencies += [(name, iterargs) for _, name in map(is_negated, check.conditions)]
+    while dependencies:
+      name, current_iterargs = dependencies.pop()
+      if name in self._values:
+        continue
+      name = self._profile.resolve_alias(name)
+      if name in self._values:
+        continue
+      nametype = self._profile.get_type(name, None)
+      if nametype == 'conditions':
+        used_iterargs = self._filter_condition_used_iterargs(name, current_iterargs)
+        requirements = [(name, used_iterargs)]
+      elif nametype == 'derived_iterables':
+        name, _ = self._profile.get(name)
+        requirements = [(name, used_iterargs) for used_iterargs
+                 in self._generate_iterargs([(singular, self._iterargs[singular])
+                      for singular in self._profile.get_iterargs(
+                                          self._profile.conditions[name])])]
+      else:
+        continue
+      for key in requirements:
+        if key in keys:
+          continue
+        keys.add(key)
+        condition_name, used_iterargs = key
+        dependencies += [(arg, used_iterargs) for arg
+                          in self._profile.conditions[condition_name].args]
+    return keys
+
+  def _expect_condition_keys(self, order):
+    conditions = self._cache['conditions']
+    if not conditions.tracks_usage:
+      return
+    for _, check, iterargs in order:
+      conditions.expect((check.id, iterargs),
+                        self._get_condition_keys(check, iterargs))
+
   def get(self, key, iterargs, *args):
     return self._get(key, iterargs, None, *args)
 
@@ -540,8 +1275,266 @@ class CheckRunner:
       status = (ERROR, FailedDependenciesError(check, error))
       return (status, None)
 
+  def _in_scope(self, func, *args):
+    """ Calls `func`, with this runner as the current runner of the thread,
+    see `get_runner_scoped`.
+    """
+    previous = getattr(_runner_state, 'runner', None)
+    _runner_state.runner = self
+    try:
+      return func(*args)
+    finally:
+      _runner_state.runner = previous
+
+  def add_background_task(self, future):
+    """ Registers `future`, a `concurrent.futures.Future` of work for this
+    run that runs in another thread, e.g. an io_bound check.
+
+    Supervised checks (see `_execute_check_supervised`) are executed in a
+    forked child process, which has only the thread that forked it: a child
+    waiting for work of other threads would wait forever, and locks held by
+    other threads at the time of the fork would stay held. The supervised
+    checks are therefore only forked when all registered work is done.
+    """
+    with self._cache_lock:
+      self._background_tasks.append(future)
+
+  def _wait_for_background_tasks(self):
+    """ Waits until the work registered with `add_background_task` is
+    done, including work registered while waiting.
+    """
+    while True:
+      with self._cache_lock:
+        self._background_tasks = [future for future in self._background_tasks
+                                             if not future.done()]
+        pending = list(self._background_tasks)
+      if not pending:
+        return
+      wait(pending)
+
+  def shard_items(self, items):
+    """ Returns those of `items` the checks executed by this runner are
+    about: all of them, unless the runner executes a shard of the run (see
+    `fontbakery.multiproc`), then those that are values of the sharding
+    iterarg in the shard, e.g. the fonts of a worker process.
+    """
+    if self._shard is None:
+      return list(items)
+    _, values = self._shard
+    return [item for item in items if item in values]
+
+  def get_scoped(self, key, factory):
+    """ Returns the value of `key` for this runner, created with `factory()`
+    on first use.
+    """
+    with self._cache_lock:
+      scoped = self._cache['scoped']
+      if key not in scoped:
+        scoped[key] = factory()
+      return scoped[key]
+
   def _run_check(self, check, iterargs):
-    summary_status = None
+    events = self._run_check_events(check, iterargs)
+    while True:
+      try:
+        event = self._in_scope(next, events)
+      except StopIteration:
+        return
+      yield event
+
+  def _run_check_events(self, check, iterargs):
+    if not self._timing:
+      yield from self._get_check_events(check, iterargs)
+      return
+
+    timing = {
+        'start': time.time()
+      , 'end': None
+      , 'wall': 0
+      , 'cpu': 0
+      , 'pid': os.getpid()
+      , 'thread': threading.get_ident()
+      , 'stored': False
+      , 'conditions': []
+      , 'loads': []
+    }
+    events = self._get_check_events(check, iterargs, timing)
+    while True:
+      # Only the time spent in the check is measured, not the time the
+      # consumer of this generator spends in between.
+      wall_start, cpu_start = time.perf_counter(), _thread_time()
+      self._timing_state.spans = timing['conditions']
+      self._timing_state.loads = timing['loads']
+      self._timing_state.callables = [check]
+      try:
+        status, message = next(events)
+      except StopIteration:
+        return
+      finally:
+        self._timing_state.spans = None
+        self._timing_state.loads = None
+        self._timing_state.callables = None
+        timing['wall'] += time.perf_counter() - wall_start
+        timing['cpu'] += _thread_time() - cpu_start
+      if status == ENDCHECK:
+        timing['end'] = time.time()
+        yield TIMING, timing
+      yield status, message
+
+  def _get_check_events(self, check, iterargs, timing=None):
+    result_key = None
+    if self._result_store is not None:
+      result_key = self._get_result_key(check, iterargs)
+    stored = None
+    if result_key is not None:
+      stored = self._result_store.get(result_key)
+
+    if stored is not None:
+      if timing is not None:
+        timing['stored'] = True
+      yield from stored
+    else:
+      timeout, max_rss = self._get_check_limits(check)
+      if timeout is None and max_rss is None:
+        execution = self._execute_check(check, iterargs)
+      else:
+        execution = self._execute_check_supervised(check, iterargs,
+                                                   timeout, max_rss)
+      events = []
+      for status, message in execution:
+        events.append((status, message))
+        yield status, message
+      # Errors are not stored, they may be caused by the environment.
+      _, summary_status = events[-1]
+      if result_key is not None and summary_status != ERROR:
+        self._result_store[result_key] = [(status, transferable_message(message))
+                                                for status, message in events]
+    with self._cache_lock:
+      self._cache['conditions'].release((check.id, iterargs))
+
+  def _get_check_limits(self, check):
+    metadata = getattr(check, 'misc_metadata', None) or {}
+    return (metadata.get('timeout', self._check_timeout)
+          , metadata.get('max_rss', self._check_max_rss))
+
+  def _execute_check_supervised(self, check, iterargs, timeout, max_rss):
+    """ Executes the check in a forked child process, which is killed if
+    it exceeds `timeout` or `max_rss`. The events and the conditions
+    evaluated by the child are sent back through a pipe.
+    """
+    if not hasattr(os, 'fork'):
+      if not self._cache.get('unsupervised_warning'):
+        self._cache['unsupervised_warning'] = True
+        logging.warning('Check limits require os.fork, which is not available'
+                        ' on this platform. Running the checks unsupervised.')
+      yield from self._execute_check(check, iterargs)
+      return
+
+    if timeout is None:
+      # a child that never ends (e.g. it waits for a lock that was held by
+      # another thread at the time of the fork) must not hang the run
+      timeout = SUPERVISED_CHECK_TIMEOUT
+    # No other threads of this run may be busy at the time of the fork.
+    self._wait_for_background_tasks()
+    conditions = self._cache['conditions']
+    known_keys = {key for key, _ in conditions.items()}
+    spans = getattr(self._timing_state, 'spans', None)
+    loads = getattr(self._timing_state, 'loads', None)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+      # child
+      exit_status = 1
+      try:
+        os.close(read_fd)
+        # a new process group, to be able to kill subprocesses as well
+        os.setpgid(0, 0)
+        # Locks may have been held by other threads at the time of the fork.
+        self._cache_lock = threading.Lock()
+        self._condition_locks = {}
+        events = [(status, transferable_message(message)) for status, message
+                                      in self._execute_check(check, iterargs)]
+        evaluated = []
+        for key, value in conditions.items():
+          if key in known_keys:
+            continue
+          try:
+            pickle.dumps(value)
+          except Exception:
+            continue
+          evaluated.append((key, value))
+        with os.fdopen(write_fd, 'wb') as pipe:
+          pickle.dump((events, evaluated, spans, loads), pipe)
+        exit_status = 0
+      finally:
+        os._exit(exit_status)
+
+    os.close(write_fd)
+    # also set by the child, whichever comes first, so that the group is
+    # complete when its memory is measured
+    try:
+      os.setpgid(pid, pid)
+    except OSError:
+      pass
+    breach = None
+    chunks = []
+    deadline = time.monotonic() + timeout
+    with os.fdopen(read_fd, 'rb') as pipe:
+      while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+          breach = Message('timeout', f'The check {check} did not finish'
+                                      f' within {timeout} seconds.')
+          break
+        readable, _, _ = select.select([pipe], [], [], min(0.1, remaining))
+        if readable:
+          chunk = os.read(pipe.fileno(), 2**16)
+          if not chunk:
+            break
+          chunks.append(chunk)
+        rss = get_group_rss(pid) if max_rss is not None else None
+        if rss is not None and rss > max_rss:
+          breach = Message('max-rss', f'The check {check} exceeded the'
+                          f' memory limit of {max_rss} bytes ({rss} bytes).')
+          break
+    if breach is not None:
+      try:
+        os.killpg(pid, signal.SIGKILL)
+      except OSError:
+        os.kill(pid, signal.SIGKILL)
+    _, exit_status = os.waitpid(pid, 0)
+
+    if breach is None:
+      try:
+        events, evaluated, child_spans, child_loads = \
+                                            pickle.loads(b''.join(chunks))
+      except Exception:
+        breach = Message('crash', f'The process executing the check {check}'
+                                  f' died with exit status {exit_status}.')
+    if breach is not None:
+      yield STARTCHECK, None
+      yield ERROR, breach
+      yield ENDCHECK, ERROR
+      return
+
+    for key, value in evaluated:
+      if key not in conditions:
+        conditions[key] = value
+    if spans is not None and child_spans:
+      spans.extend(child_spans[len(spans):])
+    if loads is not None and child_loads:
+      loads.extend(child_loads[len(loads):])
+    yield from events
+
+  def _execute_check(self, check, iterargs):
+    skipped, args = self._prepare_check(check, iterargs)
+    results = self._exec_check(check, args) if skipped is None else None
+    yield from self._check_events(check, skipped, results)
+
+  def _prepare_check(self, check, iterargs):
+    """ Returns `(skipped, args)`: `skipped` is a result tuple if the check
+    must not be executed, otherwise `args` are its arguments.
+    """
     # A check is more than just a function, it carries
     # a lot of meta-data for us, in this case we can use
     # meta-data to learn how to call the check (via
@@ -549,16 +1542,19 @@ class CheckRunner:
     # the default and configuration could be used to override
     # inprofiletion results).
 
-    skipped = None
     if self._profile.check_skip_filter:
       iterargsDict = {key:self.get_iterarg(key, index) for key, index in iterargs}
       accepted, message = self._profile.check_skip_filter(check.id, **iterargsDict)
       if not accepted:
-        skipped = (SKIP, 'Filtered: {}'.format(message or '(no message)'))
+        return (SKIP, 'Filtered: {}'.format(message or '(no message)')), None
 
-    if not skipped:
-      skipped, args = self._get_check_dependencies(check, iterargs)
+    return self._get_check_dependencies(check, iterargs)
 
+  def _check_events(self, check, skipped, results):
+    """ Yields the events of a check execution, from STARTCHECK to ENDCHECK,
+    for the `skipped` result or the `results` of the executed check.
+    """
+    summary_status = None
     # FIXME: check is not a message
     # so, to use it as a message, it should have a "message-interface"
     # TODO: describe generic "message-interface"
@@ -574,7 +1570,7 @@ class CheckRunner:
       # correctly.
       yield skipped
     else:
-      for sub_result in self._exec_check(check, args):
+      for sub_result in results:
         status, _ = sub_result
         if summary_status is None or status >= summary_status:
           summary_status = status
@@ -629,6 +1625,65 @@ class CheckRunner:
         raise ValueError(f'Order item {item} not found.')
     return order
 
+  def _execute(self, order):
+    """ Yield `(identity, events)` for each item of `order`, in that order.
+
+    `events` is an iterable of the `(status, message)` tuples of the
+    check execution, from STARTCHECK to ENDCHECK. Subclasses can override
+    this to change how and where checks are executed, `run` takes care of
+    the rest of the protocol.
+    """
+    self._expect_condition_keys(order)
+    io_bound = self._get_io_bound(order)
+    if not io_bound:
+      for identity in order:
+        _, check, iterargs = identity
+        yield identity, self._run_check(check, iterargs)
+      return
+
+    with ThreadPoolExecutor(self._io_threads) as executor:
+      futures = self._submit_io_bound(executor, order, io_bound)
+      for index, identity in enumerate(order):
+        _, check, iterargs = identity
+        if index in futures:
+          yield identity, futures[index].result()
+        else:
+          yield identity, self._run_check(check, iterargs)
+
+  def _get_cost(self, check):
+    """ The expected wall time of `check`, for checks without a known cost
+    this is the mean of the known costs.
+    """
+    costs = self._check_costs
+    if check.id in costs:
+      return costs[check.id]
+    if not costs:
+      return 0
+    return sum(costs.values()) / len(costs)
+
+  def _get_io_bound(self, order):
+    """ Returns the set of indexes of the io_bound checks in `order`.
+    Checks with limits are not io_bound, they are forked from the thread
+    that executes the other checks, see `add_background_task`.
+    """
+    if not self._io_threads:
+      return set()
+    return {index for index, (_, check, _) in enumerate(order)
+              if (getattr(check, 'misc_metadata', None) or {}).get('io_bound')
+                 and self._get_check_limits(check) == (None, None)}
+
+  def _submit_io_bound(self, executor, order, indexes):
+    """ Submits the executions of `indexes` to `executor`, the most
+    expensive first. Returns a dict of {index: future}, the result of a
+    future is the list of events of the check execution.
+    """
+    futures = {}
+    for index in sorted(indexes, key=lambda index: -self._get_cost(order[index][1])):
+      _, check, iterargs = order[index]
+      futures[index] = executor.submit(list, self._run_check(check, iterargs))
+      self.add_background_task(futures[index])
+    return futures
+
   def run(self, order=None):
     checkrun_summary = Counter()
 
@@ -655,13 +1710,16 @@ class CheckRunner:
 
     # run
     yield START, order, (None, None, None)
+    executions = self._execute(order)
     section = None
     for section, section_order in section_orders:
       section_summary = Counter()
       yield STARTSECTION, section_order, (section, None, None)
       for check, iterargs in section_order:
-        for status, message in self._run_check(check, iterargs):
-          yield status, message, (section, check, iterargs)
+        identity, events = next(executions)
+        assert identity == (section, check, iterargs)
+        for status, message in events:
+          yield status, message, identity
         # after _run_check the last status must be ENDCHECK
         assert status == ENDCHECK
         # message is the summary_status of the check when status is ENDCHECK
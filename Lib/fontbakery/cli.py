@@ -1,18 +1,35 @@
-import argparse
-import pkgutil
-import runpy
 import sys
 
-import fontbakery.commands
+import fontbakery
+
+# The modules of fontbakery.commands. They are listed here, instead of
+# being discovered on each start, to keep the start (e.g. for the shell
+# completion) fast. tests/commands/test_usage.py checks that the list is
+# complete.
+SUBCOMMANDS = (
+    "batch",
+    "build_contributors",
+    "check_adobefonts",
+    "check_fontval",
+    "check_googlefonts",
+    "check_opentype",
+    "check_profile",
+    "check_silfonts",
+    "check_silufofonts",
+    "check_ufo_sources",
+    "check_universal",
+    "generate_glyphdata",
+    "generate_profile_manifest",
+    "serve",
+    "update_vendorlist",
+)
 
 
 def main():
-    subcommands = [
-        pkg[1].replace("_", "-")
-        for pkg in pkgutil.walk_packages(fontbakery.commands.__path__)
-    ]
+    subcommands = [name.replace("_", "-") for name in SUBCOMMANDS]
 
     if len(sys.argv) >= 2 and sys.argv[1] in subcommands:
+        import runpy
         # Relay to subcommand.
         subcommand = sys.argv[1]
         subcommand_module = subcommand.replace("-", "_")
@@ -21,6 +38,7 @@ def main():
         runpy.run_module(
             "fontbakery.commands." + subcommand_module, run_name='__main__')
     else:
+        import argparse
         description = (
             "Run fontbakery subcommands. Subcommands have their own help "
             "messages. These are usually accessible with the -h/--help flag "
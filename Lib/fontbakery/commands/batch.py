@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# usage:
+# $ fontbakery batch --profile googlefonts -o reports/ path/to/google/fonts/
+#
+# Each directory below the collection root that contains font files is a
+# family. The families are checked in parallel, each one by a CheckRunner
+# of its own in a worker process. A JSON report is written for each family
+# into the output directory, at the same relative path as the family
+# directory (e.g. reports/ofl/cabin/fontbakery.json), and a summary of all
+# families to reports/summary.json.
+"""
+Check all families of a font collection.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from fontbakery.checkrunner import (
+              CheckRunner
+            , distribute_generator
+            , get_module_profile
+            , ENDCHECK
+            , ERROR
+            , FAIL
+            )
+from fontbakery.commands.check_profile import get_profile_module
+from fontbakery.downloads import configure_downloads
+from fontbakery.linkcheck import configure_link_checker
+from fontbakery.reporters.serialize import SerializeReporter
+
+REPORT_FILENAME = 'fontbakery.json'
+SUMMARY_FILENAME = 'summary.json'
+# Families that are lost with a dying worker process are retried in a
+# shared pool this many times, then alone.
+MAX_ATTEMPTS = 2
+
+
+def find_families(root, patterns=('*.ttf', )):
+  """ Returns a list of `(directory, fonts)` of all directories below
+  `root` that contain files matching `patterns`, like `family_directory`
+  each directory is a family. Hidden directories are skipped.
+  """
+  families = []
+  for dirpath, dirnames, filenames in os.walk(root):
+    dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+    fonts = sorted(os.path.join(dirpath, filename) for filename in filenames
+                    if any(fnmatch.fnmatch(filename, p) for p in patterns))
+    if fonts:
+      families.append((dirpath, fonts))
+  return families
+
+
+_profiles = {}
+def _get_profile(name):
+  if name not in _profiles:
+    profile = get_module_profile(get_profile_module(name))
+    if not profile:
+      raise ValueError(f'Can\'t get a profile from "{name}".')
+    _profiles[name] = profile
+  return _profiles[name]
+
+
+def check_family(profile_name, directory, fonts, report, runner_kwds=None):
+  """ Runs the checks of a family and writes its JSON report to `report`.
+  Returns a JSON serializable summary, errors are returned, not raised.
+  """
+  result = {'family': directory
+          , 'fonts': fonts
+          , 'report': None
+          , 'summary': {}
+          , 'worst_status': None
+          , 'error': None}
+  try:
+    runner = CheckRunner(_get_profile(profile_name)
+                       , values={'fonts': fonts}
+                       , **(runner_kwds or {}))
+    sr = SerializeReporter(runner=runner)
+    worst_status = None
+    summary = Counter()
+    def receive(event):
+      nonlocal worst_status
+      status, message, _ = event
+      if status == ENDCHECK:
+        summary[message.name] += 1
+        if worst_status is None or message > worst_status:
+          worst_status = message
+    distribute_generator(runner.run(), [sr.receive, receive])
+
+    os.makedirs(os.path.dirname(report), exist_ok=True)
+    with open(report, 'w', encoding='utf-8') as f:
+      json.dump(sr.getdoc(), f, sort_keys=True, indent=4, default=str)
+    result['report'] = report
+    result['summary'] = dict(summary)
+    result['worst_status'] = worst_status.name if worst_status else None
+  except Exception as e:
+    result['error'] = f'{type(e).__name__}: {e}\n{traceback.format_exc()}'
+  return result
+
+
+def _get_executor(jobs):
+  from fontbakery.multiproc import can_fork
+  if can_fork():
+    import multiprocessing
+    # the workers inherit the already loaded profile
+    return ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context('fork'))
+  return ProcessPoolExecutor(jobs)
+
+
+def _run_pool(jobs, calls, progress=None):
+  """ Runs `calls`, a dict of {key: (func, args)}, on a new pool. Returns a
+  dict of {key: result} of all calls that were not lost when a worker
+  process died.
+  """
+  results = {}
+  with _get_executor(jobs) as executor:
+    futures = {executor.submit(func, *args): key
+                                  for key, (func, args) in calls.items()}
+    not_done = set(futures)
+    while not_done:
+      done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+      for future in done:
+        try:
+          results[futures[future]] = result = future.result()
+        except BrokenProcessPool:
+          continue
+        if progress:
+          progress(result)
+  return results
+
+
+def check_collection(profile_name, families, output_dir, jobs=None,
+                     runner_kwds=None, root=None, progress=None):
+  """ Checks `families` (see `find_families`) on a pool of `jobs` worker
+  processes. Returns the results of `check_family` in the order of
+  `families`.
+
+  When a worker process dies, the families that were not finished in that
+  pool are retried in a new one. Families that are lost again are checked
+  one by one, each in a pool of its own, the ones whose worker dies even
+  then are reported as failed. The other families are not affected.
+  """
+  _get_profile(profile_name)
+  jobs = jobs or os.cpu_count() or 1
+  calls = {}
+  for index, (directory, fonts) in enumerate(families):
+    relative = os.path.relpath(directory, root) if root else directory
+    report = os.path.join(output_dir, relative, REPORT_FILENAME)
+    calls[index] = (check_family, (profile_name, directory, fonts,
+                                   report, runner_kwds))
+
+  results = {}
+  for _ in range(MAX_ATTEMPTS):
+    pending = {index: call for index, call in calls.items()
+                                              if index not in results}
+    if pending:
+      results.update(_run_pool(min(jobs, len(pending)), pending, progress))
+  for index in sorted(set(calls) - set(results)):
+    results.update(_run_pool(1, {index: calls[index]}, progress))
+    if index not in results:
+      directory, fonts = families[index]
+      results[index] = {'family': directory
+                      , 'fonts': fonts
+                      , 'report': None
+                      , 'summary': {}
+                      , 'worst_status': None
+                      , 'error': 'The worker process died.'}
+      if progress:
+        progress(results[index])
+  return [results[index] for index in range(len(families))]
+
+
+def get_summary(results):
+  total = Counter()
+  for result in results:
+    total.update(result['summary'])
+  return {'families': results
+        , 'total': dict(total)
+        , 'failed_families': [result['family'] for result in results
+                                                    if result['error']]}
+
+
+def main(args=None):
+  description = ('Check all families of a font collection. Each directory'
+                 ' that contains fonts is checked as one family.')
+  argument_parser = argparse.ArgumentParser(description=description)
+  argument_parser.add_argument('root', metavar='ROOT',
+                      help='The root directory of the collection.')
+  argument_parser.add_argument('-o', '--output-dir', required=True,
+                      help='Write the reports of the families and the summary'
+                           ' to OUTPUT_DIR.')
+  argument_parser.add_argument('--profile', default='googlefonts',
+                      help='A module name, file name or the name of a profile'
+                           ' of fontbakery.profiles (default: %(default)s).')
+  argument_parser.add_argument('--pattern', action='append', default=None,
+                      help='Font files are the files matching PATTERN'
+                           ' (default: *.ttf). Can be used multiple times.')
+  argument_parser.add_argument('-c', '--checkid', action='append',
+                      help='Explicit check-ids (or parts of their name) to be'
+                           ' executed. Use this option multiple times to'
+                           ' select multiple checks.')
+  argument_parser.add_argument('-x', '--exclude-checkid', action='append',
+                      help='Exclude check-ids (or parts of their name) from'
+                           ' execution. Use this option multiple times to'
+                           ' exclude multiple checks.')
+  argument_parser.add_argument('-j', '--jobs', type=int, default=None,
+                      help='The number of worker processes, by default the'
+                           ' number of CPUs.')
+  argument_parser.add_argument('--link-cache', default=None,
+                      metavar='DIRECTORY',
+                      help='Store the results of link checks in DIRECTORY,'
+                           ' shared by all families and later runs.')
+  argument_parser.add_argument('--link-cache-ttl', default=24 * 60 * 60,
+                      type=int, metavar='SECONDS',
+                      help='How long the results of link checks are reused'
+                           ' (default: %(default)s).')
+  argument_parser.add_argument('--offline-links', default=False,
+                      action='store_true',
+                      help='Don\'t request any links, only use the results'
+                           ' of the link cache.')
+  argument_parser.add_argument('--download-cache', default=None,
+                      metavar='DIRECTORY',
+                      help='Keep downloaded files in DIRECTORY, shared by all'
+                           ' families and later runs. By default nothing is'
+                           ' stored.')
+  argument_parser.add_argument('--offline-downloads', default=False,
+                      action='store_true',
+                      help='Don\'t download anything, use the files of the'
+                           ' download cache or of --download-mirror.')
+  argument_parser.add_argument('--download-mirror', default=None,
+                      metavar='DIRECTORY',
+                      help='With --offline-downloads, use the files of'
+                           ' DIRECTORY/<host>/<path> of the URLs.')
+  args = argument_parser.parse_args(args)
+
+  # inherited by the forked worker processes
+  configure_link_checker(cache_directory=args.link_cache,
+                         ttl=args.link_cache_ttl,
+                         offline=args.offline_links)
+  configure_downloads(root=args.download_cache,
+                      offline=args.offline_downloads,
+                      mirror=args.download_mirror)
+  families = find_families(args.root, args.pattern or ('*.ttf', ))
+  print(f'Checking {len(families)} families.', file=sys.stderr)
+  runner_kwds = {'explicit_checks': args.checkid
+               , 'exclude_checks': args.exclude_checkid}
+  def progress(result):
+    status = 'FAILED' if result['error'] else result['worst_status']
+    print(f'{status}: {result["family"]}', file=sys.stderr)
+
+  # This module is run as __main__ by `fontbakery batch`, the worker
+  # processes can only unpickle functions of the importable module.
+  from fontbakery.commands.batch import check_collection
+  results = check_collection(args.profile, families, args.output_dir,
+                             jobs=args.jobs, runner_kwds=runner_kwds,
+                             root=args.root, progress=progress)
+  summary = get_summary(results)
+  os.makedirs(args.output_dir, exist_ok=True)
+  summary_file = os.path.join(args.output_dir, SUMMARY_FILENAME)
+  with open(summary_file, 'w', encoding='utf-8') as f:
+    json.dump(summary, f, sort_keys=True, indent=4)
+  print(f'Total: {summary["total"]}', file=sys.stderr)
+  print(f'The summary has been saved to \'{summary_file}\'', file=sys.stderr)
+
+  bad = (ERROR.name, FAIL.name)
+  if summary['failed_families'] \
+          or any(result['worst_status'] in bad for result in results):
+    return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -2,7 +2,6 @@
 import sys
 
 from functools import partial
-from fontbakery.profiles.fontval import profile
 from fontbakery.commands.check_profile import (
     runner_factory as super_runner_factory, main as super_main)
 
@@ -10,11 +9,12 @@ from fontbakery.commands.check_profile import (
 # It is here in order to have a single place from which
 # the profile is configured for the CLI and the worker.
 def runner_factory(fonts):
+    from fontbakery.profiles.fontval import profile
     values = {}
     values['fonts'] = fonts
     return super_runner_factory(profile, values=values)
 
-main = partial(super_main, profile)
+main = partial(super_main, 'fontbakery.profiles.fontval')
 
 
 if __name__ == '__main__':
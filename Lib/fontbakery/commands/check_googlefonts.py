@@ -2,7 +2,6 @@
 import sys
 
 from functools import partial
-from fontbakery.profiles.googlefonts import profile
 from fontbakery.commands.check_profile import (
     runner_factory as super_runner_factory, main as super_main)
 
@@ -16,12 +15,14 @@ GOOGLEFONTS_SPECIFICS = {}
 # It is here in order to have a single place from which
 # the profile is configured for the CLI and the worker.
 def runner_factory(fonts):
+    from fontbakery.profiles.googlefonts import profile
     values = {}
     values.update(GOOGLEFONTS_SPECIFICS)
     values['fonts'] = fonts
     return super_runner_factory(profile, values=values)
 
-main = partial(super_main, profile, values=GOOGLEFONTS_SPECIFICS)
+main = partial(super_main, 'fontbakery.profiles.googlefonts',
+               values=GOOGLEFONTS_SPECIFICS)
 
 
 if __name__ == '__main__':
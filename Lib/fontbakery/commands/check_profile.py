@@ -13,6 +13,10 @@ from fontbakery.checkrunner import (
             , ValueValidationError
             , Profile
             , get_module_profile
+            , RefCountConditionCache
+            , LRUConditionCache
+            , PersistentConditionCache
+            , ResultStore
             , DEBUG
             , INFO
             , WARN
@@ -36,10 +40,9 @@ log_levels =  OrderedDict((s.name,s) for s in sorted((
 
 DEFAULT_LOG_LEVEL = WARN
 
-from fontbakery.reporters.terminal import TerminalReporter
-from fontbakery.reporters.serialize import SerializeReporter
-from fontbakery.reporters.ghmarkdown import GHMarkdownReporter
-from fontbakery.reporters.html import HTMLReporter
+# The other reporters are imported when their option is given, to keep the
+# start (e.g. for --help and --list-checks) fast.
+from fontbakery.reporters.terminal import TerminalReporter, TIMING_TABLE_LENGTH
 
 def ArgumentParser(profile, profile_arg=True):
   argument_parser = argparse.ArgumentParser(description="Check TTF files"
@@ -113,6 +116,10 @@ def ArgumentParser(profile, profile_arg=True):
                       help='Show section start and end info plus summary.')
 
 
+  argument_parser.add_argument('--show-timing', default=False, action='store_true',
+                      help='Show the {} slowest checks and conditions.'.format(
+                                                      TIMING_TABLE_LENGTH))
+
   argument_parser.add_argument('-L', '--list-checks', default=False, action='store_true',
                       help='List the checks available in the selected profile.')
 
@@ -129,6 +136,113 @@ def ArgumentParser(profile, profile_arg=True):
                       metavar= 'HTML_FILE',
                       help='Write a HTML report to HTML_FILE.')
 
+  argument_parser.add_argument('--trace', default=False, type=argparse.FileType('w'),
+                      metavar= 'TRACE_FILE',
+                      help='Write the timing of all checks and conditions to\n'
+                           'TRACE_FILE, in the Chrome Trace Event Format\n'
+                           '(e.g. for Perfetto or chrome://tracing).')
+
+  argument_parser.add_argument('-j', '--jobs', default=1, type=int,
+                      metavar='JOBS',
+                      help='Number of worker processes used to run the checks.\n'
+                           'Checks are distributed to the workers by the first\n'
+                           'iterated argument (e.g. by font), checks that don\'t\n'
+                           'use it (e.g. family checks) run after the others.\n'
+                           'Use 0 for the number of available CPUs.\n'
+                           '(default: 1)')
+
+  argument_parser.add_argument('--io-threads', default=0, type=int,
+                      metavar='THREADS',
+                      help='Number of threads used to run checks that mostly\n'
+                           'wait for external tools (e.g. ots, fontforge) in\n'
+                           'parallel to the other checks. Only for profiles\n'
+                           'whose io_bound checks are thread safe.\n'
+                           '(default: 0, run them in order)')
+
+  argument_parser.add_argument('--cost-file', default=None,
+                      metavar='COST_FILE',
+                      help='JSON file with the wall times of the checks of\n'
+                           'previous runs. The most expensive checks are\n'
+                           'started first. The file is created or updated\n'
+                           'with the timing of this run.')
+
+  argument_parser.add_argument('--condition-cache', default='keep-all',
+                      choices=('keep-all', 'refcount', 'lru'),
+                      help='Policy used to keep evaluated conditions (e.g. the\n'
+                           'parsed fonts) in memory:\n'
+                           '"keep-all" -- until the end of the run\n'
+                           '"refcount" -- until the last check that needs them is done\n'
+                           '"lru"      -- the most recently used ones, within the\n'
+                           '              budget set by --condition-cache-max-memory\n'
+                           '(default: keep-all)')
+
+  argument_parser.add_argument('--condition-cache-max-memory', default=1024,
+                      type=int, metavar='MEGABYTES',
+                      help='Memory budget of the "lru" condition cache,\n'
+                           'per process. (default: 1024)')
+
+  argument_parser.add_argument('--check-timeout', default=None, type=float,
+                      metavar='SECONDS',
+                      help='Maximum wall time of each check execution. Checks\n'
+                           'that take longer are stopped and reported as ERROR.\n'
+                           'Checks can set their own limit. Also the maximum\n'
+                           'time FontForge may take to validate a font\n'
+                           '(default: 10 minutes).')
+
+  argument_parser.add_argument('--check-max-memory', default=None, type=int,
+                      metavar='MEGABYTES',
+                      help='Maximum resident memory of each check execution,\n'
+                           'including the tools it runs. Checks that use more\n'
+                           'are stopped and reported as ERROR. Checks can set\n'
+                           'their own limit. Without --check-timeout, checks\n'
+                           'are stopped after 30 minutes.')
+
+  argument_parser.add_argument('--persistent-cache', default=None,
+                      metavar='DIRECTORY',
+                      help='Store the results of expensive conditions (e.g.\n'
+                           'external tools) in DIRECTORY and reuse them in\n'
+                           'later runs, as long as the font files are unchanged.')
+
+  argument_parser.add_argument('--result-store', default=None,
+                      metavar='DIRECTORY',
+                      help='Store the results of the checks in DIRECTORY.\n'
+                           'Checks are not executed again if neither their\n'
+                           'code nor the font files changed, the stored\n'
+                           'results are reported instead.')
+
+  argument_parser.add_argument('--link-cache', default=None,
+                      metavar='DIRECTORY',
+                      help='Store the results of link checks (e.g. of the\n'
+                           'links in DESCRIPTION files) in DIRECTORY and reuse\n'
+                           'them in later runs, see --link-cache-ttl.')
+
+  argument_parser.add_argument('--link-cache-ttl', default=24 * 60 * 60,
+                      type=int, metavar='SECONDS',
+                      help='How long the results of link checks are reused.\n'
+                           '(default: %(default)s)')
+
+  argument_parser.add_argument('--offline-links', default=False,
+                      action='store_true',
+                      help='Don\'t request any links, only use the results\n'
+                           'of the link cache.')
+
+  argument_parser.add_argument('--download-cache', default=None,
+                      metavar='DIRECTORY',
+                      help='Keep downloaded files (e.g. the families hosted\n'
+                           'on Google Fonts) in DIRECTORY, they are only\n'
+                           'downloaded again when they changed. By default\n'
+                           'nothing is stored.')
+
+  argument_parser.add_argument('--offline-downloads', default=False,
+                      action='store_true',
+                      help='Don\'t download anything, use the files of the\n'
+                           'download cache or of --download-mirror.')
+
+  argument_parser.add_argument('--download-mirror', default=None,
+                      metavar='DIRECTORY',
+                      help='With --offline-downloads, use the files of\n'
+                           'DIRECTORY/<host>/<path> of the URLs.')
+
   iterargs = sorted(profile.iterargs.keys())
 
   gather_by_choices = iterargs + ['*check']
@@ -190,48 +304,119 @@ def get_module(name):
     imported = import_module(name, package=None)
   return imported
 
-def get_profile():
-  """ Prefetch the profile module, to fill some holes in the help text."""
+def get_profile_module(name):
+  """ Like `get_module`, also accepts the short name of a module of
+  `fontbakery.profiles`, e.g. "googlefonts".
+  """
+  try:
+    return get_module(name)
+  except ImportError:
+    if '.' in name or os.path.sep in name:
+      raise
+    return get_module(f'fontbakery.profiles.{name}')
+
+def get_profile_name():
+  """ Prefetch the profile argument, None if there is none. """
   argument_parser = ThrowingArgumentParser(add_help=False)
   argument_parser.add_argument('profile')
   try:
     args, _ = argument_parser.parse_known_args()
   except ArgumentParserError:
+    return None
+  return args.profile
+
+def get_profile(name=None):
+  """ Prefetch the profile module, to fill some holes in the help text."""
+  if name is None:
+    name = get_profile_name()
+  if name is None:
     # silently fails, the main parser will show usage string.
     return Profile()
-  imported = get_module(args.profile)
+  imported = get_profile_module(name)
   profile = get_module_profile(imported)
   if not profile:
     raise Exception(f"Can't get a profile from {imported}.")
   return profile
 
+def print_checks(sections, verbose=False):
+  """ Prints the checks of `sections`, a list of
+  (section name, [(check id, description), ...]), for --list-checks.
+  """
+  if verbose:
+    from fontbakery.constants import WHITE_STR, CYAN_STR, BLUE_STR
+    for section_name, checks in sections:
+      print(WHITE_STR.format("\nSection:") + " " + section_name)
+      for check_id, description in checks:
+        print(CYAN_STR.format(check_id) + "\n" +
+              BLUE_STR.format(f'"{description}"') + "\n")
+  else:
+    for _, checks in sections:
+      for check_id, _ in checks:
+        print(check_id)
+
+def list_checks_from_manifest(name):
+  """ --list-checks of the profile `name` with the profile manifest, i.e.
+  without importing the profile. Returns False if the command line is not
+  a --list-checks or if the profile is not in the manifest, the profile
+  is then imported as usual.
+  """
+  from fontbakery.manifest import get_profile_manifest, select_checks
+  if name is None or '-h' in sys.argv or '--help' in sys.argv:
+    return False
+  argument_parser = ThrowingArgumentParser(add_help=False, allow_abbrev=False)
+  argument_parser.add_argument('-L', '--list-checks', action='store_true')
+  argument_parser.add_argument('-c', '--checkid', action='append')
+  argument_parser.add_argument('-x', '--exclude-checkid', action='append')
+  argument_parser.add_argument('-v', '--verbose', dest='loglevels',
+                               const=PASS.name, action='append_const')
+  argument_parser.add_argument('-l', '--loglevel', dest='loglevels',
+                               action='append')
+  try:
+    args, _ = argument_parser.parse_known_args()
+  except ArgumentParserError:
+    return False
+  if not args.list_checks or any(level not in log_levels
+                                 for level in args.loglevels or []):
+    return False
+  sections = get_profile_manifest(name)
+  if sections is None:
+    return False
+  sections = select_checks(sections, args.checkid, args.exclude_checkid)
+  print_checks([(section_name, [(check_id, check['description'])
+                                for check_id, check in checks])
+                for section_name, checks in sections],
+               verbose=args.loglevels == [PASS.name])
+  return True
+
 # This stub or alias is kept for compatibility (e.g. check-commands, FontBakery
 # Dashboard). The function of the same name previously only passed on all parameters to
 # CheckRunner.
 runner_factory = CheckRunner
 
 def main(profile=None, values=None):
-  # profile can be injected by e.g. check-googlefonts injects it's own profile
+  # profile can be injected by e.g. check-googlefonts injects it's own profile,
+  # or the name of its module, to list the checks without importing it
   add_profile_arg = False
   if profile is None:
-    profile = get_profile()
+    profile = get_profile_name()
     add_profile_arg = True
+  if profile is None or isinstance(profile, str):
+    if list_checks_from_manifest(profile):
+      sys.exit()
+    profile = get_profile(profile)
 
   argument_parser, values_keys = ArgumentParser(profile, profile_arg=add_profile_arg)
   args = argument_parser.parse_args()
 
   if args.list_checks:
-    if args.loglevels == [PASS]: # if verbose:
-      from fontbakery.constants import WHITE_STR, CYAN_STR, BLUE_STR
-      for section in profile._sections.values():
-        print(WHITE_STR.format("\nSection:") + " " + section.name)
-        for check in section._checks:
-          print(CYAN_STR.format(check.id) + "\n" +
-                BLUE_STR.format(f'"{check.description}"') + "\n")
-    else:
-      for section_name, section in profile._sections.items():
-        for check in section._checks:
-          print(check.id)
+    from fontbakery.manifest import is_selected
+    sections = []
+    for section in profile._sections.values():
+      checks = [(check.id, check.description) for check in section._checks
+                   if is_selected(check.id, args.checkid, args.exclude_checkid)]
+      if checks or not (args.checkid or args.exclude_checkid):
+        sections.append((section.name, checks))
+    print_checks(sections, verbose=args.loglevels == [PASS])
     sys.exit()
 
   values_ = {}
@@ -245,12 +430,59 @@ def main(profile=None, values=None):
       if hasattr(args, key):
         values_[key] = getattr(args, key)
 
+  runner_kwds = {}
+  if args.condition_cache == 'refcount':
+    runner_kwds['condition_cache'] = RefCountConditionCache()
+  elif args.condition_cache == 'lru':
+    max_bytes = args.condition_cache_max_memory * 1024 * 1024
+    runner_kwds['condition_cache'] = LRUConditionCache(max_bytes)
+  if args.persistent_cache:
+    runner_kwds['persistent_cache'] = \
+                      PersistentConditionCache(args.persistent_cache)
+  if args.result_store:
+    runner_kwds['result_store'] = ResultStore(args.result_store)
+  from fontbakery.linkcheck import configure_link_checker
+  from fontbakery.downloads import configure_downloads
+  configure_link_checker(cache_directory=args.link_cache,
+                         ttl=args.link_cache_ttl,
+                         offline=args.offline_links)
+  configure_downloads(root=args.download_cache,
+                      offline=args.offline_downloads,
+                      mirror=args.download_mirror)
+
+  if args.check_timeout:
+    from fontbakery.fontforgeworker import configure_fontforge_pool
+    runner_kwds['check_timeout'] = args.check_timeout
+    configure_fontforge_pool(timeout=args.check_timeout)
+  if args.check_max_memory:
+    runner_kwds['check_max_rss'] = args.check_max_memory * 1024 * 1024
+
+  runner_kwds['io_threads'] = args.io_threads
+  previous_costs = None
+  if args.cost_file and os.path.exists(args.cost_file):
+    import json
+    with open(args.cost_file, encoding='utf-8') as f:
+      previous_costs = json.load(f)
+    runner_kwds['check_costs'] = previous_costs
+
+  # Timing is also written to the JSON report.
+  runner_kwds['timing'] = bool(args.show_timing or args.json or args.trace
+                                                          or args.cost_file)
+
+  if args.jobs == 1:
+    runner_class = CheckRunner
+  else:
+    from fontbakery.multiproc import MultiprocessingRunner
+    runner_class = MultiprocessingRunner
+    runner_kwds['jobs'] = args.jobs or None
+
   try:
-    runner = CheckRunner(profile
+    runner = runner_class(profile
                         , values=values_
                         , custom_order=args.order
                         , explicit_checks=args.checkid
                         , exclude_checks=args.exclude_checkid
+                        , **runner_kwds
                         )
   except ValueValidationError as e:
     print(e)
@@ -271,6 +503,7 @@ def main(profile=None, values=None):
                        , log_threshold=args.loglevel_messages or loglevel
                        , usecolor=not args.no_colors
                        , collect_results_by=args.gather_by
+                       , show_timing=args.show_timing
                        , skip_status_report=None if args.show_sections\
                                                       else (STARTSECTION, ENDSECTION)
 
@@ -278,21 +511,34 @@ def main(profile=None, values=None):
   reporters = [tr.receive]
 
   if args.json:
+    from fontbakery.reporters.serialize import SerializeReporter
     sr = SerializeReporter(runner=runner, collect_results_by=args.gather_by)
     reporters.append(sr.receive)
 
   if args.ghmarkdown:
+    from fontbakery.reporters.ghmarkdown import GHMarkdownReporter
     mdr = GHMarkdownReporter(loglevels=args.loglevels,
                              runner=runner,
                              collect_results_by=args.gather_by)
     reporters.append(mdr.receive)
 
   if args.html:
+    from fontbakery.reporters.html import HTMLReporter
     hr = HTMLReporter(loglevels=args.loglevels,
                       runner=runner,
                       collect_results_by=args.gather_by)
     reporters.append(hr.receive)
 
+  if args.trace:
+    from fontbakery.reporters.trace import TraceReporter
+    trr = TraceReporter(runner=runner)
+    reporters.append(trr.receive)
+
+  if args.cost_file:
+    from fontbakery.reporters.costs import CostsReporter
+    cr = CostsReporter(runner=runner, costs=previous_costs)
+    reporters.append(cr.receive)
+
   distribute_generator(runner.run(), reporters)
 
   if args.json:
@@ -311,6 +557,16 @@ def main(profile=None, values=None):
     args.html.write(hr.get_html())
     print(f"A report in HTML format has been saved to '{args.html.name}'")
 
+  if args.trace:
+    import json
+    json.dump(trr.getdoc(), args.trace)
+    print(f"A trace of the run has been saved to '{args.trace.name}'")
+
+  if args.cost_file:
+    import json
+    with open(args.cost_file, 'w', encoding='utf-8') as f:
+      json.dump(cr.getdoc(), f, sort_keys=True, indent=2)
+
   # Fail and error let the command fail
   return 1 if tr.worst_check_status in (ERROR, FAIL) else 0
 
@@ -4,7 +4,6 @@ from functools import partial
 
 from fontbakery.commands.check_profile import (
     runner_factory as super_runner_factory, main as super_main)
-from fontbakery.profiles.ufo_sources import profile
 
 # The values dict will probably get one or more specific blacklists
 # for the google font project. It would be good if it was not necessary
@@ -17,13 +16,15 @@ GOOGLEFONTS_SPECIFICS = {}
 # It is here in order to have a single place from which
 # the profile is configured for the CLI and the worker.
 def runner_factory(fonts):
+    from fontbakery.profiles.ufo_sources import profile
     values = {}
     values.update(GOOGLEFONTS_SPECIFICS)
     values['fonts'] = fonts
     return super_runner_factory(profile, values=values)
 
 
-main = partial(super_main, profile, values=GOOGLEFONTS_SPECIFICS)
+main = partial(super_main, 'fontbakery.profiles.ufo_sources',
+               values=GOOGLEFONTS_SPECIFICS)
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -1,6 +1,6 @@
-"""Generate FontBakery's desired_glyph_data.json file.
+"""Generate FontBakery's desired glyph data file, data/desired_glyph_data.bin.
 
-The desired_glyph_data.json file contains the 'recommended' countour count
+The desired glyph data contains the 'recommended' countour count
 for encoded glyphs. The contour counts are derived from fonts which were
 chosen for their quality and unique design decisions for particular glyphs.
 
@@ -14,24 +14,16 @@ display family.
 
 In the future, additional glyph data can be included. A good addition would
 be the 'recommended' anchor counts for each glyph.
+
+The file is a compact binary index, see fontbakery.glyphdata.
 """
-import json
-import os
 import sys
 
+from fontbakery.glyphdata import GLYPH_DATA_PATH, write_glyph_data_index
 from fontbakery.utils import download_file, get_font_glyph_data
 from fontTools.ttLib import TTFont
 
 
-class JsonSetEncoder(json.JSONEncoder):
-    """Serialise Set objects for json module."""
-
-    def default(self, obj):  # pylint: disable=arguments-differ,method-hidden
-        if isinstance(obj, set):
-            return list(obj)
-        return json.JSONEncoder.default(self, obj)
-
-
 def collate_fonts_data(fonts_data):
     """Collate individual fonts data into a single glyph data list."""
     glyphs = {}
@@ -88,12 +80,8 @@ def main():
     print('Collating font data into glyph data file')
     glyph_data = collate_fonts_data(fonts_data)
 
-    script_path = os.path.dirname(__file__)
-    glyph_data_path = os.path.join(script_path, '..', 'desired_glyph_data.json')
-
-    print(f'Saving to {glyph_data_path}')
-    with open(glyph_data_path, 'w') as glyph_file:
-        json.dump(glyph_data, glyph_file, indent=4, cls=JsonSetEncoder)
+    print(f'Saving to {GLYPH_DATA_PATH}')
+    write_glyph_data_index(GLYPH_DATA_PATH, glyph_data)
     print('done')
 
 
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# usage:
+# $ fontbakery generate-profile-manifest
+"""
+Update the profile manifest shipped with Font Bakery.
+
+Imports the profiles and writes the ids, descriptions, rationales,
+conditions, sections and modules of their checks to
+data/profile-manifest.json, see fontbakery.manifest. Run it after changing
+a profile, the manifest is not used while it doesn't match the profiles.
+"""
+import argparse
+import sys
+
+from fontbakery.manifest import (
+              MANIFEST_PATH
+            , PROFILE_MODULES
+            , build_manifest
+            , write_manifest
+            )
+
+
+def main(args=None):
+  description = ('Write the manifest of the checks of the profiles shipped'
+                 ' with Font Bakery, used to list and select checks without'
+                 ' importing the profiles.')
+  argument_parser = argparse.ArgumentParser(description=description)
+  argument_parser.add_argument('-o', '--output', default=MANIFEST_PATH,
+                      help='Write the manifest to OUTPUT'
+                           ' (default: %(default)s).')
+  args = argument_parser.parse_args(args)
+
+  manifest = build_manifest(PROFILE_MODULES)
+  write_manifest(args.output, manifest)
+  print(f'Saved {len(manifest["checks"])} checks of'
+        f' {len(manifest["profiles"])} profiles to \'{args.output}\'',
+        file=sys.stderr)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# usage:
+# $ fontbakery serve --preload fontbakery.profiles.googlefonts
+#
+# $ fontbakery serve --socket /tmp/fontbakery.sock
+#
+# Reads one job per line from stdin (or from each connection to the unix
+# domain socket), a JSON object like:
+#   {"id": "job-1", "profile": "fontbakery.profiles.googlefonts",
+#    "fonts": ["Family-Regular.ttf"], "checkid": ["/check/name/"],
+#    "exclude_checkid": [], "values": {}}
+# Only "profile" and "fonts" are required. For each job, one JSON object
+# per line is written to stdout for each event of the check runner
+# protocol, see `serialize_event`, then a last one with "done": true.
+# Connections to the socket are served one after another.
+"""
+A long-lived worker process, that runs check jobs with profiles that are
+loaded only once.
+
+Profiles are imported on their first use or at startup (--preload).
+Conditions that have no arguments at all (e.g. the list of registered
+vendor ids) are evaluated once per profile and shared by all jobs.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+
+from fontbakery.checkrunner import (
+              CheckRunner
+            , ConditionCache
+            , get_module_profile
+            , DEBUG
+            , START
+            , STARTSECTION
+            , ENDCHECK
+            , ENDSECTION
+            , END
+            , TIMING
+            )
+from fontbakery.commands.check_profile import get_profile_module
+
+
+def serialize_event(event):
+  """ Returns a JSON serializable dict for an event of the check runner
+  protocol.
+  """
+  status, message, (section, check, iterargs) = event
+  data = {'status': status.name}
+  if section is not None:
+    data['section'] = section.name
+  if check is not None:
+    data['check'] = check.id
+  if iterargs:
+    data['iterargs'] = dict(iterargs)
+
+  if status == START:
+    data['message'] = [{'section': section.name
+                      , 'check': check.id
+                      , 'iterargs': dict(iterargs)}
+                        for section, check, iterargs in message]
+  elif status == STARTSECTION:
+    data['message'] = len(message)
+  elif status in (ENDSECTION, END):
+    data['message'] = dict(message) # is a Counter
+  elif status == ENDCHECK:
+    data['message'] = message.name # is a Status
+  elif status == TIMING:
+    data['message'] = message # is a dict
+  elif status >= DEBUG:
+    data['message'] = f'{message}'
+    code = getattr(message, 'code', None)
+    if code is not None:
+      data['code'] = code
+    traceback_ = getattr(message, 'traceback', None)
+    if traceback_ is not None:
+      data['traceback'] = traceback_
+  return data
+
+
+class Server:
+  def __init__(self, runner_kwds=None):
+    self._runner_kwds = runner_kwds or {}
+    self._profiles = {}
+    # {profile name: {condition key: (error, value)}}
+    self._shared_conditions = {}
+
+  def get_profile(self, name):
+    if name not in self._profiles:
+      profile = get_module_profile(get_profile_module(name))
+      if not profile:
+        raise ValueError(f'Can\'t get a profile from "{name}".')
+      self._profiles[name] = profile
+      self._shared_conditions[name] = {}
+    return self._profiles[name]
+
+  def _keep_shared_conditions(self, name, profile, condition_cache):
+    shared = self._shared_conditions[name]
+    for key, (error, value) in condition_cache.items():
+      condition_name, used_iterargs = key
+      condition = profile.conditions.get(condition_name, None)
+      if error is None and condition is not None and not condition.args \
+                                                 and not used_iterargs:
+        shared[key] = (error, value)
+
+  def run_job(self, job, write):
+    """ Runs the checks of `job`, `write` is called with a JSON serializable
+    dict for each event.
+    """
+    job_id = job.get('id', None)
+    name = job['profile']
+    profile = self.get_profile(name)
+    values = dict(job.get('values', None) or {})
+    values['fonts'] = job['fonts']
+
+    condition_cache = ConditionCache()
+    for key, value in self._shared_conditions[name].items():
+      condition_cache[key] = value
+    runner = CheckRunner(profile
+                       , values=values
+                       , explicit_checks=job.get('checkid', None)
+                       , exclude_checks=job.get('exclude_checkid', None)
+                       , condition_cache=condition_cache
+                       , **self._runner_kwds
+                       )
+    worst_status = None
+    for event in runner.run():
+      status, message, _ = event
+      if status == ENDCHECK and (worst_status is None or message > worst_status):
+        worst_status = message
+      data = serialize_event(event)
+      data['id'] = job_id
+      write(data)
+    self._keep_shared_conditions(name, profile, condition_cache)
+    write({'id': job_id
+         , 'done': True
+         , 'worst_status': worst_status.name if worst_status else None})
+
+  def serve(self, lines, write):
+    """ Runs a job for each of `lines`. Errors are reported per job. """
+    for line in lines:
+      line = line.strip()
+      if not line:
+        continue
+      job_id = None
+      try:
+        job = json.loads(line)
+        job_id = job.get('id', None)
+        self.run_job(job, write)
+      except Exception as e:
+        write({'id': job_id
+             , 'done': True
+             , 'error': f'{type(e).__name__}: {e}'
+             , 'traceback': traceback.format_exc()})
+
+
+def _get_writer(stream):
+  def write(data):
+    stream.write(json.dumps(data, default=str) + '\n')
+    stream.flush()
+  return write
+
+
+def _serve_socket(server, path, ready):
+  listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    listener.bind(path)
+    listener.listen()
+    ready()
+    while True:
+      connection, _ = listener.accept()
+      with connection, connection.makefile('r', encoding='utf-8') as reader, \
+                       connection.makefile('w', encoding='utf-8') as writer:
+        try:
+          server.serve(reader, _get_writer(writer))
+        except (BrokenPipeError, ConnectionResetError):
+          pass # the client went away
+  finally:
+    listener.close()
+    if os.path.exists(path):
+      os.unlink(path)
+
+
+def main(args=None):
+  description = ('Run check jobs read as JSON lines from stdin and write'
+                 ' the events as JSON lines to stdout. Profiles are loaded'
+                 ' only once.')
+  argument_parser = argparse.ArgumentParser(description=description)
+  argument_parser.add_argument('--preload', action='append', default=[],
+                      metavar='PROFILE',
+                      help='Load PROFILE (a module name, file name or the name'
+                           ' of a profile of fontbakery.profiles) at startup.'
+                           ' Can be used multiple times.')
+  argument_parser.add_argument('--socket', default=None, metavar='PATH',
+                      help='Read the jobs from connections to a unix domain'
+                           ' socket created at PATH instead of stdin.')
+  argument_parser.add_argument('--timing', default=False, action='store_true',
+                      help='Emit TIMING events.')
+  args = argument_parser.parse_args(args)
+
+  server = Server(runner_kwds={'timing': args.timing})
+  for name in args.preload:
+    server.get_profile(name)
+
+  # Checks may print, only the protocol goes to stdout.
+  out = sys.stdout
+  sys.stdout = sys.stderr
+  write = _get_writer(out)
+  ready = lambda: write({'ready': True, 'profiles': args.preload})
+  if args.socket:
+    # the socket file is removed on exit
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+      _serve_socket(server, args.socket, ready)
+    except KeyboardInterrupt:
+      pass
+  else:
+    ready()
+    server.serve(sys.stdin, write)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
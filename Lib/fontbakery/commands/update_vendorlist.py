@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# usage:
+# $ fontbakery update-vendorlist
+#
+# $ fontbakery update-vendorlist --offline
+"""
+Update the registered vendor IDs shipped with Font Bakery.
+
+Downloads Microsoft's vendor list page to
+data/fontbakery-microsoft-vendorlist.cache and converts it to
+data/fontbakery-microsoft-vendorlist.json, see fontbakery.vendorlist.
+"""
+import argparse
+import sys
+
+from fontbakery.vendorlist import (
+              VENDOR_IDS_PATH
+            , VENDOR_LIST_HTML_PATH
+            , VENDOR_LIST_URL
+            , parse_vendor_list
+            , write_vendor_ids
+            )
+
+
+def main(args=None):
+  description = ('Download the list of registered vendor IDs from Microsoft'
+                 ' and convert it to the JSON file that is shipped with'
+                 ' Font Bakery.')
+  argument_parser = argparse.ArgumentParser(description=description)
+  argument_parser.add_argument('--url', default=VENDOR_LIST_URL,
+                      help='The URL of the vendor list (default: %(default)s).')
+  argument_parser.add_argument('--offline', default=False, action='store_true',
+                      help='Don\'t download the vendor list, only convert the'
+                           ' cached copy.')
+  argument_parser.add_argument('-o', '--output', default=VENDOR_IDS_PATH,
+                      help='Write the vendor IDs to OUTPUT'
+                           ' (default: %(default)s).')
+  args = argument_parser.parse_args(args)
+
+  if not args.offline:
+    from fontbakery.utils import download_file
+    print(f'Downloading {args.url}', file=sys.stderr)
+    content = download_file(args.url).read().decode('utf-8')
+    with open(VENDOR_LIST_HTML_PATH, 'w', encoding='utf-8') as f:
+      f.write(content)
+  else:
+    with open(VENDOR_LIST_HTML_PATH, encoding='utf-8') as f:
+      content = f.read()
+
+  vendor_ids = parse_vendor_list(content)
+  if not vendor_ids:
+    print('No vendor IDs found, the page format may have changed.',
+          file=sys.stderr)
+    return 1
+  write_vendor_ids(args.output, vendor_ids)
+  print(f'Saved {len(vendor_ids)} vendor IDs to \'{args.output}\'',
+        file=sys.stderr)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Font Bakery downloads keeps downloaded files (e.g. the families hosted on
+Google Fonts and their files in the google/fonts repository) on disk, so
+that checking the same family again doesn't download them again.
+
+`get_download_cache()` returns the `DownloadCache` of the process,
+configured with `configure_downloads` (e.g. by the command line options of
+the check commands). `DownloadCache.open(url)` returns a binary file with
+the contents of `url`. The cache is opt-in: without a root directory (the
+default) files are downloaded into memory each time, like before. With a
+root directory, `DownloadCache.fetch(url)` returns the path of a local copy
+of `url`:
+
+- Downloads are streamed to disk, into a content-addressed store below the
+  root directory (`objects/<sha256 of the content>`), so that the same
+  content is stored only once.
+- For each URL the digest of its content and the ETag and Last-Modified
+  headers of the response are kept. When the URL is fetched again, the
+  request is conditional (If-None-Match, If-Modified-Since) and the stored
+  content is used if the server answers 304 Not Modified.
+- In offline mode nothing is requested: the stored content is used, or the
+  file of a local mirror directory, at `<mirror>/<host>/<path>` of the URL,
+  followed by `?<query>` if the URL has one. A file missing from the mirror
+  is a DownloadError with status 404, like a file missing from the server.
+
+The root directory is shared by all processes and runs that use it, files
+are written to temporary files and renamed.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from fontbakery.checkrunner import DirectoryStore
+
+CHUNK_SIZE = 2**20
+DEFAULT_TIMEOUT = 60
+
+
+class DownloadError(Exception):
+  """ The download failed, `status` is the HTTP status code, if any. """
+  def __init__(self, url, message, status=None):
+    super(DownloadError, self).__init__(f'{url}: {message}')
+    self.url = url
+    self.status = status
+
+
+@contextmanager
+def _download_errors(url):
+  """ Raises the errors of `requests` as DownloadError, except for
+  certificate errors, which are usually a setup problem.
+  """
+  import requests
+  try:
+    yield
+  except requests.exceptions.SSLError as e:
+    if 'CERTIFICATE_VERIFY_FAILED' in str(e):
+      from fontbakery.utils import (BadCertificateSetupException,
+                                    BAD_CERTIFICATE_SETUP_MESSAGE)
+      raise BadCertificateSetupException(BAD_CERTIFICATE_SETUP_MESSAGE)
+    raise DownloadError(url, str(e))
+  except requests.exceptions.RequestException as e:
+    raise DownloadError(url, str(e))
+
+
+class DownloadIndex(DirectoryStore):
+  """ {SHA-256 of the URL: dict with digest, etag and last_modified} """
+
+
+class DownloadCache:
+  def __init__(self, root=None, offline=False, mirror=None,
+               timeout=DEFAULT_TIMEOUT, session=None):
+    """
+    root: the directory of the store. Without one, nothing is stored.
+    mirror: a directory with the files to use in offline mode.
+    session: a `requests.Session`, created on first use by default.
+    """
+    self.root = root
+    self.offline = offline
+    self.mirror = mirror
+    self._timeout = timeout
+    self._session = session
+    self._index = DownloadIndex(os.path.join(root, 'index')) \
+                                            if root is not None else None
+    self._lock = threading.Lock()
+    # number of responses with content, i.e. not 304
+    self.download_count = 0
+
+  def _get_session(self):
+    with self._lock:
+      if self._session is None:
+        import requests
+        self._session = requests.Session()
+      return self._session
+
+  @staticmethod
+  def _key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+  def object_path(self, digest):
+    return os.path.join(self.root, 'objects', digest[:2], digest)
+
+  def mirror_path(self, url):
+    parts = urlsplit(url)
+    path = os.path.join(self.mirror, parts.netloc,
+                        *[part for part in parts.path.split('/') if part])
+    if parts.query:
+      path += '?' + parts.query
+    return path
+
+  def _get_stored(self, url):
+    entry = self._index.get(self._key(url))
+    if entry is not None and os.path.exists(self.object_path(entry['digest'])):
+      return entry
+    return None
+
+  def _get_mirrored(self, url):
+    """ The path of the file of the mirror, for offline mode. The mirror
+    stands in for the server, a file missing from it is a 404.
+    """
+    if not self.mirror:
+      raise DownloadError(url, 'not available offline')
+    if not os.path.isfile(self.mirror_path(url)):
+      raise DownloadError(url, 'not in the mirror', 404)
+    return self.mirror_path(url)
+
+  def open(self, url):
+    """ Returns a binary file with the contents of `url`: the stored copy,
+    or without a root directory, the contents downloaded into memory (or
+    the file of the mirror in offline mode). Raises DownloadError.
+    """
+    if self.root is not None:
+      return open(self.fetch(url), 'rb')
+    if self.offline:
+      return open(self._get_mirrored(url), 'rb')
+    with _download_errors(url):
+      with self._get_session().get(url, timeout=self._timeout) as response:
+        if response.status_code != 200:
+          raise DownloadError(url, f'HTTP status {response.status_code}',
+                              response.status_code)
+        with self._lock:
+          self.download_count += 1
+        return BytesIO(response.content)
+
+  def fetch(self, url):
+    """ Returns the path of the local copy of `url`, the cache must have a
+    root directory. Raises DownloadError.
+    """
+    if self.root is None:
+      raise ValueError('DownloadCache.fetch requires a root directory.')
+    entry = self._get_stored(url)
+    if self.offline:
+      if entry is not None:
+        return self.object_path(entry['digest'])
+      return self._get_mirrored(url)
+
+    headers = {}
+    if entry is not None:
+      if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+      if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    with _download_errors(url), \
+         self._get_session().get(url, headers=headers, stream=True,
+                                 timeout=self._timeout) as response:
+      if response.status_code == 304 and entry is not None:
+        return self.object_path(entry['digest'])
+      if response.status_code != 200:
+        raise DownloadError(url, f'HTTP status {response.status_code}',
+                            response.status_code)
+      digest = self._store(response.iter_content(CHUNK_SIZE))
+      with self._lock:
+        self.download_count += 1
+      self._index[self._key(url)] = {
+          'url': url
+        , 'digest': digest
+        , 'etag': response.headers.get('ETag', None)
+        , 'last_modified': response.headers.get('Last-Modified', None)}
+      return self.object_path(digest)
+
+  def _store(self, chunks):
+    """ Writes `chunks` to the store, returns the SHA-256 digest. """
+    directory = os.path.join(self.root, 'objects')
+    os.makedirs(directory, exist_ok=True)
+    sha = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        for chunk in chunks:
+          sha.update(chunk)
+          f.write(chunk)
+      digest = sha.hexdigest()
+      path = self.object_path(digest)
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      os.replace(temp_path, path)
+    except BaseException:
+      if os.path.exists(temp_path):
+        os.unlink(temp_path)
+      raise
+    return digest
+
+
+_download_cache = None
+_configuration = {}
+_cache_lock = threading.Lock()
+def configure_downloads(**kwds):
+  """ Sets the keyword arguments of the `DownloadCache` of the process, the
+  next `get_download_cache` call creates a new one.
+  """
+  global _download_cache, _configuration
+  with _cache_lock:
+    _configuration = kwds
+    _download_cache = None
+
+
+def get_download_cache():
+  """ The `DownloadCache` of the process, see `configure_downloads`. """
+  global _download_cache
+  with _cache_lock:
+    if _download_cache is None:
+      _download_cache = DownloadCache(**_configuration)
+    return _download_cache
@@ -0,0 +1,316 @@
+"""
+Font Bakery fontforgeworker validates fonts with FontForge in long-lived
+worker processes, instead of starting a Python interpreter and importing
+the fontforge module for each font.
+
+A worker is this file, run as a script by a Python interpreter that has the
+fontforge module (`python` by default, like before, since the module
+usually belongs to the Python of the system). It imports fontforge once,
+then reads one JSON request per line from stdin, `{"path": <font path>}`,
+and writes one JSON response per line to stdout,
+`{"validation_state": <validate() bitmask>, "ff_err_messages": <stderr>}`.
+The first line it writes is
+`{"ready": true, "version": <FontForge version>}`, or `{"error": <message>}`
+if fontforge can't be imported. The messages FontForge prints while opening
+and validating a font are captured at the file descriptor level, since they
+don't come from Python.
+
+`get_fontforge_pool()` returns the `FontForgePool` of the process,
+configured with `configure_fontforge_pool`. It keeps up to `size` workers
+running, for all checks and all runs of the process. A worker that crashes
+(e.g. FontForge segfaults on a broken font) is detected by the end of its
+output, the font gets no result and the next request starts a new worker.
+A worker that doesn't answer within `timeout` seconds (e.g. FontForge loops
+on a broken font) is killed, the request raises `FontForgeTimeout` and the
+next one starts a new worker.
+
+This module must only import the standard library at the top level, it is
+run by a Python that may not have Font Bakery installed.
+"""
+import atexit
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+
+DEFAULT_PYTHON = 'python'
+# seconds
+DEFAULT_TIMEOUT = 10 * 60
+
+
+class FontForgeUnavailable(Exception):
+  pass
+
+
+class FontForgeTimeout(Exception):
+  pass
+
+
+class FontForgeWorker:
+  """ One worker process, started on the first `validate` call, and again
+  after it crashed or timed out.
+
+  timeout: the maximum time in seconds to wait for an answer of the worker,
+  None to wait forever.
+  """
+  def __init__(self, python=DEFAULT_PYTHON, timeout=DEFAULT_TIMEOUT):
+    self._python = python
+    self._timeout = timeout
+    self._process = None
+    self._version = None
+    # number of worker processes started
+    self.start_count = 0
+
+  def _start(self):
+    self._process = subprocess.Popen([self._python, os.path.abspath(__file__)],
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL)
+    self.start_count += 1
+    try:
+      hello = self._read()
+    except FontForgeTimeout as e:
+      self.close()
+      raise FontForgeUnavailable(f'{self._python} failed to start: {e}')
+    if hello is None or 'error' in hello:
+      self.close()
+      raise FontForgeUnavailable(hello['error'] if hello is not None
+                                 else f'{self._python} failed to start.')
+    self._version = hello.get('version')
+
+  def _read(self):
+    """ The next line of the worker, or None if it ended. Kills the worker
+    and raises `FontForgeTimeout` if there is none within the timeout.
+    """
+    process = self._process
+    expired = threading.Event()
+    def expire():
+      expired.set()
+      process.kill()
+    timer = None
+    if self._timeout is not None:
+      timer = threading.Timer(self._timeout, expire)
+      timer.daemon = True
+      timer.start()
+    try:
+      line = process.stdout.readline()
+    finally:
+      if timer is not None:
+        timer.cancel()
+    if not line:
+      if expired.is_set():
+        raise FontForgeTimeout('The FontForge worker did not answer within'
+                               f' {self._timeout} seconds and was killed.')
+      return None
+    return json.loads(line.decode('utf-8'))
+
+  def _ensure_started(self):
+    if self._process is None or self._process.poll() is not None:
+      self._start()
+
+  def version(self):
+    """ The version of FontForge, or None if it is unknown. Raises
+    `FontForgeUnavailable`.
+    """
+    self._ensure_started()
+    return self._version
+
+  def validate(self, path):
+    """ Returns `{"validation_state": int, "ff_err_messages": str}`, or None
+    if FontForge failed on the font or the worker crashed. Raises
+    `FontForgeUnavailable` and `FontForgeTimeout`.
+    """
+    self._ensure_started()
+    try:
+      request = json.dumps({'path': os.path.abspath(path)}) + '\n'
+      self._process.stdin.write(request.encode('utf-8'))
+      self._process.stdin.flush()
+      response = self._read()
+    except FontForgeTimeout:
+      # killed, the next request gets a new worker
+      self.close()
+      raise
+    except (OSError, ValueError):
+      response = None
+    if response is None:
+      # crashed, the next request gets a new worker
+      self.close()
+      return None
+    if 'error' in response:
+      # e.g. fontforge can't open the font
+      return None
+    return response
+
+  def close(self):
+    process, self._process = self._process, None
+    if process is None:
+      return
+    try:
+      process.stdin.close()
+    except OSError:
+      pass
+    try:
+      process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+      process.kill()
+      process.wait()
+    process.stdout.close()
+
+
+class FontForgePool:
+  """ Validates fonts with up to `size` `FontForgeWorker`s at the same time,
+  `size` is the number of CPUs by default. Thread-safe.
+  """
+  def __init__(self, size=None, python=DEFAULT_PYTHON, timeout=DEFAULT_TIMEOUT):
+    self._size = size or os.cpu_count() or 1
+    self._python = python
+    self._timeout = timeout
+    self._idle = deque()
+    self._workers = []
+    self._condition = threading.Condition()
+    self._unavailable = None
+    self._pid = os.getpid()
+
+  def _acquire(self):
+    with self._condition:
+      while True:
+        if self._unavailable is not None:
+          raise FontForgeUnavailable(self._unavailable)
+        if self._idle:
+          return self._idle.pop()
+        if len(self._workers) < self._size:
+          worker = FontForgeWorker(self._python, self._timeout)
+          self._workers.append(worker)
+          return worker
+        self._condition.wait()
+
+  def _release(self, worker):
+    with self._condition:
+      self._idle.append(worker)
+      self._condition.notify()
+
+  def validate(self, path):
+    """ See `FontForgeWorker.validate`. """
+    return self._call(FontForgeWorker.validate, path)
+
+  def version(self):
+    """ See `FontForgeWorker.version`. """
+    return self._call(FontForgeWorker.version)
+
+  def _call(self, method, *args):
+    if os.getpid() != self._pid:
+      # a forked process must not share the pipes of the workers
+      raise RuntimeError('FontForgePool used by a forked process.')
+    worker = self._acquire()
+    try:
+      return method(worker, *args)
+    except FontForgeUnavailable as e:
+      with self._condition:
+        self._unavailable = str(e)
+        self._condition.notify_all()
+      raise
+    finally:
+      self._release(worker)
+
+  @property
+  def start_count(self):
+    return sum(worker.start_count for worker in self._workers)
+
+  def close(self):
+    with self._condition:
+      workers = list(self._workers)
+    for worker in workers:
+      worker.close()
+
+
+_pool = None
+_configuration = {}
+_pool_lock = threading.Lock()
+def configure_fontforge_pool(**kwds):
+  """ Sets the keyword arguments of the `FontForgePool` of the process, the
+  next `get_fontforge_pool` call creates a new one.
+  """
+  global _pool, _configuration
+  with _pool_lock:
+    if _pool is not None and _pool._pid == os.getpid():
+      _pool.close()
+    _configuration = kwds
+    _pool = None
+
+
+def get_fontforge_pool():
+  """ The `FontForgePool` of the process, see `configure_fontforge_pool`.
+  A process forked after it was created gets a new one.
+  """
+  global _pool
+  with _pool_lock:
+    if _pool is None or _pool._pid != os.getpid():
+      _pool = FontForgePool(**_configuration)
+    return _pool
+
+
+@atexit.register
+def _close_pool():
+  if _pool is not None and _pool._pid == os.getpid():
+    _pool.close()
+
+
+def _validate(fontforge, path):
+  """ Returns the validation state and what FontForge printed to stderr. """
+  with tempfile.TemporaryFile() as captured:
+    sys.stderr.flush()
+    stderr_fd = os.dup(2)
+    os.dup2(captured.fileno(), 2)
+    try:
+      font = fontforge.open(path)
+      try:
+        validation_state = font.validate()
+      finally:
+        font.close()
+    finally:
+      sys.stderr.flush()
+      os.dup2(stderr_fd, 2)
+      os.close(stderr_fd)
+    captured.seek(0)
+    messages = captured.read().decode('utf-8', errors='replace')
+  return validation_state, messages
+
+
+def serve():
+  """ The worker: answers the requests of stdin on stdout, see above. """
+  # anything else printed to stdout would break the protocol
+  output = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+  devnull = os.open(os.devnull, os.O_WRONLY)
+  os.dup2(devnull, 1)
+  os.close(devnull)
+
+  def respond(response):
+    output.write(json.dumps(response) + '\n')
+    output.flush()
+
+  try:
+    import fontforge
+  except ImportError as e:
+    respond({'error': f'Can\'t import fontforge: {e}'})
+    return
+  version = getattr(fontforge, 'version', None)
+  respond({'ready': True,
+           'version': str(version()) if version is not None else None})
+  for line in sys.stdin:
+    path = json.loads(line)['path']
+    try:
+      validation_state, messages = _validate(fontforge, path)
+    except Exception as e:
+      respond({'error': f'{type(e).__name__}: {e}'})
+      continue
+    respond({'validation_state': int(validation_state),
+             'ff_err_messages': messages})
+
+
+if __name__ == '__main__':
+  # the directory of this file is not a package directory for the worker
+  del sys.path[0]
+  serve()
@@ -0,0 +1,320 @@
+"""
+Font Bakery glyphgeometry decodes the outlines of all glyphs of a TrueType
+font at once into NumPy arrays, so that checks and conditions can compute
+on the geometry of a whole font with array operations, instead of
+expanding each glyph into Python objects and looping over its points.
+
+`get_glyph_geometry(ttFont)` returns the `GlyphGeometry` of a font. While a
+CheckRunner is running, it is decoded once per font and shared by all
+checks and conditions, see `fontbakery.checkrunner.get_runner_scoped`.
+
+The glyphs that were not expanded by fontTools yet are decoded directly
+from the "glyf" table data, without expanding them. Glyphs that were
+already expanded (e.g. modified by a script) are read from their
+attributes. Composite glyphs are resolved like
+`fontTools.ttLib.tables._g_l_y_f.Glyph.getCoordinates` does, with the
+coordinates of their components, recursively.
+"""
+import struct
+import threading
+import weakref
+
+import numpy as np
+from fontTools.ttLib.tables._g_l_y_f import (
+              SCALED_COMPONENT_OFFSET
+            , SCALE_COMPONENT_OFFSET_DEFAULT
+            , UNSCALED_COMPONENT_OFFSET
+            , flagRepeat
+            , flagXShort
+            , flagXsame
+            , flagYShort
+            , flagYsame
+            )
+from fontTools.ttLib import TTLibError
+
+from fontbakery.checkrunner import get_runner_scoped
+
+_header = struct.Struct('>hhhhh')
+_lock = threading.Lock()
+
+
+def to_number(value):
+  """ Like the coordinates of fontTools: ints if they are integral. """
+  return int(value) if value.is_integer() else value
+
+
+def _decode_axis(buffer, flags, starts, point_glyphs, point_starts,
+                 short_flag, same_flag):
+  """ Decodes the x or y coordinates of many simple glyphs at once.
+
+  buffer: the glyph data of all glyphs as uint8 array.
+  flags: the expanded flags of all points.
+  starts: the offset in `buffer` of the coordinates of each glyph.
+  point_glyphs: the glyph of each point (its index in `starts`).
+  point_starts: the index of the first point of each glyph.
+
+  Returns the absolute coordinates and the size in bytes of the
+  coordinates of each glyph.
+  """
+  is_short = (flags & short_flag) != 0
+  is_same = (flags & same_flag) != 0
+  sizes = np.where(is_short, 1, np.where(is_same, 0, 2))
+  ends = np.cumsum(sizes)
+  offsets = ends - sizes
+  # the offset of each point relative to the first point of its glyph
+  offsets -= offsets[point_starts][point_glyphs]
+  positions = starts[point_glyphs] + offsets
+  # points without data ("same") would index past the end of the buffer
+  last = len(buffer) - 1
+  high = buffer[np.minimum(positions, last)].astype(np.int32)
+  low = buffer[np.minimum(positions + 1, last)].astype(np.int32)
+  words = ((high << 8) | low).astype(np.uint16).view(np.int16)
+  deltas = np.where(is_short, np.where(is_same, high, -high),
+                              np.where(is_same, 0, words)).astype(np.int64)
+  values = np.cumsum(deltas)
+  # coordinates are relative within each glyph only
+  values -= (values - deltas)[point_starts][point_glyphs]
+  lengths = np.bincount(point_glyphs, weights=sizes,
+                        minlength=len(starts)).astype(np.int64)
+  return values, lengths
+
+
+class GlyphGeometry:
+  """ The outlines of all glyphs of a font.
+
+  All arrays are indexed by the index of a glyph in `glyph_names`, the order
+  of the "glyf" table:
+
+  number_of_contours: the numberOfContours of the glyph header, -1 for
+  composite glyphs.
+
+  bounds: xMin, yMin, xMax and yMax of the glyph header, only meaningful
+  where `has_bounds` is True, which is False for empty glyphs.
+
+  coordinates: the points of all glyphs, as one (N, 2) float array, with
+  composite glyphs resolved. The points of a glyph are
+  `coordinates[point_offsets[index]:point_offsets[index + 1]]`.
+
+  end_points: the last point of each contour, relative to the glyph, the
+  ones of a glyph are
+  `end_points[contour_offsets[index]:contour_offsets[index + 1]]`.
+
+  components: {index: [(component glyph name, component), ...]} of the
+  composite glyphs, see `contour_count`.
+  """
+  def __init__(self, ttFont):
+    glyf = ttFont['glyf']
+    self.glyph_names = list(glyf.keys())
+    self.indexes = {name: index for index, name in enumerate(self.glyph_names)}
+    count = len(self.glyph_names)
+    self.number_of_contours = np.zeros(count, dtype=np.int32)
+    self.bounds = np.zeros((count, 4), dtype=np.int32)
+    self.has_bounds = np.zeros(count, dtype=bool)
+    self.components = {}
+    self._contour_counts = {}
+
+    # {index: (coordinates, end points)} of all non-empty glyphs
+    outlines = {}
+    raw = [] # (index, data, number of contours) of not expanded simple glyphs
+    for index, name in enumerate(self.glyph_names):
+      glyph = glyf.glyphs[name]
+      data = getattr(glyph, 'data', None)
+      if data is not None:
+        if not data:
+          continue
+        number_of_contours, *bounds = _header.unpack_from(data)
+        self.number_of_contours[index] = number_of_contours
+        self.bounds[index] = bounds
+        self.has_bounds[index] = True
+        if number_of_contours > 0:
+          raw.append((index, data, number_of_contours))
+          continue
+        if number_of_contours == 0:
+          continue
+        glyph = glyf[name] # expands the components only
+      elif not hasattr(glyph, 'yMin'):
+        continue # empty
+      else:
+        self.number_of_contours[index] = glyph.numberOfContours
+        self.bounds[index] = (glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax)
+        self.has_bounds[index] = True
+      if glyph.isComposite():
+        self.components[index] = [(component.glyphName, component)
+                                    for component in glyph.components]
+      elif glyph.numberOfContours > 0:
+        outlines[index] = (
+              np.array(glyph.coordinates.array, dtype=np.float64).reshape(-1, 2)
+            , np.array(glyph.endPtsOfContours, dtype=np.int64))
+
+    outlines.update(self._decode_simple_glyphs(raw))
+    for index in self.components:
+      self._resolve(index, outlines, set())
+
+    point_counts = np.zeros(count, dtype=np.int64)
+    contour_counts = np.zeros(count, dtype=np.int64)
+    for index, (coordinates, end_points) in outlines.items():
+      point_counts[index] = len(coordinates)
+      contour_counts[index] = len(end_points)
+    self.point_offsets = np.concatenate(([0], np.cumsum(point_counts)))
+    self.contour_offsets = np.concatenate(([0], np.cumsum(contour_counts)))
+    order = sorted(outlines)
+    self.coordinates = np.concatenate(
+            [outlines[index][0] for index in order]
+          + [np.zeros((0, 2), dtype=np.float64)])
+    self.end_points = np.concatenate(
+            [outlines[index][1] for index in order]
+          + [np.zeros(0, dtype=np.int64)])
+    # the glyph index of each point
+    self.point_glyphs = np.repeat(np.arange(count), point_counts)
+
+  def _decode_simple_glyphs(self, raw):
+    """ Decodes the coordinates of the not expanded simple glyphs `raw`.
+    The flags are expanded glyph by glyph, the coordinates of all glyphs
+    are decoded at once.
+    """
+    if not raw:
+      return {}
+    buffer = np.frombuffer(b''.join(data for _, data, _ in raw), dtype=np.uint8)
+    flags = bytearray()
+    coordinate_starts = []
+    point_counts = []
+    end_points = []
+    start = 0
+    for _, data, number_of_contours in raw:
+      ends = np.frombuffer(data, dtype='>u2', count=number_of_contours,
+                           offset=10).astype(np.int64)
+      end_points.append(ends)
+      point_count = int(ends[-1]) + 1
+      position = 10 + 2 * number_of_contours
+      instructions_length, = struct.unpack_from('>H', data, position)
+      position += 2 + instructions_length
+      expanded = 0
+      while expanded < point_count:
+        flag = data[position]
+        position += 1
+        repeat = 1
+        if flag & flagRepeat:
+          repeat = data[position] + 1
+          position += 1
+        flags.extend(bytes((flag, )) * repeat)
+        expanded += repeat
+      if expanded != point_count:
+        raise TTLibError('bad glyph flags')
+      coordinate_starts.append(start + position)
+      point_counts.append(point_count)
+      start += len(data)
+
+    flags = np.frombuffer(bytes(flags), dtype=np.uint8)
+    point_counts = np.array(point_counts, dtype=np.int64)
+    point_glyphs = np.repeat(np.arange(len(raw)), point_counts)
+    point_starts = np.concatenate(([0], np.cumsum(point_counts)[:-1]))
+    x_starts = np.array(coordinate_starts, dtype=np.int64)
+    xs, x_lengths = _decode_axis(buffer, flags, x_starts, point_glyphs,
+                                 point_starts, flagXShort, flagXsame)
+    ys, _ = _decode_axis(buffer, flags, x_starts + x_lengths, point_glyphs,
+                         point_starts, flagYShort, flagYsame)
+    coordinates = np.stack((xs, ys), axis=1).astype(np.float64)
+    return {index: (coordinates[point_start:point_start + point_count]
+                  , ends)
+              for (index, _, _), point_start, point_count, ends
+                in zip(raw, point_starts, point_counts, end_points)}
+
+  def _resolve(self, index, outlines, resolving):
+    """ Flattens the composite glyph `index` into `outlines`. """
+    if index in outlines:
+      return outlines[index]
+    if index in resolving:
+      raise TTLibError(f'glyph \'{self.glyph_names[index]}\' contains'
+                       f' a recursive component reference')
+    resolving.add(index)
+    all_coordinates = np.zeros((0, 2), dtype=np.float64)
+    all_end_points = []
+    for name, component in self.components.get(index, ()):
+      component_index = self.indexes[name]
+      if component_index in self.components:
+        coordinates, end_points = self._resolve(component_index, outlines,
+                                                resolving)
+      else:
+        coordinates, end_points = outlines.get(component_index,
+              (np.zeros((0, 2), dtype=np.float64), np.zeros(0, dtype=np.int64)))
+      transform = np.array(component.transform, dtype=np.float64) \
+                            if hasattr(component, 'transform') else None
+      if hasattr(component, 'firstPt'):
+        # aligned by points, transformed before the offset is computed
+        if transform is not None:
+          coordinates = coordinates @ transform
+        move = all_coordinates[component.firstPt] \
+             - coordinates[component.secondPt]
+        coordinates = coordinates + move
+      else:
+        move = np.array((component.x, component.y), dtype=np.float64)
+        scale_offset = component.flags & SCALED_COMPONENT_OFFSET
+        if not (scale_offset or component.flags & UNSCALED_COMPONENT_OFFSET):
+          scale_offset = SCALE_COMPONENT_OFFSET_DEFAULT
+        if transform is None:
+          coordinates = coordinates + move
+        elif scale_offset:
+          coordinates = (coordinates + move) @ transform
+        else:
+          coordinates = coordinates @ transform + move
+      all_end_points.append(end_points + len(all_coordinates))
+      all_coordinates = np.concatenate((all_coordinates, coordinates))
+    resolving.discard(index)
+    outlines[index] = (all_coordinates,
+                       np.concatenate(all_end_points + [np.zeros(0, np.int64)]))
+    return outlines[index]
+
+  def get_coordinates(self, name):
+    """ The points of the glyph `name`, composite glyphs resolved. """
+    index = self.indexes[name]
+    return self.coordinates[self.point_offsets[index]:
+                            self.point_offsets[index + 1]]
+
+  def points(self, name):
+    """ The points of the glyph `name` as a list of (x, y) tuples, like
+    the ones of fontTools.
+    """
+    return [(to_number(x), to_number(y))
+              for x, y in self.get_coordinates(name).tolist()]
+
+  def contour_count(self, name, exclude=()):
+    """ The number of contours of the glyph `name`, composite glyphs
+    included, without the components named in `exclude`.
+    """
+    exclude = frozenset(exclude)
+    counts = self._contour_counts.setdefault(exclude, {})
+    return self._count_contours(self.indexes[name], exclude, counts, set())
+
+  def _count_contours(self, index, exclude, counts, resolving):
+    if index in counts:
+      return counts[index]
+    if index not in self.components:
+      return max(int(self.number_of_contours[index]), 0)
+    if index in resolving:
+      raise TTLibError(f'glyph \'{self.glyph_names[index]}\' contains'
+                       f' a recursive component reference')
+    resolving.add(index)
+    count = sum(self._count_contours(self.indexes[name], exclude, counts,
+                                     resolving)
+                    for name, _ in self.components[index]
+                      if name not in exclude)
+    resolving.discard(index)
+    counts[index] = count
+    return count
+
+
+def get_glyph_geometry(ttFont):
+  """ Returns the `GlyphGeometry` of `ttFont`. It is decoded once per font
+  and run. Without a running CheckRunner (e.g. when a check is called
+  directly), it is decoded on each call, so that changes to the font are
+  seen.
+  """
+  geometries = get_runner_scoped('fontbakery.glyphgeometry.GlyphGeometry',
+                                 weakref.WeakKeyDictionary)
+  with _lock:
+    geometry = geometries.get(ttFont, None)
+  if geometry is None:
+    geometry = GlyphGeometry(ttFont)
+    with _lock:
+      geometries[ttFont] = geometry
+  return geometry
@@ -0,0 +1,243 @@
+"""
+Font Bakery linkcheck checks whether URLs are reachable, e.g. the links of
+the DESCRIPTION files of a collection of families, where the same URLs come
+up over and over again.
+
+`get_link_checker()` returns the `LinkChecker` of the process, configured
+with `configure_link_checker` (e.g. by the command line options of the
+check commands). It
+
+- requests the links of one `check_links` call concurrently, with a pooled
+  HTTP session (at most `max_workers` requests at the same time),
+- limits the requests per host (`max_per_host` at the same time, one
+  every `host_interval` seconds),
+- requests each URL only once per process (for `ttl` seconds),
+  concurrent requests for the same URL wait for the first one,
+- optionally keeps the results in a `LinkCache` directory for `ttl`
+  seconds, shared by all processes and runs that use it,
+- keeps transient failures (timeouts, connection errors, server errors
+  and 429 Too Many Requests, see `is_definitive`) only for `error_ttl`
+  seconds in memory, and never in the `LinkCache`,
+- in `offline` mode, never requests anything and only returns cached
+  results.
+
+The requests are made by a transport, an object with a method
+`head(url, timeout)` that returns the HTTP status code or raises
+`LinkTimeout` or `LinkError`; `RequestsTransport` by default. Tests can
+pass a transport of their own.
+"""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from fontbakery.checkrunner import DirectoryStore
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_ERROR_TTL = 60
+
+# status: the HTTP status code or None
+# error: None, 'timeout', 'error' or 'offline' (not cached in offline mode)
+LinkResult = namedtuple('LinkResult', ['url', 'status', 'error'])
+
+
+def is_definitive(result):
+  """ Whether `result` is an answer of the server about the URL, rather
+  than a failure that may be gone when the URL is requested again.
+  """
+  return result.error is None and result.status < 500 \
+                              and result.status != 429
+
+
+class LinkTimeout(Exception):
+  pass
+
+
+class LinkError(Exception):
+  pass
+
+
+class RequestsTransport:
+  """ Makes HEAD requests (following redirects) with a `requests.Session`
+  that keeps up to `pool_size` connections per host open.
+  """
+  def __init__(self, pool_size=10):
+    import requests
+    from requests.adapters import HTTPAdapter
+    self._requests = requests
+    self.session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    self.session.mount('http://', adapter)
+    self.session.mount('https://', adapter)
+
+  def head(self, url, timeout):
+    try:
+      response = self.session.head(url, allow_redirects=True, timeout=timeout)
+    except self._requests.exceptions.Timeout as e:
+      raise LinkTimeout(str(e))
+    except self._requests.exceptions.RequestException as e:
+      raise LinkError(str(e))
+    return response.status_code
+
+
+class LinkCache(DirectoryStore):
+  """ Stores link results for `ttl` seconds. Only definitive results are
+  stored, see `is_definitive`.
+  """
+  def __init__(self, directory, ttl=DEFAULT_TTL):
+    super(LinkCache, self).__init__(directory)
+    self.ttl = ttl
+
+  @staticmethod
+  def _key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+  def get_result(self, url):
+    stored = self.get(self._key(url))
+    if stored is None:
+      return None
+    timestamp, result = stored
+    if time.time() - timestamp > self.ttl:
+      return None
+    return LinkResult(*result)
+
+  def set_result(self, result):
+    if is_definitive(result):
+      self[self._key(result.url)] = (time.time(), tuple(result))
+
+
+class LinkChecker:
+  def __init__(self, transport=None, cache=None, offline=False,
+               max_workers=10, max_per_host=2, host_interval=0.1,
+               timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL,
+               error_ttl=DEFAULT_ERROR_TTL):
+    """
+    transport: see the module documentation, a `RequestsTransport` with a
+    pool of `max_workers` connections is created on first use by default.
+    cache: a `LinkCache` or None.
+    ttl: how long the results are kept in memory, in seconds.
+    error_ttl: how long results that are not definitive (see
+    `is_definitive`) are kept in memory, in seconds.
+    """
+    self._transport = transport
+    self._cache = cache
+    self.offline = offline
+    self._max_workers = max_workers
+    self._max_per_host = max_per_host
+    self._host_interval = host_interval
+    self._timeout = timeout
+    self._ttl = ttl
+    self._error_ttl = error_ttl
+    self._lock = threading.Lock()
+    # {url: (time, Future of LinkResult)}, the results of this process
+    self._results = {}
+    # {host: [semaphore, time of the last request]}
+    self._hosts = {}
+    # number of requests made by the transport
+    self.request_count = 0
+
+  def _get_transport(self):
+    with self._lock:
+      if self._transport is None:
+        self._transport = RequestsTransport(pool_size=self._max_workers)
+      return self._transport
+
+  def _wait_for_host(self, host):
+    with self._lock:
+      if host not in self._hosts:
+        self._hosts[host] = [threading.BoundedSemaphore(self._max_per_host), 0]
+      limit = self._hosts[host]
+    limit[0].acquire()
+    with self._lock:
+      delay = limit[1] + self._host_interval - time.monotonic()
+      limit[1] = time.monotonic() + max(delay, 0)
+    if delay > 0:
+      time.sleep(delay)
+    return limit[0]
+
+  def _request(self, url):
+    transport = self._get_transport()
+    semaphore = self._wait_for_host(urlsplit(url).netloc)
+    try:
+      with self._lock:
+        self.request_count += 1
+      try:
+        return LinkResult(url, transport.head(url, self._timeout), None)
+      except LinkTimeout:
+        return LinkResult(url, None, 'timeout')
+      except LinkError:
+        return LinkResult(url, None, 'error')
+    finally:
+      semaphore.release()
+
+  def _check(self, url, future):
+    try:
+      result = self._cache.get_result(url) if self._cache is not None \
+                                           else None
+      if result is None and self.offline:
+        result = LinkResult(url, None, 'offline')
+      elif result is None:
+        result = self._request(url)
+        if self._cache is not None:
+          self._cache.set_result(result)
+      future.set_result(result)
+    except BaseException as e:
+      future.set_exception(e)
+
+  def _is_expired(self, requested, future, now):
+    ttl = self._ttl
+    if future.done() and (future.exception() is not None
+                          or not is_definitive(future.result())):
+      ttl = self._error_ttl
+    return now - requested > ttl
+
+  def check_links(self, urls):
+    """ Returns a `LinkResult` for each of `urls`, in the same order. """
+    pending = []
+    futures = []
+    with self._lock:
+      now = time.monotonic()
+      for url in urls:
+        requested, future = self._results.get(url, (None, None))
+        if future is None or self._is_expired(requested, future, now):
+          future = Future()
+          self._results[url] = (now, future)
+          pending.append((url, future))
+        futures.append(future)
+    if pending:
+      with ThreadPoolExecutor(min(self._max_workers, len(pending))) as executor:
+        for url, future in pending:
+          executor.submit(self._check, url, future)
+    return [future.result() for future in futures]
+
+  def check_link(self, url):
+    return self.check_links([url])[0]
+
+
+_link_checker = None
+_configuration = {}
+_checker_lock = threading.Lock()
+def configure_link_checker(**kwds):
+  """ Sets the keyword arguments of the `LinkChecker` of the process, the
+  next `get_link_checker` call creates a new one. `cache_directory` and
+  `ttl` are turned into a `LinkCache`.
+  """
+  global _link_checker, _configuration
+  cache_directory = kwds.pop('cache_directory', None)
+  if cache_directory:
+    kwds['cache'] = LinkCache(cache_directory, kwds.get('ttl', DEFAULT_TTL))
+  with _checker_lock:
+    _configuration = kwds
+    _link_checker = None
+
+
+def get_link_checker():
+  """ The `LinkChecker` of the process, see `configure_link_checker`. """
+  global _link_checker
+  with _checker_lock:
+    if _link_checker is None:
+      _link_checker = LinkChecker(**_configuration)
+    return _link_checker
@@ -0,0 +1,172 @@
+"""
+Font Bakery manifest describes the checks of the profiles shipped with Font
+Bakery, so that they can be listed and selected without importing the
+profiles and the code of their checks.
+
+The manifest is generated from the profiles of `PROFILE_MODULES` by
+`fontbakery generate-profile-manifest` and shipped as
+`data/profile-manifest.json`, a JSON object with:
+
+  "profiles": {profile module name: {"sections": [{"name": section name,
+               "checks": [check id, ...]}, ...]}}, in execution order;
+  "checks": {check id: {"description", "rationale", "conditions", "args",
+             "module"}}, "module" is the module that defines the check;
+  "sources": {file name: SHA-256} of the source files of
+             `fontbakery.profiles` the manifest was generated from.
+
+`get_profile_manifest` ignores a manifest whose sources don't match the
+installed profiles (e.g. a check was edited in a checkout), the callers
+then import the profile as before.
+"""
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_VERSION = 1
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+MANIFEST_PATH = os.path.join(DATA_DIR, 'profile-manifest.json')
+PROFILES_DIR = os.path.join(os.path.dirname(__file__), 'profiles')
+
+# The profiles of the check-* commands.
+PROFILE_MODULES = (
+    'fontbakery.profiles.adobefonts'
+  , 'fontbakery.profiles.fontval'
+  , 'fontbakery.profiles.googlefonts'
+  , 'fontbakery.profiles.opentype'
+  , 'fontbakery.profiles.silfonts'
+  , 'fontbakery.profiles.ufo_sources'
+  , 'fontbakery.profiles.universal'
+)
+
+
+def get_source_digests(directory=PROFILES_DIR):
+  """ Returns a dict of {file name: SHA-256 hex digest} of the Python files
+  of `directory`.
+  """
+  digests = {}
+  for name in sorted(os.listdir(directory)):
+    if not name.endswith('.py'):
+      continue
+    with open(os.path.join(directory, name), 'rb') as f:
+      digests[name] = hashlib.sha256(f.read()).hexdigest()
+  return digests
+
+
+def describe_check(check):
+  return {'description': check.description
+        , 'rationale': getattr(check, 'rationale', None)
+        , 'conditions': list(check.conditions)
+        , 'args': list(check.args)
+        , 'module': check._func.__module__}
+
+
+def build_manifest(module_names=PROFILE_MODULES):
+  """ Imports the profile modules and returns their manifest. """
+  from importlib import import_module
+  from fontbakery.checkrunner import get_module_profile
+
+  profiles = {}
+  checks = {}
+  for module_name in module_names:
+    profile = get_module_profile(import_module(module_name))
+    sections = []
+    for section in profile._sections.values():
+      for check in section.checks:
+        checks[check.id] = describe_check(check)
+      sections.append({'name': section.name
+                     , 'checks': [check.id for check in section.checks]})
+    profiles[module_name] = {'sections': sections}
+  return {'version': MANIFEST_VERSION
+        , 'sources': get_source_digests()
+        , 'profiles': profiles
+        , 'checks': checks}
+
+
+def write_manifest(path, manifest):
+  with open(path, 'w', encoding='utf-8') as f:
+    json.dump(manifest, f, sort_keys=True, indent=1, ensure_ascii=False)
+    f.write('\n')
+
+
+def read_manifest(path):
+  """ Returns the manifest of `path`, or None if it is missing, of another
+  version or doesn't match the sources of the installed profiles.
+  """
+  try:
+    with open(path, encoding='utf-8') as f:
+      manifest = json.load(f)
+  except (OSError, ValueError):
+    return None
+  if manifest.get('version') != MANIFEST_VERSION \
+                        or manifest.get('sources') != get_source_digests():
+    return None
+  return manifest
+
+
+_manifests = {}
+_lock = threading.Lock()
+def get_manifest():
+  """ The manifest of `MANIFEST_PATH` (see `read_manifest`), read on the
+  first call only. It is shared, don't modify it.
+  """
+  with _lock:
+    if MANIFEST_PATH not in _manifests:
+      _manifests[MANIFEST_PATH] = read_manifest(MANIFEST_PATH)
+    return _manifests[MANIFEST_PATH]
+
+
+def get_profile_manifest(name):
+  """ Returns a list of (section name, [(check id, check dict), ...]) of the
+  profile `name`, a module name of `PROFILE_MODULES` or its short name
+  (e.g. "googlefonts"), or None if the profile is not in the manifest or
+  the manifest can't be used.
+  """
+  manifest = get_manifest()
+  if manifest is None or os.path.isfile(name):
+    return None
+  profile = manifest['profiles'].get(name,
+                      manifest['profiles'].get(f'fontbakery.profiles.{name}'))
+  if profile is None:
+    return None
+  checks = manifest['checks']
+  return [(section['name'], [(check_id, checks[check_id])
+                                  for check_id in section['checks']])
+          for section in profile['sections']]
+
+
+def is_selected(check_id, explicit_checks=None, exclude_checks=None):
+  """ Whether a check is selected by the check id filters of `CheckRunner`:
+  its id contains one of `explicit_checks` (if any) and none of
+  `exclude_checks`.
+  """
+  if explicit_checks and not any(include_string in check_id
+                                 for include_string in explicit_checks):
+    return False
+  if exclude_checks and any(exclude_string in check_id
+                            for exclude_string in exclude_checks):
+    return False
+  return True
+
+
+def select_checks(sections, explicit_checks=None, exclude_checks=None):
+  """ Filters the sections of `get_profile_manifest` with `is_selected`.
+  Sections without selected checks are dropped when filtering.
+  """
+  if not explicit_checks and not exclude_checks:
+    return sections
+  selected = []
+  for section_name, checks in sections:
+    checks = [(check_id, check) for check_id, check in checks
+                 if is_selected(check_id, explicit_checks, exclude_checks)]
+    if checks:
+      selected.append((section_name, checks))
+  return selected
+
+
+def get_check_modules(sections):
+  """ The sorted names of the modules that define the checks of `sections`,
+  i.e. the modules a run of these checks needs to import.
+  """
+  return sorted({check['module'] for _, checks in sections
+                                 for _, check in checks})
@@ -0,0 +1,163 @@
+"""
+Font Bakery multiproc runs the checks of a CheckRunner on a pool of
+worker processes.
+
+The execution order is sharded by one of the iterargs (e.g. "font"), each
+shard is executed by one worker, using a condition cache that is local to
+that worker. Work done for all items of the run at once, like the
+validators of `fontbakery.validators`, is restricted to the items of the
+shard in the workers (see `CheckRunner.shard_items`). Checks that don't use
+the sharding iterarg (e.g. family checks that consume all fonts) run
+afterwards in the main process, in a dedicated stage. Checks marked as `io_bound` run in threads of the main process,
+in parallel to the workers. With known check costs, the most expensive
+shards are started first. The events are merged back in the original
+order, so that reporters receive the same protocol as from a serial run.
+
+Separation of Concerns Disclaimer:
+While created specifically for checking fonts and font-families this
+module has no domain knowledge about fonts. It can be used for any kind
+of (document) checking. Please keep it so. It will be valuable for other
+domains as well.
+Domain specific knowledge should be encoded only in the Profile (Checks,
+Conditions) and MAYBE in *customized* reporters e.g. subclasses.
+"""
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from fontbakery.checkrunner import (
+              CheckRunner
+            , FontBakeryRunnerError
+            , transferable_message
+            , ERROR
+            , STARTCHECK
+            , ENDCHECK
+            )
+
+class WorkerError(FontBakeryRunnerError):
+  def __init__(self, error, *args):
+    message = 'The worker process failed with {}: {}'.format(
+                                              type(error).__name__, error)
+    self.error = error
+    super(WorkerError, self).__init__(message, *args)
+
+# The worker processes are forked, they inherit these from the main
+# process, where they are set just before the pool is created.
+_worker_runner = None
+_worker_order = None
+
+def _run_shard(indexes):
+  shard_by = _worker_runner._shard_by
+  _worker_runner._shard = (shard_by, [
+      _worker_runner.get_iterarg(shard_by, dict(_worker_order[i][2])[shard_by])
+                                                          for i in indexes])
+  _worker_runner._expect_condition_keys([_worker_order[i] for i in indexes])
+  results = []
+  for index in indexes:
+    _, check, iterargs = _worker_order[index]
+    events = [(status, transferable_message(message))
+              for status, message in _worker_runner._run_check(check, iterargs)]
+    results.append((index, events))
+  return results
+
+def can_fork():
+  return 'fork' in multiprocessing.get_all_start_methods()
+
+class MultiprocessingRunner(CheckRunner):
+  def __init__(self, profile, values, jobs=None, shard_by=None, **kwds):
+    """
+    jobs: the number of worker processes, defaults to `os.cpu_count()`.
+
+    shard_by: the name of the iterarg used to distribute the execution
+    order to the workers, defaults to the first iterarg of the profile.
+    """
+    super(MultiprocessingRunner, self).__init__(profile, values, **kwds)
+    self._jobs = jobs or os.cpu_count() or 1
+    if shard_by is None:
+      shard_by = next(iter(self._iterargs), None)
+    self._shard_by = shard_by
+
+  def _shard_order(self, order):
+    """ Returns `(shards, rest, io_bound)`: `shards` is an OrderedDict of
+    {iterarg index: [order index, ...]}, the most expensive shard first,
+    `rest` is a set of all order indexes that don't use the sharding
+    iterarg, `io_bound` the set of order indexes that are executed in
+    threads of the main process.
+    """
+    io_bound = self._get_io_bound(order)
+    shards = {}
+    rest = set()
+    for index, (_, _, iterargs) in enumerate(order):
+      if index in io_bound:
+        continue
+      shard = dict(iterargs).get(self._shard_by, None)
+      if shard is None:
+        rest.add(index)
+      else:
+        shards.setdefault(shard, []).append(index)
+    cost = lambda indexes: sum(self._get_cost(order[index][1])
+                                                  for index in indexes)
+    # sorted is stable, without costs this is the original order
+    shards = OrderedDict(sorted(shards.items(),
+                                key=lambda item: -cost(item[1])))
+    return shards, rest, io_bound
+
+  def _execute(self, order):
+    shards, rest, io_bound = self._shard_order(order)
+    if self._jobs < 2 or len(shards) < 2:
+      yield from super(MultiprocessingRunner, self)._execute(order)
+      return
+    if not can_fork():
+      logging.warning('Parallel execution requires the "fork" start method,'
+                      ' which is not available on this platform.'
+                      ' Running the checks serially.')
+      yield from super(MultiprocessingRunner, self)._execute(order)
+      return
+
+    global _worker_runner, _worker_order
+    _worker_runner, _worker_order = self, order
+    context = multiprocessing.get_context('fork')
+    try:
+      with ProcessPoolExecutor(min(self._jobs, len(shards)),
+                               mp_context=context) as pool:
+        with ThreadPoolExecutor(max(self._io_threads, 1)) as executor:
+          yield from self._merge_results(order, pool, executor,
+                                         shards, rest, io_bound)
+    finally:
+      _worker_runner, _worker_order = None, None
+
+  def _merge_results(self, order, pool, executor, shards, rest, io_bound):
+    self._expect_condition_keys([order[i] for i in sorted(rest | io_bound)])
+    # With "fork", the pool forks all of its workers on the first submit,
+    # i.e. before the threads are started.
+    pending = {}
+    for shard, indexes in shards.items():
+      pending[shard] = pool.submit(_run_shard, indexes)
+    futures = self._submit_io_bound(executor, order, io_bound)
+
+    results = {}
+    def get_events(shard, index):
+      if index not in results:
+        try:
+          # Raises BrokenProcessPool for the shards that were not done when
+          # a worker process died (e.g. killed for its memory use).
+          results.update(pending[shard].result())
+        except Exception as e:
+          error = WorkerError(e)
+          for i in shards[shard]:
+            results[i] = [(STARTCHECK, None), (ERROR, error), (ENDCHECK, ERROR)]
+      return results.pop(index)
+
+    for index, identity in enumerate(order):
+      _, check, iterargs = identity
+      if index in futures:
+        yield identity, futures[index].result()
+      elif index in rest:
+        # The dedicated stage: all shards must be done before.
+        wait(pending.values())
+        yield identity, self._run_check(check, iterargs)
+      else:
+        shard = dict(iterargs)[self._shard_by]
+        yield identity, get_events(shard, index)
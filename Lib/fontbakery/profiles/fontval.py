@@ -1,5 +1,6 @@
 import os
-from fontbakery.callable import check
+from collections import namedtuple
+from fontbakery.callable import check, condition
 from fontbakery.checkrunner import ERROR, FAIL, INFO, PASS, WARN, Section
 # used to inform get_module_profile whether and how to create a profile
 from fontbakery.fonts_profile import profile_factory # NOQA pylint: disable=unused-import
@@ -8,10 +9,118 @@ from .shared_conditions import is_variable_font
 profile_imports = ['.shared_conditions']
 profile = profile_factory(default_section=Section("Checks inherited from Microsoft Font Validator"))
 
+# returncode: of the FontValidator invocation that validated the font
+# output: of that invocation, for all of its fonts
+# reports: list of (ErrorType, Message, Details) of the XML report, or None
+#          if there's no report
+# error: the OSError if FontValidator could not be executed, else None
+FontValidatorResult = namedtuple('FontValidatorResult',
+                                 ['returncode', 'output', 'reports', 'error'])
+
+
+def read_fontvalidator_report(path):
+  """ Returns the list of (ErrorType, Message, Details) of the `Report`
+  elements of the FontValidator XML report at `path`. The report is read
+  incrementally, the elements are discarded once they are read.
+  """
+  from defusedxml.ElementTree import iterparse
+  reports = []
+  for _, element in iterparse(path):
+    if element.tag == 'Report':
+      reports.append((element.get("ErrorType"),
+                      element.get("Message"),
+                      element.get("Details")))
+      element.clear()
+  return reports
+
+
+def _fontvalidator_batches(fonts):
+  """ FontValidator names the reports after the font file names, fonts with
+  the same file name (of different directories) go to different batches.
+  """
+  batches = []
+  for font in fonts:
+    name = os.path.basename(font)
+    for batch in batches:
+      if name not in batch:
+        batch[name] = font
+        break
+    else:
+      batches.append({name: font})
+  return [list(batch.values()) for batch in batches]
+
+
+def _run_fontvalidator_batch(fonts):
+  """ Runs FontValidator once for `fonts`, with the reports in a private
+  temporary directory, not the directory of the fonts. Returns a dict of
+  {font: FontValidatorResult}.
+  """
+  import subprocess
+  import tempfile
+  results = {}
+  with tempfile.TemporaryDirectory(prefix='fontbakery-fontval-') \
+                                                            as report_dir:
+    fval_cmd = ["FontValidator"]
+    for font in fonts:
+      fval_cmd += ["-file", font]
+    fval_cmd += ["-all-tables", "-report-dir", report_dir, "-no-raster-tests"]
+    try:
+      output = subprocess.check_output(fval_cmd, stderr=subprocess.STDOUT)
+      returncode = 0
+    except subprocess.CalledProcessError as e:
+      output, returncode = e.output, e.returncode
+    except (OSError, IOError) as error:
+      return {font: FontValidatorResult(None, '', None, error)
+                for font in fonts}
+
+    for font in fonts:
+      xml_report_file = os.path.join(report_dir,
+                                     f"{os.path.basename(font)}.report.xml")
+      reports = None
+      if os.path.exists(xml_report_file):
+        reports = read_fontvalidator_report(xml_report_file)
+      results[font] = FontValidatorResult(returncode, output.decode(),
+                                          reports, None)
+  return results
+
+
+def run_fontvalidator(fonts):
+  """ Runs FontValidator once for all `fonts` (mono starts only once).
+  Returns a dict of {font: FontValidatorResult}.
+
+  A crash on one font leaves the following ones without a report:
+  FontValidator is run again for each font without a report on its own,
+  so that each font gets its own results. Fonts with a report keep the
+  results of the invocation, a non-zero error code is a normal result.
+  """
+  results = {}
+  for batch in _fontvalidator_batches(fonts):
+    batch_results = _run_fontvalidator_batch(batch)
+    if len(batch) > 1:
+      for font, result in list(batch_results.items()):
+        if result.error is None and result.reports is None:
+          batch_results.update(_run_fontvalidator_batch([font]))
+    results.update(batch_results)
+  return results
+
+
+@condition
+def fontvalidator_result(font, fonts):
+  """ The `FontValidatorResult` of `font`, FontValidator is run once for
+  all fonts.
+  """
+  from fontbakery.validators import get_validator_batch
+  return get_validator_batch('FontValidator', run_fontvalidator, fonts) \
+                                                                .result(font)
+
+
 @check(
-  id = 'com.google.fonts/check/fontvalidator'
+  id = 'com.google.fonts/check/fontvalidator',
+  misc_metadata = {
+    'io_bound': True
+  }
 )
-def com_google_fonts_check_fontvalidator(font):
+def com_google_fonts_check_fontvalidator(font, fontvalidator_result):
   """Checking with Microsoft Font Validator."""
 
   # In some cases we want to override the severity level of
@@ -88,20 +197,20 @@ def com_google_fonts_check_fontvalidator(font):
     "The device table's DeltaFormat value is invalid"
   ]
 
+  # A font of its own, this check runs in an io thread and must not use
+  # the fonts shared with the other checks (see `get_font`).
   from fontTools.ttLib import TTFont
   if is_variable_font(TTFont(font)):
     disabled_fval_checks.extend(VARFONT_disabled_fval_checks)
 
-  try:
-    import subprocess
-    fval_cmd = [
-        "FontValidator", "-file", font, "-all-tables",
-        "-report-in-font-dir", "-no-raster-tests"
-    ]
-    subprocess.check_output(fval_cmd, stderr=subprocess.STDOUT)
-  except subprocess.CalledProcessError as e:
+  if fontvalidator_result.error is not None:
+    yield ERROR, ("Mono runtime and/or "
+                  "Microsoft Font Validator are not available!")
+    raise fontvalidator_result.error
+
+  if fontvalidator_result.returncode != 0:
     filtered_msgs = ""
-    for line in e.output.decode().split("\n"):
+    for line in fontvalidator_result.output.split("\n"):
       disable_it = False
       for substring in disabled_fval_checks:
         if substring in line:
@@ -110,10 +219,10 @@ def com_google_fonts_check_fontvalidator(font):
         filtered_msgs += line + "\n"
     yield INFO, ("Microsoft Font Validator returned an error code."
                  " Output follows :\n\n{}\n").format(filtered_msgs)
-  except (OSError, IOError) as error:
-    yield ERROR, ("Mono runtime and/or "
-                  "Microsoft Font Validator are not available!")
-    raise error
+
+  if fontvalidator_result.reports is None:
+    yield ERROR, "Microsoft Font Validator did not write a report for this font."
+    return
 
   def report_message(msg, details):
     if details:
@@ -137,44 +246,23 @@ def com_google_fonts_check_fontvalidator(font):
     else:
       return f"MS-FonVal: {msg}"
 
-  xml_report_file = f"{font}.report.xml"
-  html_report_file = f"{font}.report.html"
-  fval_file = os.path.join(os.path.dirname(font), 'fval.xsl')
-
   grouped_msgs = {}
-  with open(xml_report_file, "rb") as xml_report:
-    import defusedxml.lxml
-    doc = defusedxml.lxml.parse(xml_report)
-
-    for report in doc.iter('Report'):
-      msg = report.get("Message")
-      details = report.get("Details")
+  for errortype, msg, details in fontvalidator_result.reports:
+    disable_it = False
+    for substring in disabled_fval_checks:
+      if substring in msg:
+        disable_it = True
+    if disable_it:
+      continue
 
-      disable_it = False
-      for substring in disabled_fval_checks:
-        if substring in msg:
-          disable_it = True
-      if disable_it:
-        continue
-
-      if msg not in grouped_msgs:
-        grouped_msgs[msg] = {"errortype": report.get("ErrorType"),
-                             "details": [details]}
-      else:
-        if details not in grouped_msgs[msg]["details"]:
-          # avoid cluttering the output with tons of identical reports
-          # yield INFO, 'grouped_msgs[msg]["details"]: {}'.format(grouped_msgs[msg]["details"])
-          grouped_msgs[msg]["details"].append(details)
-
-  # ---------------------------
-  # Clean-up generated files...
-  os.remove(xml_report_file)
-  # FontVal internal detail: HTML report generated only on non-Windows due to
-  # Mono or the used HTML renderer not being able to render XML with a
-  # stylesheet directly. https://github.com/googlefonts/fontbakery/issues/1747
-  if os.path.exists(html_report_file):
-    os.remove(html_report_file)
-  os.remove(fval_file)
+    if msg not in grouped_msgs:
+      grouped_msgs[msg] = {"errortype": errortype,
+                           "details": [details]}
+    else:
+      if details not in grouped_msgs[msg]["details"]:
+        # avoid cluttering the output with tons of identical reports
+        # yield INFO, 'grouped_msgs[msg]["details"]: {}'.format(grouped_msgs[msg]["details"])
+        grouped_msgs[msg]["details"].append(details)
 
   # ---------------------------
   # Here we start emitting the grouped log messages
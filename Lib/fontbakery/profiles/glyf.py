@@ -4,14 +4,13 @@ from fontbakery.checkrunner import FAIL, PASS, WARN
 # used to inform get_module_profile whether and how to create a profile
 from fontbakery.fonts_profile import profile_factory # NOQA pylint: disable=unused-import
 
-import fontTools.ttLib
-
 @check(
   id = 'com.google.fonts/check/glyf_unused_data',
   conditions = ['is_ttf']
 )
 def com_google_fonts_check_glyf_unused_data(ttFont):
   """Is there any unused data at the end of the glyf table?"""
+  from fontTools.ttLib import TTLibError
   try:
     expected_glyphs = len(ttFont.getGlyphOrder())
     actual_glyphs = len(ttFont['glyf'].glyphs)
@@ -28,7 +27,7 @@ def com_google_fonts_check_glyf_unused_data(ttFont):
       yield PASS, "There is no unused data at the end of the glyf table."
     else:
       raise Exception("Bug: fontTools did not raise an expected exception.")
-  except fontTools.ttLib.TTLibError as error:
+  except TTLibError as error:
     if "not enough 'glyf' table data" in format(error):
       yield FAIL, Message("missing-data",
                           ("Loca table references data beyond"
@@ -50,17 +49,19 @@ def com_google_fonts_check_glyf_unused_data(ttFont):
   })
 def com_google_fonts_check_points_out_of_bounds(ttFont):
   """Check for points out of bounds."""
-  failed = False
-  out_of_bounds = []
-  for glyphName in ttFont['glyf'].keys():
-    glyph = ttFont['glyf'][glyphName]
-    coords = glyph.getCoordinates(ttFont['glyf'])[0]
-    for x, y in coords:
-      if x < glyph.xMin or x > glyph.xMax or \
-         y < glyph.yMin or y > glyph.yMax or \
-         abs(x) > 32766 or abs(y) > 32766:
-        failed = True
-        out_of_bounds.append((glyphName, x, y))
+  import numpy as np
+  from fontbakery.glyphgeometry import get_glyph_geometry, to_number
+  geometry = get_glyph_geometry(ttFont)
+  x, y = geometry.coordinates.T
+  # the bounds of the glyph of each point
+  x_min, y_min, x_max, y_max = geometry.bounds[geometry.point_glyphs].T
+  outside = (x < x_min) | (x > x_max) | (y < y_min) | (y > y_max) \
+          | (np.abs(x) > 32766) | (np.abs(y) > 32766)
+  out_of_bounds = [(geometry.glyph_names[index], to_number(x), to_number(y))
+                    for index, (x, y) in zip(
+                        geometry.point_glyphs[outside].tolist()
+                      , geometry.coordinates[outside].tolist())]
+  failed = bool(out_of_bounds)
 
   if failed:
     yield WARN, ("The following glyphs have coordinates which are"
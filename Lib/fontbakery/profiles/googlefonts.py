@@ -226,7 +226,7 @@ def canonical_stylename(font):
   from fontbakery.constants import (STATIC_STYLE_NAMES,
                                     VARFONT_SUFFIXES)
   from fontbakery.profiles.shared_conditions import is_variable_font
-  from fontTools.ttLib import TTFont
+  from fontbakery.ttfont import get_font
 
   # remove spaces in style names
   valid_style_suffixes = [name.replace(' ', '') for name in STATIC_STYLE_NAMES]
@@ -234,7 +234,7 @@ def canonical_stylename(font):
   filename = os.path.basename(font)
   basename = os.path.splitext(filename)[0]
   s = suffix(font)
-  varfont = os.path.exists(font) and is_variable_font(TTFont(font))
+  varfont = os.path.exists(font) and is_variable_font(get_font(font))
   if ('-' in basename and
       (s in VARFONT_SUFFIXES and varfont)
       or (s in valid_style_suffixes and not varfont)):
@@ -263,14 +263,14 @@ def com_google_fonts_check_canonical_filename(font):
        Example-Roman-VF.ttf,
        Familyname-Italic-VF.ttf
   """
-  from fontTools.ttLib import TTFont
   from fontbakery.profiles.shared_conditions import is_variable_font
+  from fontbakery.ttfont import get_font
   from fontbakery.constants import (STATIC_STYLE_NAMES,
                                     VARFONT_SUFFIXES)
   if canonical_stylename(font):
     yield PASS, f"{font} is named canonically."
   else:
-    if os.path.exists(font) and is_variable_font(TTFont(font)):
+    if os.path.exists(font) and is_variable_font(get_font(font)):
       if suffix(font) in STATIC_STYLE_NAMES:
         yield FAIL, (f'This is a variable font, but it is using'
                       ' a naming scheme typical of a static font.')
@@ -315,33 +315,39 @@ def description(descfile):
 
 @check(
   id = 'com.google.fonts/check/description/broken_links',
-  conditions = ['description']
+  conditions = ['description'],
+  misc_metadata = {
+    'io_bound': True
+  }
 )
 def com_google_fonts_check_description_broken_links(description):
   """Does DESCRIPTION file contain broken links?"""
   from lxml.html import HTMLParser
   import defusedxml.lxml
-  import requests
+  from fontbakery.linkcheck import get_link_checker
   doc = defusedxml.lxml.fromstring(description, parser=HTMLParser())
   broken_links = []
+  links = []
   for link in doc.xpath('//a/@href'):
     if link.startswith("mailto:") and \
        "@" in link and \
        "." in link.split("@")[1]:
       yield INFO, (f"Found an email address: {link}")
       continue
+    links.append(link)
 
-    try:
-      response = requests.head(link, allow_redirects=True, timeout=10)
-      code = response.status_code
-      if code != requests.codes.ok:
-        broken_links.append(("url: '{}' "
-                             "status code: '{}'").format(link, code))
-    except requests.exceptions.Timeout:
+  for link, code, error in get_link_checker().check_links(links):
+    if error == 'timeout':
       yield WARN, ("Timedout while attempting to access: '{}'."
                    " Please verify if that's a broken link.").format(link)
-    except requests.exceptions.RequestException:
+    elif error == 'offline':
+      yield INFO, ("Could not verify '{}', the link is not cached"
+                   " and link checking is offline.").format(link)
+    elif error is not None:
       broken_links.append(link)
+    elif code != 200:
+      broken_links.append(("url: '{}' "
+                           "status code: '{}'").format(link, code))
 
   if len(broken_links) > 0:
     yield FAIL, ("The following links are broken"
@@ -495,7 +501,8 @@ def com_google_fonts_check_family_equal_numbers_of_glyphs(ttFonts):
 
 @check(
   id = 'com.google.fonts/check/family/equal_glyph_names',
-  conditions = ['are_ttf']
+  conditions = ['are_ttf'],
+  tables = ['post']
 )
 def com_google_fonts_check_family_equal_glyph_names(ttFonts):
   """Fonts have equal glyph names?"""
@@ -503,7 +510,7 @@ def com_google_fonts_check_family_equal_glyph_names(ttFonts):
 
   all_glyphnames = set()
   for ttFont in fonts:
-    all_glyphnames |= set(ttFont["glyf"].glyphs.keys())
+    all_glyphnames |= set(ttFont.getGlyphOrder())
 
   missing = {}
   available = {}
@@ -514,7 +521,7 @@ def com_google_fonts_check_family_equal_glyph_names(ttFonts):
   failed = False
   for ttFont in fonts:
     fontname = ttFont.reader.file.name
-    these_ones = set(ttFont["glyf"].glyphs.keys())
+    these_ones = set(ttFont.getGlyphOrder())
     for glyphname in all_glyphnames:
       if glyphname not in these_ones:
         failed = True
@@ -599,35 +606,8 @@ def com_google_fonts_check_fstype(ttFont):
 @condition
 def registered_vendor_ids():
   """Get a list of vendor IDs from Microsoft's website."""
-  from bs4 import BeautifulSoup
-  from pkg_resources import resource_filename
-
-  registered_vendor_ids = {}
-  CACHED = resource_filename('fontbakery',
-                             'data/fontbakery-microsoft-vendorlist.cache')
-  content = open(CACHED, encoding='utf-8').read()
-  soup = BeautifulSoup(content, 'html.parser')
-
-  IDs = [chr(c + ord('a')) for c in range(ord('z') - ord('a') + 1)]
-  IDs.append("0-9-")
-
-  for section_id in IDs:
-    section = soup.find('h2', {'id': section_id})
-    table = section.find_next_sibling('table')
-    if not table: continue
-
-    #print ("table: '{}'".format(table))
-    for row in table.findAll('tr'):
-      #print("ROW: '{}'".format(row))
-      cells = row.findAll('td')
-      # pad the code to make sure it is a 4 char string,
-      # otherwise eg "CF  " will not be matched to "CF"
-      code = cells[0].string.strip()
-      code = code + (4 - len(code)) * ' '
-      labels = [label for label in cells[1].stripped_strings]
-      registered_vendor_ids[code] = labels[0]
-
-  return registered_vendor_ids
+  from fontbakery.vendorlist import get_registered_vendor_ids
+  return get_registered_vendor_ids()
 
 
 @check(
@@ -661,7 +641,8 @@ def com_google_fonts_check_vendor_id(ttFont, registered_vendor_ids):
 
 
 @check(
-  id = 'com.google.fonts/check/name/unwanted_chars'
+  id = 'com.google.fonts/check/name/unwanted_chars',
+  tables = ['name']
 )
 def com_google_fonts_check_name_unwanted_chars(ttFont):
   """Substitute copyright, registered and trademark
@@ -793,6 +774,7 @@ def com_google_fonts_check_family_has_license(licenses):
 @check(
   id = 'com.google.fonts/check/name/license',
   conditions = ['license'],
+  tables = ['name'],
   misc_metadata = {
     'priority': PriorityLevel.CRITICAL
   })
@@ -841,6 +823,7 @@ def familyname(font):
 @check(
   id = 'com.google.fonts/check/name/license_url',
   conditions = ['familyname'],
+  tables = ['name'],
   misc_metadata = {
     'priority': PriorityLevel.CRITICAL
   }
@@ -954,20 +937,28 @@ def com_google_fonts_check_name_description_max_length(ttFont):
     yield PASS, "All description name records have reasonably small lengths."
 
 
-@condition
+def ttfautohint_version():
+  """ The version of the stored `ttfautohint_stats`, it includes the
+  version of the installed ttfautohint, which they report.
+  """
+  from ttfautohint import libttfautohint
+  return f'1:{libttfautohint.version_string}'
+
+
+@condition(persistent=True, version=ttfautohint_version)
 def ttfautohint_stats(font):
   from ttfautohint import ttfautohint, libttfautohint
-  from io import BytesIO
-  from fontTools.ttLib import TTFont
   from fontbakery.profiles.shared_conditions import is_ttf
+  from fontbakery.ttfont import get_registry
 
-  if not is_ttf(TTFont(font)):
+  registry = get_registry()
+  if not is_ttf(registry.get(font)):
     return None
 
-  original_buffer = BytesIO()
-  TTFont(font).save(original_buffer)
-  dehinted_buffer = ttfautohint(in_buffer=original_buffer.getvalue(),
-                                dehint=True)
+  # The file as it is, re-saving it would require to parse it again.
+  # ttfautohint only accepts bytes, this is the only copy.
+  original_buffer = bytes(registry.get_buffer(font))
+  dehinted_buffer = ttfautohint(in_buffer=original_buffer, dehint=True)
   return {
     "dehinted_size": len(dehinted_buffer),
     "hinted_size": os.stat(font).st_size,
@@ -2394,12 +2385,11 @@ def remote_styles(family_metadata):
   """
 
   def download_family_from_Google_Fonts(family_name):
-    """Return a zipfile containing a font family hosted on fonts.google.com"""
-    from zipfile import ZipFile
-    from fontbakery.utils import download_file
+    """Return a zip file of a font family hosted on fonts.google.com"""
+    from fontbakery.downloads import get_download_cache
     url_prefix = 'https://fonts.google.com/download?family='
     url = '{}{}'.format(url_prefix, family_name.replace(' ', '+'))
-    return ZipFile(download_file(url))
+    return get_download_cache().open(url)
 
 
   def fonts_from_zip(zipfile):
@@ -2417,10 +2407,13 @@ def remote_styles(family_metadata):
       not family_metadata):
     return None
 
-  remote_fonts_zip = download_family_from_Google_Fonts(family_metadata.name)
+  from zipfile import ZipFile
+  with download_family_from_Google_Fonts(family_metadata.name) as f, \
+       ZipFile(f) as remote_fonts_zip:
+    remote_fonts = fonts_from_zip(remote_fonts_zip)
   rstyles = {}
 
-  for remote_filename, remote_font in fonts_from_zip(remote_fonts_zip):
+  for remote_filename, remote_font in remote_fonts:
     remote_style = os.path.splitext(remote_filename)[0]
     if '-' in remote_style:
       remote_style = remote_style.split('-')[1]
@@ -2446,9 +2439,9 @@ def github_gfonts_ttFont(ttFont, license):
   if not license:
     return
 
-  from fontbakery.utils import download_file
+  from io import BytesIO
+  from fontbakery.downloads import DownloadError, get_download_cache
   from fontTools.ttLib import TTFont
-  from urllib.request import HTTPError
   LICENSE_DIRECTORY = {
     "OFL.txt": "ofl",
     "UFL.txt": "ufl",
@@ -2461,10 +2454,14 @@ def github_gfonts_ttFont(ttFont, license):
                              fontname,
                              filename)
   try:
-    fontfile = download_file(url)
-    return TTFont(fontfile)
-  except HTTPError:
-    return None
+    with get_download_cache().open(url) as fontfile:
+      return TTFont(BytesIO(fontfile.read()))
+  except DownloadError as e:
+    # Not in the repository (e.g. a new family), other errors (network,
+    # server) are reported by the checks.
+    if e.status == 404:
+      return None
+    raise
 
 
 @check(
@@ -2715,18 +2712,12 @@ def com_google_fonts_check_contour_count(ttFont):
   In the future, additional glyph data can be included. A good addition would
   be the 'recommended' anchor counts for each glyph.
   """
-  from fontbakery.glyphdata import desired_glyph_data as glyph_data
+  from fontbakery.glyphdata import get_glyph_data_index
   from fontbakery.utils import (get_font_glyph_data,
                                 pretty_print_list)
-  # rearrange data structure:
-  desired_glyph_data = {}
-  for glyph in glyph_data:
-    desired_glyph_data[glyph['unicode']] = glyph
+  desired_glyph_data = get_glyph_data_index()
 
   bad_glyphs = []
-  desired_glyph_contours = {f: desired_glyph_data[f]['contours']
-                            for f in desired_glyph_data}
-
   font_glyph_data = get_font_glyph_data(ttFont)
 
   if font_glyph_data is None:
@@ -2735,12 +2726,13 @@ def com_google_fonts_check_contour_count(ttFont):
     font_glyph_contours = {f['unicode']: list(f['contours'])[0]
                            for f in font_glyph_data}
 
-    shared_glyphs = set(desired_glyph_contours) & set(font_glyph_contours)
-    for glyph in shared_glyphs:
-      if font_glyph_contours[glyph] not in desired_glyph_contours[glyph]:
+    for glyph in sorted(font_glyph_contours):
+      desired_contours = desired_glyph_data.get(glyph)
+      if desired_contours is not None \
+         and font_glyph_contours[glyph] not in desired_contours:
         bad_glyphs.append([glyph,
                            font_glyph_contours[glyph],
-                           desired_glyph_contours[glyph]])
+                           desired_contours])
 
     if len(bad_glyphs) > 0:
       cmap = ttFont['cmap'].getcmap(PlatformID.WINDOWS,
@@ -3577,8 +3569,8 @@ def com_google_fonts_check_varfont_weight_instances(ttFont):
 def com_google_fonts_check_family_tnum_horizontal_metrics(fonts):
   """All tabular figures must have the same width across the RIBBI-family."""
   from fontbakery.constants import RIBBI_STYLE_NAMES
-  from fontTools.ttLib import TTFont
-  RIBBI_ttFonts = [TTFont(f)
+  from fontbakery.ttfont import get_font
+  RIBBI_ttFonts = [get_font(f)
                    for f in fonts
                    if style(f) in RIBBI_STYLE_NAMES]
   tnum_widths = {}
@@ -3755,6 +3747,7 @@ def com_google_fonts_check_kerning_for_non_ligated_sequences(ttFont, ligatures,
 
 @check(
   id = 'com.google.fonts/check/name/family_and_style_max_length',
+  tables = ['name'],
   rationale = """
     According to a Glyphs tutorial (available at
     https://glyphsapp.com/tutorials/multiple-masters-part-3-setting-up-instances),
@@ -3905,7 +3898,7 @@ def com_google_fonts_check_repo_dirname_match_nameid_1(fonts,
                                                        gfonts_repo_structure):
   """Directory name in GFonts repo structure must
      match NameID 1 of the regular."""
-  from fontTools.ttLib import TTFont
+  from fontbakery.ttfont import get_font
   from fontbakery.utils import (get_name_entry_strings,
                                 get_absolute_path,
                                 get_regular)
@@ -3913,7 +3906,7 @@ def com_google_fonts_check_repo_dirname_match_nameid_1(fonts,
   if not regular:
     yield FAIL, "The font seems to lack a regular."
 
-  entry = get_name_entry_strings(TTFont(regular), NameID.FONT_FAMILY_NAME)[0]
+  entry = get_name_entry_strings(get_font(regular), NameID.FONT_FAMILY_NAME)[0]
   expected = entry.lower()
   expected = "".join(expected.split(' '))
   expected = "".join(expected.split('-'))
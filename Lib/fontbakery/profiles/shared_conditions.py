@@ -8,8 +8,8 @@ from fontbakery.fonts_profile import profile_factory # NOQA pylint: disable=unus
 
 @condition
 def ttFont(font):
-  from fontTools.ttLib import TTFont
-  return TTFont(font)
+  from fontbakery.ttfont import get_font
+  return get_font(font)
 
 
 @condition
@@ -73,7 +73,7 @@ def ligature_glyphs(ttFont):
     return -1  # Indicate fontTools-related crash...
 
 
-@condition
+@condition(persistent=True)
 def glyph_metrics_stats(ttFont):
   """Returns a dict containing whether the font seems_monospaced,
   what's the maximum glyph width and what's the most common width.
@@ -113,7 +113,7 @@ def missing_whitespace_chars(ttFont):
   return missing
 
 
-@condition
+@condition(persistent=True)
 def vmetrics(ttFonts):
   from fontbakery.utils import get_bounding_box
   v_metrics = {"ymin": 0, "ymax": 0}
@@ -81,25 +81,38 @@ def ufo_font(font):
   return defcon.Font(font)
 
 
+def run_ufolint(font):
+  """ Runs ufolint on the UFO `font`, returns a
+  `fontbakery.validators.CommandResult`.
+  """
+  import subprocess
+  from fontbakery.validators import run_command
+  return run_command(["ufolint", font], stderr=subprocess.STDOUT)
+
+
+@register_condition
+@condition
+def ufolint_result(font, fonts):
+  """ The result of ufolint, run for all UFOs at once. """
+  from fontbakery.validators import get_validator_stage
+  return get_validator_stage('ufolint', run_ufolint, fonts).result(font)
+
+
 @register_check(section=basic_checks)
 @check(
   id = 'com.daltonmaag/check/ufolint',
   misc_metadata = {
-    'priority': PriorityLevel.CRITICAL
+    'priority': PriorityLevel.CRITICAL,
+    'io_bound': True
   }
 )
-def com_daltonmaag_check_ufolint(font):
+def com_daltonmaag_check_ufolint(ufolint_result):
   """Run ufolint on UFO source directory."""
-  import subprocess
-  ufolint_cmd = ["ufolint", font]
-
-  try:
-    subprocess.check_output(ufolint_cmd, stderr=subprocess.STDOUT)
-  except subprocess.CalledProcessError as e:
-    yield FAIL, ("ufolint failed the UFO source. Output follows :"
-                 "\n\n{}\n").format(e.output.decode())
-  except OSError:
+  if ufolint_result.returncode is None:
     yield ERROR, "ufolint is not available!"
+  elif ufolint_result.returncode != 0:
+    yield FAIL, ("ufolint failed the UFO source. Output follows :"
+                 "\n\n{}\n").format(ufolint_result.stdout.decode())
   else:
     yield PASS, "ufolint passed the UFO source."
 
@@ -157,31 +157,26 @@ def com_google_fonts_check_os2_metrics_match_hhea(ttFont):
                  " match hhea.ascent/descent.")
 
 
-@condition
+def fontforge_version():
+  """ The version of the stored `fontforge_check_results`: that of the
+  FontForge of the workers.
+  """
+  from fontbakery.fontforgeworker import get_fontforge_pool
+  return get_fontforge_pool().version()
+
+
+@condition(persistent=True, version=fontforge_version)
 def fontforge_check_results(font):
   # Would be AdobeBlank.ttf usually
   if "adobeblank" in font.lower():
     return {"skip": "Skipping AdobeBlank since "
                     "this font is a very peculiar hack."}
 
-  import subprocess
-  cmd = (
-        'import fontforge, sys;'
-        'status = fontforge.open("{}").validate();'
-        'sys.stdout.write(status.__str__());'.format
-        )
-
-  p = subprocess.Popen(['python', '-c', cmd(font)],
-                       stderr=subprocess.PIPE,
-                       stdout=subprocess.PIPE
-                      )
-  ret_val, ff_err_messages = p.communicate()
+  from fontbakery.fontforgeworker import (FontForgeUnavailable,
+                                          get_fontforge_pool)
   try:
-    return {
-      "validation_state": int(ret_val),
-      "ff_err_messages": ff_err_messages.decode("utf-8")
-    }
-  except:
+    return get_fontforge_pool().validate(font)
+  except FontForgeUnavailable:
     return None
 
 
@@ -251,67 +246,103 @@ def com_google_fonts_check_ftxvalidator_is_available(ftxvalidator_is_available):
     return WARN, "ftxvalidator is not available."
 
 
-@check(
-  id = 'com.google.fonts/check/ftxvalidator',
-  conditions = ['ftxvalidator_is_available']
-)
-def com_google_fonts_check_ftxvalidator(font):
-  """Checking with ftxvalidator."""
+def run_ftxvalidator(font):
+  """ Runs ftxvalidator on `font`, and again for a human-readable report if
+  there are fatal errors. Returns `(result, report)`, both
+  `fontbakery.validators.CommandResult`s, `report` may be None.
+  """
   import plistlib
-  try:
-    import subprocess
-    ftx_cmd = [
-        "ftxvalidator",
-        "-t",
-        "all",  # execute all checks
-        font
-    ]
-    ftx_output = subprocess.check_output(ftx_cmd, stderr=subprocess.STDOUT)
-    ftx_data = plistlib.loads(ftx_output)
+  import subprocess
+  from fontbakery.validators import run_command
+  result = run_command(["ftxvalidator",
+                        "-t",
+                        "all",  # execute all checks
+                        font],
+                       stderr=subprocess.STDOUT)
+  report = None
+  if result.returncode == 0:
+    ftx_data = plistlib.loads(result.stdout)
     # we accept kATSFontTestSeverityInformation
     # and kATSFontTestSeverityMinorError
     if 'kATSFontTestSeverityFatalError' \
-       not in ftx_data['kATSFontTestResultKey']:
-      yield PASS, "ftxvalidator passed this file"
-    else:
-      ftx_cmd = [
-          "ftxvalidator",
-          "-T",  # Human-readable output
-          "-r",  # Generate a full report
-          "-t",
-          "all",  # execute all checks
-          font
-      ]
-      ftx_output = subprocess.check_output(ftx_cmd, stderr=subprocess.STDOUT)
-      yield FAIL, f"ftxvalidator output follows:\n\n{ftx_output}\n"
+       in ftx_data['kATSFontTestResultKey']:
+      report = run_command(["ftxvalidator",
+                            "-T",  # Human-readable output
+                            "-r",  # Generate a full report
+                            "-t",
+                            "all",  # execute all checks
+                            font],
+                           stderr=subprocess.STDOUT)
+  return result, report
 
-  except subprocess.CalledProcessError as e:
-    yield ERROR, ("ftxvalidator returned an error code. Output follows:"
-                 "\n\n{}\n").format(e.output.decode('utf-8'))
-  except OSError:
-    yield ERROR, "ftxvalidator is not available!"
+
+@condition
+def ftxvalidator_result(font, fonts):
+  """ The result of `run_ftxvalidator`, run for all fonts at once. """
+  from fontbakery.validators import get_validator_stage
+  return get_validator_stage('ftxvalidator', run_ftxvalidator, fonts) \
+                                                                .result(font)
 
 
 @check(
-  id = 'com.google.fonts/check/ots'
+  id = 'com.google.fonts/check/ftxvalidator',
+  conditions = ['ftxvalidator_is_available'],
+  misc_metadata = {
+    'io_bound': True
+  }
 )
-def com_google_fonts_check_ots(font):
-  """Checking with ots-sanitize."""
+def com_google_fonts_check_ftxvalidator(ftxvalidator_result):
+  """Checking with ftxvalidator."""
+  result, report = ftxvalidator_result
+  if result.returncode is None:
+    yield ERROR, "ftxvalidator is not available!"
+  elif result.returncode != 0 or (report and report.returncode != 0):
+    output = report.stdout if result.returncode == 0 else result.stdout
+    yield ERROR, ("ftxvalidator returned an error code. Output follows:"
+                 "\n\n{}\n").format(output.decode('utf-8'))
+  elif report is None:
+    yield PASS, "ftxvalidator passed this file"
+  else:
+    yield FAIL, f"ftxvalidator output follows:\n\n{report.stdout}\n"
+
+
+def run_ots_sanitize(font):
+  """ Runs ots-sanitize on `font`, returns a
+  `fontbakery.validators.CommandResult`.
+  """
   import ots
+  from fontbakery.validators import CommandResult
+  process = ots.sanitize(font, capture_output=True)
+  return CommandResult(process.returncode, process.stdout, process.stderr)
 
-  try:
-    process = ots.sanitize(font, check=True, capture_output=True)
-  except ots.CalledProcessError as e:
+
+@condition
+def ots_sanitize_result(font, fonts):
+  """ The result of ots-sanitize, run for all fonts at once. """
+  from fontbakery.validators import get_validator_stage
+  return get_validator_stage('ots-sanitize', run_ots_sanitize, fonts) \
+                                                                .result(font)
+
+
+@check(
+  id = 'com.google.fonts/check/ots',
+  misc_metadata = {
+    'io_bound': True
+  }
+)
+def com_google_fonts_check_ots(ots_sanitize_result):
+  """Checking with ots-sanitize."""
+  returncode, stdout, stderr = ots_sanitize_result
+  if returncode:
     yield FAIL, (
       "ots-sanitize returned an error code ({}). Output follows:\n\n{}{}"
-    ).format(e.returncode, e.stderr.decode(), e.stdout.decode())
+    ).format(returncode, stderr.decode(), stdout.decode())
+  elif stderr:
+    yield WARN, (
+      "ots-sanitize passed this file, however warnings were printed:\n\n{}"
+    ).format(stderr.decode())
   else:
-    if process.stderr:
-      yield WARN, (
-        "ots-sanitize passed this file, however warnings were printed:\n\n{}"
-      ).format(process.stderr.decode())
-    else:
-      yield PASS, "ots-sanitize passed this file"
+    yield PASS, "ots-sanitize passed this file"
 
 
 def is_up_to_date(installed, latest):
@@ -338,7 +369,10 @@ def is_up_to_date(installed, latest):
 
 
 @check(
-  id = 'com.google.fonts/check/fontbakery_version'
+  id = 'com.google.fonts/check/fontbakery_version',
+  misc_metadata = {
+    'io_bound': True
+  }
 )
 def com_google_fonts_check_fontbakery_version():
   """Do we have the latest version of FontBakery installed?"""
@@ -375,7 +409,10 @@ def com_google_fonts_check_fontbakery_version():
 
 @check(
   id = 'com.google.fonts/check/fontforge_stderr',
-  conditions = ['fontforge_check_results']
+  conditions = ['fontforge_check_results'],
+  misc_metadata = {
+    'io_bound': True
+  }
 )
 def com_google_fonts_check_fontforge_stderr(font, fontforge_check_results):
   """FontForge validation outputs error messages?"""
@@ -418,7 +455,10 @@ def fontforge_skip_checks():
 
 @check(
   id = 'com.google.fonts/check/fontforge',
-  conditions = ['fontforge_check_results']
+  conditions = ['fontforge_check_results'],
+  misc_metadata = {
+    'io_bound': True
+  }
 )
 def com_google_fonts_check_fontforge(fontforge_check_results, fontforge_skip_checks):
   """FontForge checks."""
@@ -874,75 +914,58 @@ def com_google_fonts_check_glyphnames_max_length(ttFont):
 )
 def com_google_fonts_check_ttx_roundtrip(font):
   """Checking with fontTools.ttx"""
-  from fontTools import ttx
-  import sys
-  ttFont = ttx.TTFont(font)
+  from xml.parsers.expat import ExpatError
+  from fontTools.ttLib import TTFont
+  from fontbakery.ttfont import LazyTTFont
+  from fontbakery.utils import ttx_roundtrip_table
+  # Not the font of the registry: the tables must be decompiled here, to
+  # get the messages of the decompilation. The mapped file is not read again.
+  ttFont = LazyTTFont(font, mapped=True)
+  # the first table is "GlyphOrder", it sets the glyph order of the font
+  imported = TTFont()
   failed = False
 
-  class TTXLogger:
-    msgs = []
-
-    def __init__(self):
-      self.original_stderr = sys.stderr
-      self.original_stdout = sys.stdout
-      sys.stderr = self
-      sys.stdout = self
-
-    def write(self, data):
-      if data not in self.msgs:
-        self.msgs.append(data)
-
-    def restore(self):
-      sys.stderr = self.original_stderr
-      sys.stdout = self.original_stdout
-
-  from xml.parsers.expat import ExpatError
+  export_error_msgs = []
+  import_error_msgs = []
   try:
-    logger = TTXLogger()
-    xml_file = font + ".xml"
-    ttFont.saveXML(xml_file)
-    export_error_msgs = logger.msgs
-
-    if len(export_error_msgs):
-      failed = True
-      yield INFO, ("While converting TTF into an XML file,"
-                   " ttx emited the messages listed below.")
-      for msg in export_error_msgs:
-        yield FAIL, msg.strip()
-
-    f = ttx.TTFont()
-    f.importXML(font + ".xml")
-    import_error_msgs = [msg for msg in logger.msgs if msg not in export_error_msgs]
-
-    if len(import_error_msgs):
-      failed = True
-      yield INFO, ("While importing an XML file and converting"
-                   " it back to TTF, ttx emited the messages"
-                   " listed below.")
-      for msg in import_error_msgs:
-        yield FAIL, msg.strip()
-    logger.restore()
+    for tag in ttFont.keys():
+      export_msgs, import_msgs = ttx_roundtrip_table(ttFont, tag, imported)
+      export_error_msgs += [msg for msg in export_msgs
+                                if msg not in export_error_msgs]
+      import_error_msgs += [msg for msg in import_msgs
+                                if msg not in export_error_msgs + import_error_msgs]
   except ExpatError as e:
     failed = True
     yield FAIL, ("TTX had some problem parsing the generated XML file."
                  " This most likely mean there's some problem in the font."
-		 " Please inspect the output of ttx in order to find more"
-		 " on what went wrong. A common problem is the presence of"
+                 " Please inspect the output of ttx in order to find more"
+                 " on what went wrong. A common problem is the presence of"
                  " control characteres outside the accepted character range"
                  " as defined in the XML spec. FontTools has got a bug which"
                  " causes TTX to generate corrupt XML files in those cases."
                  " So, check the entries of the name table and remove any"
                  " control chars that you find there."
-		 " The full ttx error message was:\n"
-		 "======\n{}\n======".format(e))
+                 " The full ttx error message was:\n"
+                 "======\n{}\n======".format(e))
+
+  if len(export_error_msgs):
+    failed = True
+    yield INFO, ("While converting TTF into an XML file,"
+                 " ttx emited the messages listed below.")
+    for msg in export_error_msgs:
+      yield FAIL, msg.strip()
+
+  if len(import_error_msgs):
+    failed = True
+    yield INFO, ("While importing an XML file and converting"
+                 " it back to TTF, ttx emited the messages"
+                 " listed below.")
+    for msg in import_error_msgs:
+      yield FAIL, msg.strip()
 
   if not failed:
     yield PASS, "Hey! It all looks good!"
 
-  # and then we need to cleanup our mess...
-  if os.path.exists(xml_file):
-    os.remove(xml_file)
-
 
 profile.auto_register(globals())
 profile.test_expected_checks(UNIVERSAL_PROFILE_CHECKS, exclusive=True)
@@ -0,0 +1,51 @@
+"""
+Font Bakery reporters/costs collects the wall time of the checks from the
+TIMING events of the Font Bakery CheckRunner Protocol. The resulting
+document can be passed as `check_costs` to the CheckRunner of a later run,
+to start the most expensive work first.
+
+Separation of Concerns Disclaimer:
+While created specifically for checking fonts and font-families this
+module has no domain knowledge about fonts. It can be used for any kind
+of (document) checking. Please keep it so. It will be valuable for other
+domains as well.
+Domain specific knowledge should be encoded only in the Profile (Checks,
+Conditions) and MAYBE in *customized* reporters e.g. subclasses.
+"""
+from collections import defaultdict
+
+from fontbakery.checkrunner import TIMING
+from fontbakery.reporters import FontbakeryReporter
+
+class CostsReporter(FontbakeryReporter):
+  """
+  Requires a runner created with `timing=True`.
+
+  usage:
+  >> cr = CostsReporter(runner=runner, costs=previous_costs)
+  >> cr.run()
+  >> import json
+  >> print(json.dumps(cr.getdoc()))
+  """
+  def __init__(self, costs=None, **kwd):
+    """
+    costs: the costs of a previous run, {check id: seconds}. Checks that
+    were not executed in this run keep their previous costs.
+    """
+    super(CostsReporter, self).__init__(**kwd)
+    self._previous_costs = dict(costs or {})
+    self._walls = defaultdict(list)
+
+  def _register(self, event):
+    super(CostsReporter, self)._register(event)
+    status, message, (_, check, _) = event
+    # replayed results say nothing about the cost of a check
+    if status == TIMING and not message['stored']:
+      self._walls[check.id].append(message['wall'])
+
+  def getdoc(self):
+    """ Returns {check id: mean wall time of an execution in seconds}. """
+    costs = dict(self._previous_costs)
+    for check_id, walls in self._walls.items():
+      costs[check_id] = sum(walls) / len(walls)
+    return costs
@@ -17,6 +17,7 @@ from fontbakery.checkrunner import (
             , ENDCHECK
             , START
             , END
+            , TIMING
             )
 from fontbakery.reporters import FontbakeryReporter
 
@@ -105,6 +106,8 @@ class SerializeReporter(FontbakeryReporter):
       item['result'] = message # is a Counter
     if status == ENDCHECK:
       item['result'] = message.name # is a Status
+    if status == TIMING:
+      item['timing'] = message # is a dict
     if status >= DEBUG:
       item['logs'].append(dict(
                           status= status.name
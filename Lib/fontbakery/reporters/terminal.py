@@ -14,7 +14,6 @@ Conditions) and MAYBE in *customized* reporters e.g. subclasses.
 """
 import sys
 import os
-import subprocess
 from collections import Counter
 from functools import partial
 
@@ -41,6 +40,7 @@ from fontbakery.checkrunner import (  # NOQA
             , ENDSECTION
             , START
             , END
+            , TIMING
             , Status
             )
 
@@ -58,6 +58,9 @@ statuses = (
             , START
             , END
             )
+# number of entries in the tables of slowest checks and conditions
+TIMING_TABLE_LENGTH = 20
+
 # these are displayed in the result counters
 check_statuses = [ERROR, FAIL, SKIP, PASS, WARN, INFO]
 check_statuses.sort(key=lambda s:s.weight, reverse=True)
@@ -321,6 +324,7 @@ class TerminalProgress(FontbakeryReporter):
   def draw_progressbar(self):
     # tty size
     if sys.platform == "win32":
+      import subprocess
       mode = subprocess.Popen(
           "mode", shell=True, stdout=subprocess.PIPE).stdout.readlines()
       columns_entry = [s for s in mode if b"Columns" in s]
@@ -368,11 +372,16 @@ class TerminalReporter(TerminalProgress):
   def __init__(self, collect_results_by=None
                    , check_threshold=None
                    , log_threshold=None
+                   , show_timing=False
                    , **kwd):
     super(TerminalReporter, self).__init__(**kwd)
     self.results_by = collect_results_by
     self._collected_results = {}
     self._event_buffers = {}
+    # Print the slowest checks and conditions at the end, requires
+    # TIMING events, i.e. a runner created with `timing=True`.
+    self._show_timing = show_timing
+    self._timings = []
 
     # logs can occur at any point in the logging protocol
     # especially DEBUG, INFO, WARNING and ERROR
@@ -409,6 +418,69 @@ class TerminalReporter(TerminalProgress):
         self._collected_results[key] = Counter()
       self._collected_results[key][message.name] += 1
 
+    if self._show_timing and status == TIMING:
+      self._timings.append((check, iterargs, message))
+
+  def _format_iterargs(self, iterargs):
+    if self.runner:
+      return ', '.join('{}[{}]: {}'.format(name, index,
+                                        self.runner.get_iterarg(name, index))
+                                                for name, index in iterargs)
+    return ', '.join('{}[{}]'.format(*item) for item in iterargs)
+
+  def _render_timing(self, print):
+    format = '  {:>9.3f}s {:>9.3f}s  {}'.format
+    checks = sorted(self._timings, key=lambda item: item[2]['wall'],
+                                                            reverse=True)
+    print('Slowest checks (wall time, CPU time):')
+    for check, iterargs, timing in checks[:TIMING_TABLE_LENGTH]:
+      name = check.id
+      if iterargs:
+        name = f'{name} with {self._format_iterargs(iterargs)}'
+      print(format(timing['wall'], timing['cpu'], name))
+    print('')
+
+    lookups = [span for _, _, timing in self._timings
+                                      for span in timing['conditions']]
+    evaluations = [span for span in lookups if not span['cached']]
+    evaluations.sort(key=lambda span: span['wall'], reverse=True)
+    print('Slowest conditions (wall time, CPU time, including the'
+          ' conditions they depend on):')
+    for span in evaluations[:TIMING_TABLE_LENGTH]:
+      name = span['name']
+      if span['iterargs']:
+        name = f'{name} with {self._format_iterargs(span["iterargs"])}'
+      print(format(span['wall'], span['cpu'], name))
+    print('')
+    print('Condition lookups: {} ({} cache hits, {} cache misses)'.format(
+              len(lookups), len(lookups) - len(evaluations), len(evaluations)))
+    print('')
+
+    loads = {}
+    for _, _, timing in self._timings:
+      for load in timing['loads']:
+        if load['name'] not in loads:
+          loads[load['name']] = {'count': 0, 'wall': 0, 'cpu': 0
+                               , 'by': set(), 'undeclared': set()}
+        item = loads[load['name']]
+        item['count'] += 1
+        item['wall'] += load['wall']
+        item['cpu'] += load['cpu']
+        item['by'].add(load['by'])
+        if load['declared'] is False:
+          item['undeclared'].add(load['by'])
+    if loads:
+      print('Loaded on demand (count, wall time, CPU time, loaded by):')
+      for name, item in sorted(loads.items(),
+                               key=lambda item: item[1]['wall'], reverse=True):
+        by = ', '.join(sorted(str(by) for by in item['by']))
+        print('  {:>5} {:>9.3f}s {:>9.3f}s  {}: {}'.format(item['count'],
+                                    item['wall'], item['cpu'], name, by))
+        if item['undeclared']:
+          print('        not declared in the tables of: {}'.format(', '.join(
+                              sorted(str(by) for by in item['undeclared']))))
+      print('')
+
   def _render_event_sync(self, print, event):
     status, message, (section, check, iterargs) = event
 
@@ -484,6 +556,9 @@ class TerminalReporter(TerminalProgress):
                                                 color=self._use_color))
           print('')
 
+      if self._show_timing:
+        self._render_timing(print)
+
       print('Total:')
       print('')
       print(_render_results_counter(message, color=self._use_color))
@@ -533,6 +608,10 @@ class TerminalReporter(TerminalProgress):
     output = StringIO()
     print = partial(builtins.print, file=output)
 
+    if status == TIMING:
+      # collected in _register, rendered at the END
+      return output.getvalue()
+
     if self._render_async:
       self._render_event_async(print, event)
     else:
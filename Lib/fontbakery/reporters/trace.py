@@ -0,0 +1,127 @@
+"""
+Font Bakery reporters/trace writes the TIMING events of the Font Bakery
+CheckRunner Protocol as a document in the Chrome Trace Event Format. It
+can be opened e.g. in Perfetto, chrome://tracing or speedscope.
+
+Each check execution is a span, the conditions evaluated for it are spans
+nested within. Each process (worker) and thread gets its own track.
+
+Separation of Concerns Disclaimer:
+While created specifically for checking fonts and font-families this
+module has no domain knowledge about fonts. It can be used for any kind
+of (document) checking. Please keep it so. It will be valuable for other
+domains as well.
+Domain specific knowledge should be encoded only in the Profile (Checks,
+Conditions) and MAYBE in *customized* reporters e.g. subclasses.
+"""
+import os
+
+from fontbakery.checkrunner import TIMING
+from fontbakery.reporters import FontbakeryReporter
+
+class TraceReporter(FontbakeryReporter):
+  """
+  Requires a runner created with `timing=True`.
+
+  usage:
+  >> tr = TraceReporter(runner=runner)
+  >> tr.run()
+  >> import json
+  >> print(json.dumps(tr.getdoc()))
+  """
+  def __init__(self, **kwd):
+    super(TraceReporter, self).__init__(**kwd)
+    self._timings = []
+
+  def _register(self, event):
+    super(TraceReporter, self)._register(event)
+    status, message, identity = event
+    if status == TIMING:
+      self._timings.append((identity, message))
+
+  def _format_iterargs(self, iterargs):
+    result = {}
+    for name, index in iterargs:
+      key = f'{name}[{index}]'
+      result[key] = self.runner.get_iterarg(name, index) if self.runner \
+                                                         else index
+    return result
+
+  def getdoc(self):
+    if not self._ended:
+      raise Exception('Can\'t create doc before END status was recevived.')
+    origin = min((timing['start'] for _, timing in self._timings), default=0)
+    # the trace event format uses microseconds
+    microseconds = lambda seconds: round(seconds * 1000000)
+
+    events = []
+    tracks = set()
+    for (section, check, iterargs), timing in self._timings:
+      pid, tid = timing['pid'], timing['thread']
+      tracks.add((pid, tid))
+      cached = sum(1 for span in timing['conditions'] if span['cached'])
+      events.append({
+          'name': check.id
+        , 'cat': 'check'
+        , 'ph': 'X'
+        , 'ts': microseconds(timing['start'] - origin)
+        , 'dur': microseconds(timing['end'] - timing['start'])
+        , 'pid': pid
+        , 'tid': tid
+        , 'args': {
+              'section': section.name
+            , 'iterargs': self._format_iterargs(iterargs)
+            , 'wall': timing['wall']
+            , 'cpu': timing['cpu']
+            , 'stored': timing['stored']
+            , 'condition cache hits': cached
+            , 'condition cache misses': len(timing['conditions']) - cached
+          }
+      })
+      for span in timing['conditions']:
+        if span['cached']:
+          continue
+        events.append({
+            'name': span['name']
+          , 'cat': 'condition'
+          , 'ph': 'X'
+          , 'ts': microseconds(span['start'] - origin)
+          , 'dur': microseconds(span['wall'])
+          , 'pid': pid
+          , 'tid': tid
+          , 'args': {
+                'iterargs': self._format_iterargs(span['iterargs'])
+              , 'cpu': span['cpu']
+            }
+        })
+      for load in timing['loads']:
+        events.append({
+            'name': load['name']
+          , 'cat': 'load'
+          , 'ph': 'X'
+          , 'ts': microseconds(load['start'] - origin)
+          , 'dur': microseconds(load['wall'])
+          , 'pid': pid
+          , 'tid': tid
+          , 'args': {
+                'subject': load['subject']
+              , 'by': load['by']
+              , 'declared': load['declared']
+              , 'cpu': load['cpu']
+            }
+        })
+
+    # name the tracks
+    main_pid = os.getpid()
+    for pid in sorted({pid for pid, _ in tracks}):
+      events.append({
+          'name': 'process_name'
+        , 'ph': 'M'
+        , 'pid': pid
+        , 'args': {'name': 'main process' if pid == main_pid \
+                                          else f'worker {pid}'}
+      })
+    return {
+        'traceEvents': events
+      , 'displayTimeUnit': 'ms'
+    }
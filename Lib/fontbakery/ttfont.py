@@ -0,0 +1,205 @@
+"""
+Font Bakery ttfont opens the fonts that are checked.
+
+Checks and conditions get fonts with `get_font(path)`, from the
+`FontRegistry` of the running CheckRunner, so that each font file is parsed
+only once per run, e.g. by the `ttFont` condition and by conditions that
+need the font of another path, like the regular of the family.
+
+The tables of a `LazyTTFont` are decompiled only when they are used, each
+decompilation is recorded with `fontbakery.checkrunner.record_load` in the
+TIMING event of the check that caused it, e.g. to see which tables a run
+restricted to a few checks decompiles, and whether the checks and
+conditions that read them declared them with `tables=`.
+
+By default the registry maps the font files into memory (`mmap`), instead
+of reading them: the "glyf" table data of a mapped font are `memoryview`s
+over the mapped file, not copies, and `FontRegistry.get_buffer` returns the
+whole file without copying it, for conditions that need the raw bytes.
+"""
+import mmap
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+
+from fontTools.ttLib import TTFont, TTLibError
+from fontTools.ttLib.sfnt import SFNTReader
+
+from fontbakery.checkrunner import (
+              file_digest
+            , get_runner_scoped
+            , record_load
+            )
+
+# CPU time of the current thread, if available.
+_thread_time = getattr(time, 'thread_time', time.process_time)
+
+# The decompilation of a table can decompile other tables (e.g. "glyf"
+# needs "loca" and "head"), their time is subtracted, so that each table
+# is recorded with its own cost only.
+_nested = threading.local()
+
+class MappedFile:
+  """ A read only file object over a memory mapped file. """
+  def __init__(self, path):
+    self.name = path
+    self.closed = False
+    self._position = 0
+    with open(path, 'rb') as f:
+      # the mapping stays valid after the file is closed
+      self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+  def getbuffer(self):
+    return memoryview(self._map)
+
+  def view(self, offset, length):
+    if offset + length > len(self._map):
+      raise TTLibError(f'unexpected end of data at offset {offset}'
+                       f' in {self.name}')
+    return memoryview(self._map)[offset:offset + length]
+
+  def read(self, size=-1):
+    end = len(self._map) if size is None or size < 0 \
+                         else min(self._position + size, len(self._map))
+    data = self._map[self._position:end]
+    self._position = end
+    return data
+
+  def seek(self, offset, whence=os.SEEK_SET):
+    if whence == os.SEEK_CUR:
+      offset += self._position
+    elif whence == os.SEEK_END:
+      offset += len(self._map)
+    self._position = offset
+    return offset
+
+  def tell(self):
+    return self._position
+
+  def seekable(self):
+    return True
+
+  def close(self):
+    # The mapping can't be closed while there are views of it, it is
+    # unmapped when the last one is garbage collected.
+    self.closed = True
+
+
+class MappedSFNTReader(SFNTReader):
+  """ Returns the data of the tables in `VIEW_TABLES` as views of the
+  mapped file. The data of the other tables is copied: they are
+  decompiled into Python objects anyway.
+  """
+  VIEW_TABLES = {'glyf'}
+
+  def __getitem__(self, tag):
+    if tag in self.VIEW_TABLES and not self.checkChecksums:
+      entry = self.tables[tag]
+      return self.file.view(entry.offset, entry.length)
+    return super(MappedSFNTReader, self).__getitem__(tag)
+
+
+class LazyTTFont(TTFont):
+  def __init__(self, file=None, lazy=True, mapped=False, **kwds):
+    """
+    mapped: if True and `file` is a path, the file is memory mapped.
+    """
+    if mapped and isinstance(file, str):
+      file = MappedFile(file)
+    super(LazyTTFont, self).__init__(file, lazy=lazy, **kwds)
+    if isinstance(file, MappedFile) and type(self.reader) is SFNTReader \
+                                    and self.reader.flavor is None:
+      self.reader = MappedSFNTReader(file, self.reader.checkChecksums,
+                                     fontNumber=kwds.get('fontNumber', -1))
+    self._subject = file if isinstance(file, str) \
+                         else getattr(file, 'name', None)
+
+  def getTableData(self, tag):
+    # The table data of a mapped font can be a view of the file (see
+    # `MappedSFNTReader`), fontTools needs bytes to write the font.
+    data = super(LazyTTFont, self).getTableData(tag)
+    return bytes(data) if isinstance(data, memoryview) else data
+
+  def _readTable(self, tag):
+    stack = getattr(_nested, 'stack', None)
+    if stack is None:
+      stack = _nested.stack = []
+    stack.append([0, 0])
+    start, wall_start, cpu_start = time.time(), time.perf_counter(), \
+                                                              _thread_time()
+    try:
+      return super(LazyTTFont, self)._readTable(tag)
+    finally:
+      wall = time.perf_counter() - wall_start
+      cpu = _thread_time() - cpu_start
+      nested_wall, nested_cpu = stack.pop()
+      if stack:
+        stack[-1][0] += wall
+        stack[-1][1] += cpu
+      record_load(str(tag), self._subject, start, wall - nested_wall,
+                  cpu - nested_cpu, dependency=bool(stack))
+
+
+class FontRegistry:
+  """ The fonts of a run, keyed by path and the SHA-256 of the file
+  contents, so that a file that changed is parsed again.
+
+  Fonts are only kept while they are used elsewhere, e.g. in the condition
+  cache of the runner, so that the memory policy of the condition cache
+  also applies to them.
+
+  mapped: if True, the font files are memory mapped, see `MappedFile`.
+  """
+  def __init__(self, font_class=LazyTTFont, mapped=True):
+    self._font_class = font_class
+    self._mapped = mapped
+    self._fonts = weakref.WeakValueDictionary()
+    # {path: (mtime, size, digest)}
+    self._digests = {}
+    self._lock = threading.Lock()
+    # {path: number of times the file was parsed}
+    self.parse_counts = Counter()
+
+  def _get_digest(self, path):
+    stat = os.stat(path)
+    known = self._digests.get(path, None)
+    if known is None or known[:2] != (stat.st_mtime_ns, stat.st_size):
+      known = (stat.st_mtime_ns, stat.st_size, file_digest(path))
+      self._digests[path] = known
+    return known[2]
+
+  def get(self, path):
+    absolute = os.path.abspath(path)
+    with self._lock:
+      key = (absolute, self._get_digest(absolute))
+      font = self._fonts.get(key, None)
+      if font is None:
+        font = self._font_class(path, mapped=self._mapped)
+        self._fonts[key] = font
+        self.parse_counts[absolute] += 1
+      return font
+
+  def get_buffer(self, path):
+    """ Returns the contents of the font file at `path`, without copying
+    them if the file is mapped.
+    """
+    file = self.get(path).reader.file
+    if isinstance(file, MappedFile):
+      return file.getbuffer()
+    with open(path, 'rb') as f:
+      return memoryview(f.read())
+
+
+def get_registry():
+  """ The FontRegistry of the running CheckRunner, see `get_font`. """
+  return get_runner_scoped('fontbakery.ttfont.FontRegistry', FontRegistry)
+
+
+def get_font(path):
+  """ Returns the font at `path`, parsed only once per run. Without a
+  running CheckRunner (e.g. when a check is called directly), the font is
+  parsed on each call.
+  """
+  return get_registry().get(path)
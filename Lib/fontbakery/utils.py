@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import logging
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 
 from fontTools.ttLib import TTFont
 from typing import Text, Optional
@@ -56,12 +60,12 @@ def get_bounding_box(font):
         ymin = font['head'].yMin
         ymax = font['head'].yMax
     else:
-        for g in font['glyf'].glyphs:
-            char = font['glyf'][g]
-            if hasattr(char, 'yMin') and ymin > char.yMin:
-                ymin = char.yMin
-            if hasattr(char, 'yMax') and ymax < char.yMax:
-                ymax = char.yMax
+        from fontbakery.glyphgeometry import get_glyph_geometry
+        geometry = get_glyph_geometry(font)
+        bounds = geometry.bounds[geometry.has_bounds]
+        if len(bounds):
+            ymin = min(ymin, int(bounds[:, 1].min()))
+            ymax = max(ymax, int(bounds[:, 3].max()))
     return ymin, ymax
 
 
@@ -112,24 +116,16 @@ def glyph_contour_count(font, name):
     This implementation will also return contour count for
     composite glyphs.
     """
-    contour_count = 0
-    items = [font['glyf'][name]]
-
-    while items:
-        g = items.pop(0)
-        if g.isComposite():
-            for comp in g.components:
-                if comp.glyphName != ".ttfautohint":
-                    items.append(font['glyf'][comp.glyphName])
-        if g.numberOfContours != -1:
-            contour_count += g.numberOfContours
-    return contour_count
+    from fontbakery.glyphgeometry import get_glyph_geometry
+    return get_glyph_geometry(font).contour_count(name,
+                                                  exclude=[".ttfautohint"])
 
 
 def get_font_glyph_data(font):
     """Return information for each glyph in a font"""
     from fontbakery.constants import (PlatformID,
                                       WindowsEncodingID)
+    from fontbakery.glyphgeometry import get_glyph_geometry
     font_data = []
 
     try:
@@ -146,10 +142,15 @@ def get_font_glyph_data(font):
 
     cmap_reversed = dict(zip(cmap.values(), cmap.keys()))
 
+    geometry = None
     for glyph_name in font.getGlyphSet().keys():
         if glyph_name in cmap_reversed:
             uni_glyph = cmap_reversed[glyph_name]
-            contours = glyph_contour_count(font, glyph_name)
+            if geometry is None:
+                # decoded once for all glyphs, see glyph_contour_count
+                geometry = get_glyph_geometry(font)
+            contours = geometry.contour_count(glyph_name,
+                                              exclude=[".ttfautohint"])
             font_data.append({
                 'unicode': uni_glyph,
                 'name': glyph_name,
@@ -187,6 +188,14 @@ class BadCertificateSetupException(Exception):
     pass
 
 
+BAD_CERTIFICATE_SETUP_MESSAGE = ("You probably installed official"
+            " Mac python from python.org but forgot to also install"
+            " the certificates. There is a note in the installer"
+            " Readme about that. Check the Python folder in the"
+            " Applications directory, you should find a shell script"
+            " to install the certificates.")
+
+
 def download_file(url):
   from urllib.request import urlopen
   from urllib.error import URLError
@@ -195,12 +204,60 @@ def download_file(url):
     return BytesIO(urlopen(url).read())
   except URLError as e:
     if "CERTIFICATE_VERIFY_FAILED" in str(e.reason):
-      raise BadCertificateSetupException("You probably installed official"
-            " Mac python from python.org but forgot to also install"
-            " the certificates. There is a note in the installer"
-            " Readme about that. Check the Python folder in the"
-            " Applications directory, you should find a shell script"
-            " to install the certificates.")
+      raise BadCertificateSetupException(BAD_CERTIFICATE_SETUP_MESSAGE)
+
+
+class LogMessages(logging.Handler):
+  """ Collects the messages of the log records of one thread, once each. """
+  def __init__(self, level=logging.WARNING):
+    super(LogMessages, self).__init__(level)
+    self.messages = []
+    self._thread = threading.get_ident()
+
+  def emit(self, record):
+    if record.thread != self._thread:
+      return
+    message = record.getMessage()
+    if message not in self.messages:
+      self.messages.append(message)
+
+
+@contextmanager
+def capture_log_messages(name='fontTools', level=logging.WARNING):
+  """ Yields the list of the messages logged by logger `name` (and its
+  children) in the current thread while the context is active, instead of
+  swapping sys.stdout and sys.stderr, so other threads are not affected.
+  """
+  handler = LogMessages(level)
+  logger = logging.getLogger(name)
+  logger.addHandler(handler)
+  try:
+    yield handler.messages
+  finally:
+    logger.removeHandler(handler)
+
+
+# XML buffers bigger than this are spooled to a temporary file
+TTX_SPOOL_SIZE = 32 * 2**20
+
+def ttx_roundtrip_table(ttFont, tag, imported):
+  """ Converts the table `tag` of `ttFont` to TTX and imports the TTX into
+  the font `imported`, in memory (or a temporary file for big tables).
+  Returns the lists of the messages fontTools logged while exporting and
+  importing. Raises `xml.parsers.expat.ExpatError` if the TTX can't be
+  parsed.
+
+  Some tables need other tables when they are imported (e.g. "gvar" needs
+  "glyf"), those must be imported before, into the same font. Round-trips
+  into different fonts are independent, they can run in parallel threads.
+  """
+  with tempfile.SpooledTemporaryFile(max_size=TTX_SPOOL_SIZE) as xml:
+    with capture_log_messages() as export_messages:
+      ttFont.saveXML(xml, tables=[tag])
+    xml.seek(0)
+    with capture_log_messages() as import_messages:
+      imported.importXML(xml)
+  return export_messages, import_messages
 
 
 def cff_glyph_has_ink(font: TTFont, glyph_name: Text) -> bool:
@@ -0,0 +1,148 @@
+"""
+Font Bakery validators runs external validators (command line tools, like
+ots-sanitize) for all items of a run at once, instead of one after another
+in the checks.
+
+A condition of an item gets the result of the validator for the item from
+the `ValidatorStage` returned by `get_validator_stage`, with all items of
+the run, e.g.:
+
+  @condition
+  def tool_result(font, fonts):
+    return get_validator_stage('tool', run_tool, fonts).result(font)
+
+The first call starts the validator for all items on a thread pool (the
+tools run in subprocesses, the threads only wait for them), each call then
+only waits for the result of its own item. The stage is scoped to the
+running CheckRunner, see `fontbakery.checkrunner.get_runner_scoped`. In
+the worker processes of a `fontbakery.multiproc.MultiprocessingRunner`, the
+stage has only the items of the shard of the worker.
+
+Tools that validate many items in one invocation, paying their startup
+only once, use a `ValidatorBatch` (`get_validator_batch`) instead, which
+calls the validator once with all items.
+
+Separation of Concerns Disclaimer:
+While created specifically for checking fonts and font-families this
+module has no domain knowledge about fonts. It can be used for any kind
+of (document) checking. Please keep it so. It will be valuable for other
+domains as well.
+Domain specific knowledge should be encoded only in the Profile (Checks,
+Conditions) and MAYBE in *customized* reporters e.g. subclasses.
+"""
+import os
+import subprocess
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from fontbakery.checkrunner import (add_background_task,
+                                    get_current_runner,
+                                    get_runner_scoped)
+
+_lock = threading.Lock()
+
+# returncode is None if the command could not be executed
+CommandResult = namedtuple('CommandResult', ['returncode', 'stdout', 'stderr'])
+
+
+def run_command(command, **kwds):
+  """ Runs `command` and returns a `CommandResult`, with the output as
+  bytes. Keywords are passed to `subprocess.run`, e.g. `stderr=STDOUT`.
+  """
+  kwds.setdefault('stdout', subprocess.PIPE)
+  kwds.setdefault('stderr', subprocess.PIPE)
+  try:
+    process = subprocess.run(command, **kwds)
+  except OSError as e:
+    return CommandResult(None, b'', str(e).encode('utf-8'))
+  return CommandResult(process.returncode, process.stdout or b'',
+                       process.stderr or b'')
+
+
+class ValidatorStage:
+  """ Runs `validate(item)` for each of `items`, on `max_workers` threads
+  (by default the number of CPUs), starting with the first `result` call.
+  """
+  def __init__(self, validate, items, max_workers=None):
+    self._validate = validate
+    self._items = list(items)
+    self._max_workers = max_workers or os.cpu_count() or 1
+    self._futures = None
+    self._lock = threading.Lock()
+
+  def start(self):
+    with self._lock:
+      if self._futures is None:
+        executor = ThreadPoolExecutor(self._max_workers)
+        self._futures = {item: executor.submit(self._validate, item)
+                           for item in dict.fromkeys(self._items)}
+        for future in self._futures.values():
+          add_background_task(future)
+        # the threads end when all items are done
+        executor.shutdown(wait=False)
+
+  def result(self, item):
+    """ The result of `validate(item)`, raises its exceptions. Items that
+    are not part of the stage are validated right away.
+    """
+    self.start()
+    future = self._futures.get(item, None)
+    if future is None:
+      return self._validate(item)
+    return future.result()
+
+
+class ValidatorBatch:
+  """ Runs `validate_all(items)` once, for tools that take all items in one
+  invocation, with the first `result` call. `validate_all` returns a dict
+  of {item: result}.
+  """
+  def __init__(self, validate_all, items):
+    self._validate_all = validate_all
+    self._items = list(dict.fromkeys(items))
+    self._results = None
+    self._lock = threading.Lock()
+
+  def result(self, item):
+    """ The result of `item`, raises the exceptions of `validate_all`.
+    Items that are not part of the batch are validated on their own.
+    """
+    if item not in self._items:
+      return self._validate_all([item])[item]
+    with self._lock:
+      if self._results is None:
+        self._results = self._validate_all(self._items)
+    return self._results[item]
+
+
+def _get_scoped(kind, name, items, factory):
+  """ `factory(items)` for the running CheckRunner, once per run, with
+  only the items of its shard, see `CheckRunner.shard_items`.
+  """
+  runner = get_current_runner()
+  if runner is None:
+    return factory(())
+  items = runner.shard_items(items)
+  validators = get_runner_scoped(f'fontbakery.validators.{kind}', dict)
+  key = (name, tuple(items))
+  with _lock:
+    if key not in validators:
+      validators[key] = factory(items)
+    return validators[key]
+
+
+def get_validator_stage(name, validate, items, max_workers=None):
+  """ Returns the `ValidatorStage` `name` for `items` of the running
+  CheckRunner, the same one for the whole run. Without a running
+  CheckRunner (e.g. when a condition is called directly), the returned
+  stage has no items, it validates only the items asked for.
+  """
+  return _get_scoped('ValidatorStage', name, items,
+              lambda items: ValidatorStage(validate, items, max_workers))
+
+
+def get_validator_batch(name, validate_all, items):
+  """ Like `get_validator_stage`, for a `ValidatorBatch`. """
+  return _get_scoped('ValidatorBatch', name, items,
+              lambda items: ValidatorBatch(validate_all, items))
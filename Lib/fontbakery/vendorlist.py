@@ -0,0 +1,69 @@
+"""
+Font Bakery vendorlist provides the vendor IDs registered with Microsoft,
+for the `registered_vendor_ids` condition of the googlefonts profile.
+
+The vendor list is a page of Microsoft's website, `VENDOR_LIST_URL`. Its
+HTML is kept in `data/fontbakery-microsoft-vendorlist.cache` and converted
+once into `data/fontbakery-microsoft-vendorlist.json`, a JSON object of
+{vendor ID: vendor name}, which is what is shipped and loaded, so that the
+HTML is not parsed on each run. `fontbakery update-vendorlist` downloads
+the page again and regenerates both files.
+"""
+import json
+import os
+import threading
+
+VENDOR_LIST_URL = 'https://docs.microsoft.com/en-us/typography/vendors/'
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+VENDOR_LIST_HTML_PATH = os.path.join(DATA_DIR,
+                                     'fontbakery-microsoft-vendorlist.cache')
+VENDOR_IDS_PATH = os.path.join(DATA_DIR, 'fontbakery-microsoft-vendorlist.json')
+
+
+def parse_vendor_list(content):
+  """ Returns a dict of {vendor ID: vendor name} of the HTML `content` of
+  the vendor list page. The IDs are padded with spaces to 4 characters,
+  like the OS/2 achVendID.
+  """
+  from bs4 import BeautifulSoup
+  soup = BeautifulSoup(content, 'html.parser')
+
+  registered_vendor_ids = {}
+  IDs = [chr(c + ord('a')) for c in range(ord('z') - ord('a') + 1)]
+  IDs.append("0-9-")
+
+  for section_id in IDs:
+    section = soup.find('h2', {'id': section_id})
+    table = section.find_next_sibling('table')
+    if not table: continue
+
+    for row in table.findAll('tr'):
+      cells = row.findAll('td')
+      # pad the code to make sure it is a 4 char string,
+      # otherwise eg "CF  " will not be matched to "CF"
+      code = cells[0].string.strip()
+      code = code + (4 - len(code)) * ' '
+      labels = [label for label in cells[1].stripped_strings]
+      registered_vendor_ids[code] = labels[0]
+
+  return registered_vendor_ids
+
+
+def write_vendor_ids(path, vendor_ids):
+  with open(path, 'w', encoding='utf-8') as f:
+    json.dump(vendor_ids, f, sort_keys=True, indent=0, ensure_ascii=False)
+    f.write('\n')
+
+
+_vendor_ids = None
+_lock = threading.Lock()
+def get_registered_vendor_ids():
+  """ The dict of {vendor ID: vendor name} of `VENDOR_IDS_PATH`, loaded on
+  the first call only. It is shared, don't modify it.
+  """
+  global _vendor_ids
+  with _lock:
+    if _vendor_ids is None:
+      with open(VENDOR_IDS_PATH, encoding='utf-8') as f:
+        _vendor_ids = json.load(f)
+    return _vendor_ids
@@ -44,7 +44,7 @@ setup(
               'fontbakery.profiles',
               'fontbakery.commands'
               ],
-    package_data={'fontbakery': ['data/*.cache']},
+    package_data={'fontbakery': ['data/*.cache', 'data/*.bin', 'data/*.json']},
     classifiers=[
         'Environment :: Console',
         'Intended Audience :: Developers',
@@ -63,6 +63,7 @@ setup(
         'font-v',
         'fontTools[ufo,lxml,unicode]>=3.34',  # 3.34 fixed some CFF2 issues, including calcBounds
         'lxml',
+        'numpy',
         'opentype-sanitizer>=7.1.9',  # 7.1.9 fixes caret value format = 3 bug
                                       # (see https://github.com/khaledhosny/ots/pull/182)
         'protobuf>=3.7.0',  # 3.7.0 fixed a bug on parsing some METADATA.pb files
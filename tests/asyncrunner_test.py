@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+from fontbakery.asyncrunner import AsyncCheckRunner, distribute_async_generator
+from fontbakery.callable import check, condition
+from fontbakery.checkrunner import (
+              Section
+            , CheckRunner
+            , PASS
+            , WARN
+            , START
+            , END
+            , ENDCHECK
+            )
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.reporters.serialize import SerializeReporter
+from fontbakery.utils import TEST_FILE
+
+
+@condition
+def num_glyphs(ttFont):
+  return len(ttFont.getGlyphOrder())
+
+
+@check(id='com.example/check/sync')
+def check_sync(num_glyphs):
+  """Synchronous check."""
+  return PASS, f'{num_glyphs} glyphs'
+
+
+@check(id='com.example/check/coroutine')
+async def check_coroutine(font):
+  """Coroutine check."""
+  await asyncio.sleep(0.2)
+  return PASS, 'waited'
+
+
+@check(id='com.example/check/async_generator')
+async def check_async_generator(num_glyphs):
+  """Async generator check."""
+  await asyncio.sleep(0.2)
+  yield WARN, 'waited'
+  yield PASS, f'{num_glyphs} glyphs'
+
+
+def _get_profile():
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({
+      'num_glyphs': num_glyphs
+    , 'check_sync': check_sync
+    , 'check_coroutine': check_coroutine
+    , 'check_async_generator': check_async_generator
+  })
+  return profile
+
+
+def _run(coroutine):
+  loop = asyncio.new_event_loop()
+  try:
+    return loop.run_until_complete(coroutine)
+  finally:
+    loop.close()
+
+
+def test_async_check_runner():
+  """ Coroutine checks are awaited concurrently, the reports equal the
+  reports of a synchronous run. """
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf")]
+  profile = _get_profile()
+  async_runner = AsyncCheckRunner(profile, values={'fonts': fonts})
+  async_reporter = SerializeReporter(runner=async_runner, is_async=True)
+  events = []
+  start = time.time()
+  _run(distribute_async_generator(async_runner.run(),
+                                  [events.append, async_reporter.receive]))
+  # four coroutine checks sleep 0.2 seconds each
+  assert time.time() - start < 0.6
+  assert events[0][0] == START
+  assert events[-1][0] == END
+  assert len([e for e in events if e[0] == ENDCHECK]) == 3 * 2
+
+  sync_runner = CheckRunner(profile, values={'fonts': fonts})
+  sync_reporter = SerializeReporter(runner=sync_runner)
+  sync_reporter.run()
+  assert async_reporter.getdoc() == sync_reporter.getdoc()
+
+
+def test_cancelled_run_does_not_wait_for_checks():
+  """ Cancelling the consumer of the events doesn't block the event loop
+  until the running check is done, the waiting checks are not run. """
+  started, release = threading.Event(), threading.Event()
+  calls = []
+
+  @check(id='com.example/check/blocking')
+  def check_blocking(font):
+    """Blocking check."""
+    calls.append(font)
+    started.set()
+    release.wait(10)
+    return PASS, 'released'
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_blocking': check_blocking})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf"),
+           TEST_FILE("cabin/Cabin-Italic.ttf")]
+  runner = AsyncCheckRunner(profile, values={'fonts': fonts})
+
+  async def cancel_while_running():
+    events = runner.run()
+    assert (await events.__anext__())[0] == START
+    task = asyncio.ensure_future(events.__anext__())
+    while not started.is_set():
+      await asyncio.sleep(0.01)
+    start = time.time()
+    task.cancel()
+    try:
+      await task
+    except asyncio.CancelledError:
+      pass
+    return time.time() - start
+
+  try:
+    assert _run(cancel_while_running()) < 1
+  finally:
+    release.set()
+  time.sleep(0.2)
+  assert calls == fonts[:1]
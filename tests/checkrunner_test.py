@@ -0,0 +1,428 @@
+import os
+import threading
+import time
+
+import pytest
+
+from fontbakery.callable import check, condition
+from fontbakery.checkrunner import (
+              Section
+            , CheckRunner
+            , ConditionCache
+            , RefCountConditionCache
+            , LRUConditionCache
+            , PersistentConditionCache
+            , ResultStore
+            , PASS
+            , ERROR
+            , START
+            , ENDCHECK
+            , TIMING
+            )
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.utils import TEST_FILE
+
+
+@condition
+def glyph_order(ttFont):
+  return ttFont.getGlyphOrder()
+
+
+@check(id='com.example/check/glyph_order')
+def check_glyph_order(glyph_order):
+  """Font has a glyph order?"""
+  yield PASS, f'{len(glyph_order)} glyphs'
+
+
+@check(id='com.example/check/notdef')
+def check_notdef(glyph_order):
+  """Font has a .notdef glyph?"""
+  yield PASS, f'{glyph_order[0]}'
+
+
+def _get_profile():
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({
+      'glyph_order': glyph_order
+    , 'check_glyph_order': check_glyph_order
+    , 'check_notdef': check_notdef
+  })
+  return profile
+
+
+def _run(condition_cache):
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf")]
+  runner = CheckRunner(_get_profile(), values={'fonts': fonts},
+                       condition_cache=condition_cache)
+  return [(status, f'{message}' if status != START else len(message), identity)
+          for status, message, identity in runner.run()]
+
+
+def test_condition_cache_policies():
+  """ All cache policies produce the same results. """
+  expected = _run(ConditionCache())
+
+  refcount = RefCountConditionCache()
+  assert _run(refcount) == expected
+  # All conditions were dropped after their last use.
+  assert len(refcount) == 0
+
+  lru = LRUConditionCache(max_bytes=1)
+  assert _run(lru) == expected
+  # The most recently used value is kept regardless of the budget.
+  assert len(lru) == 1
+
+
+def test_persistent_condition_cache(tmp_path):
+  """ Values of persistent conditions are reused by later runs. """
+  calls = []
+
+  @condition(persistent=True)
+  def upem(ttFont):
+    calls.append(ttFont.reader.file.name)
+    return ttFont['head'].unitsPerEm
+
+  @check(id='com.example/check/upem')
+  def check_upem(upem):
+    """Font has units per em?"""
+    yield PASS, f'{upem}'
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'upem': upem, 'check_upem': check_upem})
+  font = str(tmp_path / 'font.ttf')
+  with open(TEST_FILE("cabin/Cabin-Regular.ttf"), 'rb') as source, \
+       open(font, 'wb') as target:
+    target.write(source.read())
+
+  def run():
+    runner = CheckRunner(profile, values={'fonts': [font]},
+                       persistent_cache=PersistentConditionCache(
+                                                  str(tmp_path / 'cache')))
+    return [f'{message}' for status, message, _ in runner.run()
+                                                  if status == PASS]
+
+  assert run() == ['1000']
+  assert run() == ['1000']
+  assert len(calls) == 1
+
+  # Changed contents invalidate the stored value.
+  with open(font, 'ab') as target:
+    target.write(b'\0' * 4)
+  assert run() == ['1000']
+  assert len(calls) == 2
+
+
+def test_persistent_condition_tool_version(tmp_path):
+  """ Stored values are not reused after the version of the tool that
+  computed them changed, nor stored if it is unknown. """
+  calls = []
+  tool = {'version': '1.0'}
+
+  def tool_version():
+    if tool['version'] is None:
+      raise OSError('tool not installed')
+    return tool['version']
+
+  @condition(persistent=True, version=tool_version)
+  def tool_result(font):
+    calls.append(font)
+    return tool['version']
+
+  @check(id='com.example/check/tool')
+  def check_tool(tool_result):
+    """Tool is happy?"""
+    yield PASS, tool_result
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'tool_result': tool_result, 'check_tool': check_tool})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+
+  def run():
+    runner = CheckRunner(profile, values={'fonts': fonts},
+                       persistent_cache=PersistentConditionCache(
+                                                  str(tmp_path / 'cache')))
+    return [message for status, message, _ in runner.run() if status == PASS]
+
+  assert run() == ['1.0']
+  assert run() == ['1.0']
+  assert len(calls) == 1
+
+  tool['version'] = '2.0'
+  assert run() == ['2.0']
+  assert len(calls) == 2
+
+  tool['version'] = None
+  assert run() == [None]
+  assert run() == [None]
+  assert len(calls) == 4
+
+
+def test_result_store(tmp_path):
+  """ Stored results are replayed instead of executing the check again. """
+  calls = []
+
+  @check(id='com.example/check/glyph_count')
+  def check_glyph_count(ttFont):
+    """Font has glyphs?"""
+    calls.append(ttFont.reader.file.name)
+    yield PASS, f'{len(ttFont.getGlyphOrder())} glyphs'
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_glyph_count': check_glyph_count})
+  font = str(tmp_path / 'font.ttf')
+  with open(TEST_FILE("cabin/Cabin-Regular.ttf"), 'rb') as source, \
+       open(font, 'wb') as target:
+    target.write(source.read())
+
+  def run():
+    runner = CheckRunner(profile, values={'fonts': [font]},
+                         result_store=ResultStore(str(tmp_path / 'results')))
+    return [(status, f'{message}' if status != START else len(message))
+            for status, message, _ in runner.run()]
+
+  first = run()
+  assert run() == first
+  assert len(calls) == 1
+
+  # Changed contents invalidate the stored results.
+  with open(font, 'ab') as target:
+    target.write(b'\0' * 4)
+  assert run() == first
+  assert len(calls) == 2
+
+
+def test_timing():
+  """ A TIMING event with the condition lookups precedes each ENDCHECK. """
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(_get_profile(), values={'fonts': fonts}, timing=True)
+  events = list(runner.run())
+  timings = [(events[i][1], events[i][2][1].id) for i, (status, _, _)
+                                      in enumerate(events) if status == TIMING]
+  assert [events[i + 1][0] for i, (status, _, _) in enumerate(events)
+                                      if status == TIMING] == [ENDCHECK] * 2
+  (first, first_id), (second, second_id) = timings
+  assert first_id == 'com.example/check/glyph_order'
+  assert first['wall'] > 0 and first['cpu'] >= 0
+  # glyph_order is evaluated for the first check, ttFont as its dependency
+  assert [(span['name'], span['cached']) for span in first['conditions']] \
+                            == [('ttFont', False), ('glyph_order', False)]
+  assert [(span['name'], span['cached']) for span in second['conditions']] \
+                            == [('glyph_order', True)]
+
+
+def test_timing_table_loads():
+  """ Tables decompiled on demand are recorded with the check or condition
+  that loaded them and whether it declared them. """
+  @check(id='com.example/check/names', tables=['name'])
+  def check_names(ttFont):
+    """Font has names and a vendor id?"""
+    yield PASS, f'{len(ttFont["name"].names)} names'
+    yield PASS, ttFont['OS/2'].achVendID
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'glyph_order': glyph_order
+                       , 'check_glyph_order': check_glyph_order
+                       , 'check_names': check_names})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts}, timing=True)
+  loads = {}
+  for status, message, (_, check_, _) in runner.run():
+    if status == TIMING:
+      loads[check_.id] = [(load['name'], load['by'], load['declared'])
+                                              for load in message['loads']]
+  # post needs maxp, a dependency
+  assert loads['com.example/check/glyph_order'] == [
+      ('maxp', 'glyph_order', None), ('post', 'glyph_order', None)]
+  assert loads['com.example/check/names'] == [
+      ('name', 'com.example/check/names', True),
+      ('OS/2', 'com.example/check/names', False)]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_check_timeout():
+  """ Checks exceeding their timeout are stopped and reported as ERROR,
+  conditions evaluated by supervised checks are kept. """
+  @check(id='com.example/check/sleeps', misc_metadata={'timeout': 0.2})
+  def check_sleeps(font):
+    """Check that never ends."""
+    time.sleep(60)
+    yield PASS, 'woke up'
+
+  profile = _get_profile()
+  profile.auto_register({'check_sleeps': check_sleeps})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts}, check_timeout=30)
+  start = time.time()
+  events = [(status, message, identity[1].id)
+                            for status, message, identity in runner.run()
+                                      if status in (PASS, ERROR, ENDCHECK)]
+  assert time.time() - start < 30
+  assert [(status, getattr(message, 'code', None), check_id)
+                    for status, message, check_id in events] == [
+      (PASS, None, 'com.example/check/glyph_order')
+    , (ENDCHECK, None, 'com.example/check/glyph_order')
+    , (PASS, None, 'com.example/check/notdef')
+    , (ENDCHECK, None, 'com.example/check/notdef')
+    , (ERROR, 'timeout', 'com.example/check/sleeps')
+    , (ENDCHECK, None, 'com.example/check/sleeps')
+  ]
+  # glyph_order was evaluated by the child process of the first check
+  assert ('glyph_order', (('font', 0),)) in runner._cache['conditions']
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_memory_limit_has_a_deadline(monkeypatch):
+  """ Supervised checks with only a memory limit can't hang the run. """
+  import fontbakery.checkrunner
+  monkeypatch.setattr(fontbakery.checkrunner, 'SUPERVISED_CHECK_TIMEOUT', 0.2)
+
+  @check(id='com.example/check/hangs', misc_metadata={'max_rss': 2**40})
+  def check_hangs(font):
+    """Check that never ends."""
+    time.sleep(60)
+    yield PASS, 'woke up'
+
+  profile = _get_profile()
+  profile.auto_register({'check_hangs': check_hangs})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts})
+  start = time.time()
+  errors = [getattr(message, 'code', None)
+                  for status, message, _ in runner.run() if status == ERROR]
+  assert time.time() - start < 30
+  assert errors == ['timeout']
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/stat'),
+                    reason='requires /proc')
+def test_memory_limit_includes_subprocesses():
+  """ The memory of the tools started by a supervised check counts. """
+  import subprocess
+  import sys
+  from fontbakery.checkrunner import get_rss
+  # allocates 200 MB, then waits
+  tool = [sys.executable, "-c",
+          "import time; data = bytearray(200 * 2**20); time.sleep(10)"]
+
+  @check(id='com.example/check/runs_tool')
+  def check_runs_tool(font):
+    """Check that runs a tool that needs memory."""
+    subprocess.run(tool)
+    yield PASS, 'done'
+
+  profile = _get_profile()
+  profile.auto_register({'check_runs_tool': check_runs_tool})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  # the forked child alone stays below the limit
+  runner = CheckRunner(profile, values={'fonts': fonts},
+                       explicit_checks=['com.example/check/runs_tool'],
+                       check_max_rss=get_rss(os.getpid()) + 100 * 2**20)
+  start = time.time()
+  errors = [getattr(message, 'code', None)
+                  for status, message, _ in runner.run() if status == ERROR]
+  assert time.time() - start < 10
+  assert errors == ['max-rss']
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_supervised_checks_wait_for_io_threads():
+  """ Supervised checks are forked when no io_bound check is running. """
+  done = []
+
+  @check(id='com.example/check/supervised', misc_metadata={'timeout': 30})
+  def check_supervised(font):
+    """Check in a child process."""
+    yield PASS, list(done)
+
+  @check(id='com.example/check/waits', misc_metadata={'io_bound': True})
+  def check_waits(font):
+    """Check waiting for a subprocess."""
+    time.sleep(0.2)
+    done.append('waits')
+    yield PASS, 'done'
+
+  profile = _get_profile()
+  profile.auto_register({'check_supervised': check_supervised
+                       , 'check_waits': check_waits})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts}, io_threads=1)
+  results = {identity[1].id: message
+                    for status, message, identity in runner.run()
+                                                    if status == PASS}
+  # the io_bound check is after the supervised one, but ran before the fork
+  assert results['com.example/check/supervised'] == ['waits']
+
+
+def test_io_bound_checks():
+  """ io_bound checks run in threads, the events are in the original order,
+  the most expensive io_bound check is started first. """
+  started = []
+
+  def make_check(name):
+    @check(id=f'com.example/check/{name}', misc_metadata={'io_bound': True})
+    def check_io_bound(font):
+      """Check waiting for a subprocess."""
+      started.append(name)
+      time.sleep(0.01)
+      yield PASS, threading.current_thread() is threading.main_thread()
+    return check_io_bound
+
+  profile = _get_profile()
+  profile.auto_register({'check_cheap': make_check('cheap')
+                       , 'check_expensive': make_check('expensive')})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  costs = {'com.example/check/cheap': 1, 'com.example/check/expensive': 10}
+  runner = CheckRunner(profile, values={'fonts': fonts}, check_costs=costs,
+                       io_threads=1)
+  results = [(identity[1].id, message)
+                            for status, message, identity in runner.run()
+                                                          if status == PASS]
+  assert [check_id for check_id, _ in results] == [
+      'com.example/check/glyph_order'
+    , 'com.example/check/notdef'
+    , 'com.example/check/cheap'
+    , 'com.example/check/expensive'
+  ]
+  # not executed in the main thread
+  assert [in_main_thread for _, in_main_thread in results[2:]] == [False, False]
+  assert started == ['expensive', 'cheap']
+
+  # by default, in order, in the main thread
+  del started[:]
+  runner = CheckRunner(profile, values={'fonts': fonts}, check_costs=costs)
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results[2:] == [True, True]
+  assert started == ['cheap', 'expensive']
+
+
+def test_condition_locks_are_dropped():
+  """ Conditions are evaluated once when threads need them at the same
+  time, their locks are not kept after the evaluation. """
+  evaluated = []
+
+  @condition
+  def slow_condition(font):
+    evaluated.append(font)
+    time.sleep(0.05)
+    return font
+
+  def make_check(name):
+    @check(id=f'com.example/check/{name}', misc_metadata={'io_bound': True})
+    def check_io_bound(font, slow_condition):
+      """Check using a condition from a thread."""
+      yield PASS, slow_condition == font
+    return check_io_bound
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'slow_condition': slow_condition
+                       , 'check_one': make_check('one')
+                       , 'check_two': make_check('two')
+                       , 'check_three': make_check('three')})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts}, io_threads=4)
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results == [True] * 6
+  assert sorted(evaluated) == sorted(fonts)
+  assert runner._condition_locks == {}
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from fontbakery.callable import check
+from fontbakery.checkrunner import Section, PASS
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.multiproc import can_fork
+from fontbakery.commands import batch
+
+
+@check(id='com.example/check/crash')
+def check_crash(font):
+  """Kills the worker process checking "Cabin-Regular.ttf"."""
+  if os.path.basename(font) == 'Cabin-Regular.ttf':
+    os._exit(1)
+  return PASS, 'Still alive.'
+
+
+def test_find_families():
+  families = dict(batch.find_families(os.path.join("data", "test", "cabin")))
+  assert list(families) == [os.path.join("data", "test", "cabin")]
+  assert all(font.endswith('.ttf')
+             for font in families[os.path.join("data", "test", "cabin")])
+
+
+@pytest.mark.skipif(not can_fork(), reason='requires the "fork" start method')
+def test_check_collection_isolates_dead_workers(tmp_path):
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_crash': check_crash})
+  # forked workers inherit the profile
+  batch._profiles['crash'] = profile
+  families = [("cabin", [os.path.join("data", "test", "cabin", "Cabin-Regular.ttf")]),
+              ("nunito", [os.path.join("data", "test", "nunito", "Nunito-Regular.ttf")])]
+  try:
+    results = batch.check_collection('crash', families, str(tmp_path), jobs=1)
+  finally:
+    del batch._profiles['crash']
+  assert results[0]['error'] == 'The worker process died.'
+  assert results[1]['error'] is None
+  assert results[1]['summary'] == {'PASS': 1}
+  assert os.path.exists(results[1]['report'])
+
+
+def test_command_batch(tmp_path):
+  """Test if `fontbakery batch` writes a report per family and a summary."""
+  root = os.path.join("data", "test", "source-sans-pro")
+  subprocess.check_output(["fontbakery", "batch", "--profile", "opentype",
+                           "-c", "com.google.fonts/check/family_naming_recommendations",
+                           "-o", str(tmp_path), root], stderr=subprocess.STDOUT)
+  with open(tmp_path / "summary.json") as f:
+    summary = json.load(f)
+  families = [result["family"] for result in summary["families"]]
+  assert families == [os.path.join(root, "TTF"), os.path.join(root, "VAR")]
+  assert not summary["failed_families"]
+  assert os.path.exists(tmp_path / "TTF" / "fontbakery.json")
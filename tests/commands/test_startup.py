@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Libraries that are only imported by the checks and conditions that need
+# them, never to start a command.
+HEAVY_MODULES = ("fontTools",
+                 "requests",
+                 "bs4",
+                 "lxml",
+                 "google.protobuf",
+                 "numpy",
+                 "defcon")
+
+# Reporters that are only imported when their option is given.
+OPTIONAL_REPORTERS = ("fontbakery.reporters.serialize",
+                      "fontbakery.reporters.ghmarkdown",
+                      "fontbakery.reporters.html",
+                      "fontbakery.reporters.trace",
+                      "fontbakery.reporters.costs")
+
+# Budget of the imports of a command, in milliseconds, with compiled
+# bytecode. Well above the actual time (about 80 ms for the googlefonts
+# profile), to leave room for slow machines.
+IMPORT_TIME_BUDGET = 500
+
+
+def get_import_times(args, pycache):
+  """ Runs `python -X importtime -m fontbakery args` and returns a dict of
+  {module: cumulative import time in microseconds} of all imports, and the
+  total of the imports of the command (without the interpreter start).
+  """
+  env = dict(os.environ, PYTHONPYCACHEPREFIX=str(pycache))
+  env.pop("PYTHONDONTWRITEBYTECODE", None)
+  command = [sys.executable, "-X", "importtime", "-m", "fontbakery"] + args
+  # compile the bytecode first
+  subprocess.run(command, env=env, stdout=subprocess.DEVNULL,
+                 stderr=subprocess.DEVNULL)
+  stderr = subprocess.run(command, env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE).stderr.decode()
+  times = {}
+  total = 0
+  for line in stderr.splitlines():
+    if not line.startswith("import time:") or "cumulative" in line:
+      continue
+    _, cumulative, name = line.split("|")
+    times[name.strip()] = int(cumulative)
+    top_level = not name.startswith("  ")
+    if top_level and name.strip() not in ("site", "encodings"):
+      total += int(cumulative)
+  return times, total
+
+
+@pytest.mark.parametrize("args", [["--list-subcommands"],
+                                  ["check-googlefonts", "--help"],
+                                  ["check-googlefonts", "--list-checks"],
+                                  ["check-profile", "universal", "--help"]])
+def test_startup_imports(args, tmp_path):
+  """ Starting a command doesn't import heavy libraries. """
+  times, total = get_import_times(args, tmp_path)
+  assert "fontbakery" in times
+  assert not [module for module in HEAVY_MODULES + OPTIONAL_REPORTERS
+                     if module in times]
+  assert total / 1000 < IMPORT_TIME_BUDGET
+
+
+def test_list_subcommands_imports_no_commands(tmp_path):
+  times, _ = get_import_times(["--list-subcommands"], tmp_path)
+  assert not [module for module in times
+                     if module.startswith(("fontbakery.commands",
+                                           "fontbakery.checkrunner"))]
@@ -57,3 +57,31 @@ def test_command_check_ufo_sources():
 
   with pytest.raises(subprocess.CalledProcessError):
     subprocess.check_output(["fontbakery", "check-ufo-sources"])
+
+
+def test_command_serve():
+  """Test if `fontbakery serve` runs jobs and survives a bad one."""
+  import json
+  subprocess.check_output(["fontbakery", "serve", "-h"])
+
+  test_font = os.path.join("data", "test", "nunito", "Nunito-Regular.ttf")
+  jobs = [
+      {"id": 1, "profile": "fontbakery.profiles.opentype",
+       "fonts": [test_font], "checkid": ["com.google.fonts/check/family_naming_recommendations"]},
+      "not a job",
+      {"id": 2, "profile": "opentype",
+       "fonts": [test_font], "checkid": ["com.google.fonts/check/family_naming_recommendations"]},
+  ]
+  stdin = "\n".join(json.dumps(job) if isinstance(job, dict) else job
+                    for job in jobs)
+  output = subprocess.check_output(["fontbakery", "serve",
+                                    "--preload", "opentype"],
+                                   input=stdin.encode())
+  lines = [json.loads(line) for line in output.decode().splitlines()]
+  assert lines[0]["ready"]
+  done = [line for line in lines if line.get("done")]
+  assert [line["id"] for line in done] == [1, None, 2]
+  assert "error" in done[1]
+  ends = [line for line in lines if line.get("status") == "END"]
+  assert len(ends) == 2
+  assert ends[0]["message"] == ends[1]["message"]
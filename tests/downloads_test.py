@@ -0,0 +1,128 @@
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fontTools.ttLib import TTFont
+
+from fontbakery.downloads import (DownloadCache,
+                                  DownloadError,
+                                  configure_downloads)
+from fontbakery.utils import TEST_FILE
+
+
+@pytest.fixture
+def stub_server():
+  requests = []
+  class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+      requests.append((self.path, self.headers.get('If-None-Match')))
+      if self.path != '/family.zip':
+        self.send_response(404)
+        self.end_headers()
+        return
+      if self.headers.get('If-None-Match') == '"v1"':
+        self.send_response(304)
+        self.end_headers()
+        return
+      body = b'family data' * 1000
+      self.send_response(200)
+      self.send_header('ETag', '"v1"')
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, *args):
+      pass
+
+  server = HTTPServer(('127.0.0.1', 0), Handler)
+  thread = threading.Thread(target=server.serve_forever, daemon=True)
+  thread.start()
+  yield f'http://127.0.0.1:{server.server_port}', requests
+  server.shutdown()
+  server.server_close()
+
+
+def test_download_cache(tmp_path, stub_server):
+  """ Downloads are revalidated with their ETag and stored once. """
+  base_url, requests = stub_server
+  cache = DownloadCache(root=str(tmp_path))
+  path = cache.fetch(f'{base_url}/family.zip')
+  with open(path, 'rb') as f:
+    assert f.read() == b'family data' * 1000
+  assert cache.fetch(f'{base_url}/family.zip') == path
+  assert requests == [('/family.zip', None), ('/family.zip', '"v1"')]
+  assert cache.download_count == 1
+
+  # the store is shared by the caches with the same root
+  assert DownloadCache(root=str(tmp_path)).fetch(f'{base_url}/family.zip') \
+                                                                      == path
+  assert len(os.listdir(os.path.dirname(path))) == 1
+
+  with pytest.raises(DownloadError) as error:
+    cache.fetch(f'{base_url}/missing.zip')
+  assert error.value.status == 404
+
+  offline = DownloadCache(root=str(tmp_path), offline=True)
+  assert offline.fetch(f'{base_url}/family.zip') == path
+  with pytest.raises(DownloadError):
+    offline.fetch(f'{base_url}/missing.zip')
+  assert len(requests) == 4
+
+
+def test_download_without_cache(tmp_path, stub_server, monkeypatch):
+  """ Without a root directory nothing is stored. """
+  base_url, requests = stub_server
+  monkeypatch.setenv('HOME', str(tmp_path))
+  monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+  cache = DownloadCache()
+  for _ in range(2):
+    with cache.open(f'{base_url}/family.zip') as f:
+      assert f.read() == b'family data' * 1000
+  assert cache.download_count == 2
+  with pytest.raises(DownloadError) as error:
+    cache.open(f'{base_url}/missing.zip')
+  assert error.value.status == 404
+  assert os.listdir(str(tmp_path)) == []
+
+
+def test_bad_certificate_setup():
+  """ Certificate errors keep the hint about the certificates of the Python
+  installer for macOS. """
+  import requests
+  from fontbakery.utils import BadCertificateSetupException
+
+  class Session:
+    def get(self, url, **kwds):
+      raise requests.exceptions.SSLError('[SSL: CERTIFICATE_VERIFY_FAILED]')
+
+  cache = DownloadCache(session=Session())
+  with pytest.raises(BadCertificateSetupException) as error:
+    cache.open('https://fonts.google.com/download?family=Cabin')
+  assert 'install the certificates' in str(error.value)
+
+
+def test_github_gfonts_ttFont_from_mirror(tmp_path):
+  """ In offline mode the files of a mirror directory are used. """
+  from fontbakery.profiles.googlefonts import github_gfonts_ttFont
+  mirror = tmp_path / "mirror"
+  font_directory = mirror / "github.com/google/fonts/raw/master/ofl/cabin"
+  os.makedirs(str(font_directory))
+  shutil.copy(TEST_FILE("cabin/Cabin-Regular.ttf"), str(font_directory))
+  configure_downloads(root=str(tmp_path / "cache"), offline=True,
+                      mirror=str(mirror))
+  try:
+    ttFont = TTFont(TEST_FILE("cabin/Cabin-Regular.ttf"))
+    remote = github_gfonts_ttFont(ttFont, "OFL.txt")
+    assert remote["head"].fontRevision == ttFont["head"].fontRevision
+    # not in the mirror, like not in the repository
+    ttFont = TTFont(TEST_FILE("cabin/Cabin-Bold.ttf"))
+    assert github_gfonts_ttFont(ttFont, "OFL.txt") is None
+
+    # other errors are not hidden from the checks
+    configure_downloads(offline=True)
+    with pytest.raises(DownloadError):
+      github_gfonts_ttFont(ttFont, "OFL.txt")
+  finally:
+    configure_downloads()
@@ -0,0 +1,116 @@
+import sys
+
+import pytest
+
+from fontbakery.fontforgeworker import (FontForgePool,
+                                        FontForgeTimeout,
+                                        FontForgeUnavailable,
+                                        FontForgeWorker)
+
+# validate() returns the size of the file, fonts named crash* kill the worker,
+# fonts named hang* never return
+FAKE_FONTFORGE = '''
+import os
+import time
+
+class Font:
+  def __init__(self, path):
+    self.path = path
+
+  def validate(self):
+    os.write(2, b"Validating " + os.path.basename(self.path).encode() + b"\\n")
+    print("noise on stdout")
+    return os.path.getsize(self.path)
+
+  def close(self):
+    pass
+
+def version():
+  return "20200314"
+
+def open(path):
+  if os.path.basename(path).startswith("crash"):
+    os.abort()
+  if os.path.basename(path).startswith("hang"):
+    time.sleep(60)
+  if not os.path.exists(path):
+    raise EnvironmentError("Can't open " + path)
+  return Font(path)
+'''
+
+
+@pytest.fixture
+def fake_fontforge(tmp_path, monkeypatch):
+  (tmp_path / "fontforge.py").write_text(FAKE_FONTFORGE)
+  monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+  fonts = []
+  for name, size in (("a.ttf", 3), ("b.ttf", 5), ("crash.ttf", 1)):
+    font = tmp_path / name
+    font.write_bytes(b"x" * size)
+    fonts.append(str(font))
+  return fonts
+
+
+def test_worker_validates_fonts(fake_fontforge):
+  a, b, _ = fake_fontforge
+  worker = FontForgeWorker(python=sys.executable)
+  try:
+    assert worker.validate(a) == {"validation_state": 3,
+                                  "ff_err_messages": "Validating a.ttf\n"}
+    assert worker.validate(b)["validation_state"] == 5
+    assert worker.validate(b + ".missing") is None
+    assert worker.validate(a)["validation_state"] == 3
+    assert worker.version() == "20200314"
+    assert worker.start_count == 1
+  finally:
+    worker.close()
+
+
+def test_worker_restarts_after_crash(fake_fontforge):
+  a, _, crash = fake_fontforge
+  worker = FontForgeWorker(python=sys.executable)
+  try:
+    assert worker.validate(crash) is None
+    assert worker.validate(a)["validation_state"] == 3
+    assert worker.start_count == 2
+  finally:
+    worker.close()
+
+
+def test_worker_restarts_after_timeout(fake_fontforge, tmp_path):
+  a, _, _ = fake_fontforge
+  hang = tmp_path / "hang.ttf"
+  hang.write_bytes(b"x")
+  worker = FontForgeWorker(python=sys.executable, timeout=2)
+  try:
+    assert worker.validate(a)["validation_state"] == 3
+    with pytest.raises(FontForgeTimeout):
+      worker.validate(str(hang))
+    assert worker.validate(a)["validation_state"] == 3
+    assert worker.start_count == 2
+  finally:
+    worker.close()
+
+
+def test_pool(fake_fontforge):
+  a, b, _ = fake_fontforge
+  pool = FontForgePool(size=2, python=sys.executable)
+  try:
+    results = [pool.validate(font)["validation_state"] for font in (a, b, a)]
+    assert results == [3, 5, 3]
+    assert pool.version() == "20200314"
+    assert pool.start_count == 1
+  finally:
+    pool.close()
+
+
+def test_pool_without_fontforge(tmp_path, monkeypatch):
+  monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+  pool = FontForgePool(size=2, python=sys.executable)
+  font = str(tmp_path / "a.ttf")
+  with pytest.raises(FontForgeUnavailable):
+    pool.validate(font)
+  # not started again
+  with pytest.raises(FontForgeUnavailable):
+    pool.validate(font)
+  assert pool.start_count == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from fontbakery import glyphdata
+from fontbakery.glyphdata import (GlyphDataIndex,
+                                  get_glyph_data_index,
+                                  write_glyph_data_index)
+
+
+def test_glyph_data_index(tmp_path):
+  """ The binary index returns the contour counts it was written with. """
+  path = str(tmp_path / "glyphdata.bin")
+  write_glyph_data_index(path, [
+      {"name": "b", "unicode": 0x62, "contours": {2}}
+    , {"name": "ampersand", "unicode": 0x26, "contours": {3, 1, 2}}
+    , {"name": "u1F600", "unicode": 0x1F600, "contours": [4]}])
+  index = GlyphDataIndex.from_file(path)
+  assert len(index) == 3
+  assert list(index.codepoints) == [0x26, 0x62, 0x1F600]
+  assert index.get(0x26) == [1, 2, 3]
+  assert index.get(0x1F600) == [4]
+  assert index.get(0x61) is None
+  assert 0x62 in index and 0x63 not in index
+  assert index.names == ["ampersand", "b", "u1F600"]
+
+
+def test_desired_glyph_data():
+  index = get_glyph_data_index()
+  assert index is get_glyph_data_index()
+  # a is 'a' with 2 contours
+  assert index.get(ord("a")) == [2]
+
+
+def test_deprecated_desired_glyph_data():
+  """ The former list of dicts is built from the index. """
+  with pytest.deprecated_call():
+    desired_glyph_data = glyphdata.desired_glyph_data
+  with pytest.deprecated_call():
+    assert glyphdata.desired_glyph_data is desired_glyph_data
+  assert len(desired_glyph_data) == len(get_glyph_data_index())
+  a = [glyph for glyph in desired_glyph_data if glyph["unicode"] == ord("a")]
+  assert a == [{"name": "a", "unicode": ord("a"), "contours": [2]}]
+  with pytest.raises(AttributeError):
+    glyphdata.no_such_data
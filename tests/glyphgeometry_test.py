@@ -0,0 +1,34 @@
+from fontTools.ttLib import TTFont
+
+from fontbakery.glyphgeometry import GlyphGeometry, get_glyph_geometry
+from fontbakery.utils import TEST_FILE
+
+
+def test_glyph_geometry():
+  """ The coordinates are the ones of fontTools, composites resolved. """
+  path = TEST_FILE("nunito/Nunito-Regular.ttf")
+  geometry = GlyphGeometry(TTFont(path))
+  expected = TTFont(path)
+  glyf = expected['glyf']
+  for name in glyf.keys():
+    coordinates, end_points, _ = glyf[name].getCoordinates(glyf)
+    assert geometry.points(name) == list(coordinates)
+    index = geometry.indexes[name]
+    assert geometry.end_points[geometry.contour_offsets[index]:
+                               geometry.contour_offsets[index + 1]].tolist() \
+                                                              == end_points
+  # Aacute is a composite of A and acute
+  assert geometry.number_of_contours[geometry.indexes["Aacute"]] == -1
+  assert geometry.contour_count("Aacute") == \
+         geometry.contour_count("A") + geometry.contour_count("acute")
+
+
+def test_glyph_geometry_of_modified_font():
+  """ Expanded and modified glyphs are decoded from their attributes. """
+  ttFont = TTFont(TEST_FILE("nunito/Nunito-Regular.ttf"))
+  glyph = ttFont['glyf']['A']
+  glyph.coordinates[0] = (-40000, 0)
+  geometry = get_glyph_geometry(ttFont)
+  assert geometry.points("A")[0] == (-40000, 0)
+  # Aacute uses the modified A
+  assert geometry.points("Aacute")[0] == (-40000, 0)
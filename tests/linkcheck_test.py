@@ -0,0 +1,118 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from fontbakery.checkrunner import FAIL, INFO, PASS
+from fontbakery.linkcheck import (LinkCache,
+                                  LinkChecker,
+                                  LinkError,
+                                  LinkResult,
+                                  configure_link_checker)
+
+
+class StubTransport:
+  def __init__(self, statuses):
+    self.statuses = statuses
+    self.requested = []
+
+  def head(self, url, timeout):
+    self.requested.append(url)
+    status = self.statuses.get(url, None)
+    if status is None:
+      raise LinkError(f'Can\'t connect to {url}')
+    return status
+
+
+@pytest.fixture
+def stub_server():
+  class Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+      self.send_response(200 if self.path == '/ok' else 404)
+      self.end_headers()
+
+    def log_message(self, *args):
+      pass
+
+  server = HTTPServer(('127.0.0.1', 0), Handler)
+  thread = threading.Thread(target=server.serve_forever, daemon=True)
+  thread.start()
+  yield f'http://127.0.0.1:{server.server_port}'
+  server.shutdown()
+  server.server_close()
+
+
+def test_link_checker(stub_server):
+  """ Links are requested once per process with the pooled session. """
+  checker = LinkChecker(host_interval=0)
+  urls = [f'{stub_server}/ok', f'{stub_server}/missing', f'{stub_server}/ok']
+  results = checker.check_links(urls)
+  assert [result.status for result in results] == [200, 404, 200]
+  assert checker.request_count == 2
+  assert checker.check_link(f'{stub_server}/ok').status == 200
+  assert checker.request_count == 2
+
+
+def test_link_cache(tmp_path):
+  """ Results are shared by checkers with the same cache, for `ttl`
+  seconds, connection errors are not. In offline mode, only the cache is
+  used.
+  """
+  ok, broken = 'https://example.com/', 'https://broken.example.com/'
+  transport = StubTransport({ok: 200})
+  cache = LinkCache(str(tmp_path))
+  checker = LinkChecker(transport=transport, cache=cache)
+  assert checker.check_links([ok, broken]) == [LinkResult(ok, 200, None),
+                                               LinkResult(broken, None, 'error')]
+
+  # requested concurrently
+  assert sorted(transport.requested) == sorted([ok, broken])
+  del transport.requested[:]
+
+  other = LinkChecker(transport=transport, cache=cache)
+  assert other.check_links([ok, broken])[0] == LinkResult(ok, 200, None)
+  assert transport.requested == [broken]
+
+  offline = LinkChecker(cache=cache, offline=True)
+  unknown = 'https://unknown.example.com/'
+  assert offline.check_links([ok, unknown]) == [LinkResult(ok, 200, None),
+                                                LinkResult(unknown, None,
+                                                           'offline')]
+
+  expired = LinkChecker(transport=transport, cache=LinkCache(str(tmp_path), -1))
+  expired.check_link(ok)
+  assert transport.requested == [broken, ok]
+
+
+def test_transient_errors_are_kept_briefly():
+  """ Timeouts, connection and server errors are requested again after
+  `error_ttl` seconds, not after `ttl`. """
+  ok, broken = 'https://example.com/', 'https://broken.example.com/'
+  unavailable = 'https://unavailable.example.com/'
+  transport = StubTransport({ok: 200, unavailable: 503})
+  checker = LinkChecker(transport=transport, error_ttl=-1)
+  urls = [ok, broken, unavailable]
+  assert [result.status for result in checker.check_links(urls)] \
+                                                        == [200, None, 503]
+  del transport.requested[:]
+  checker.check_links(urls)
+  # requested concurrently
+  assert sorted(transport.requested) == sorted([broken, unavailable])
+
+
+def test_check_description_broken_links_with_link_checker():
+  from fontbakery.profiles.googlefonts import (
+    com_google_fonts_check_description_broken_links as check)
+  transport = StubTransport({'http://example.com': 200})
+  configure_link_checker(transport=transport)
+  try:
+    status, _ = list(check("<a href='http://example.com'>Good</a>"))[-1]
+    assert status == PASS
+    status, _ = list(check("<a href='http://example.com/gone'>Bad</a>"))[-1]
+    assert status == FAIL
+
+    configure_link_checker(offline=True)
+    results = list(check("<a href='http://example.com'>Good</a>"))
+    assert results[0][0] == INFO and results[-1][0] == PASS
+  finally:
+    configure_link_checker()
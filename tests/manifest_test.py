@@ -0,0 +1,77 @@
+import subprocess
+import sys
+
+import pytest
+
+from fontbakery import manifest
+from fontbakery.commands import check_profile
+
+
+def test_manifest_is_up_to_date():
+  """ The shipped manifest is the one of the profiles. If this fails, run
+  `fontbakery generate-profile-manifest`.
+  """
+  assert manifest.get_manifest() == manifest.build_manifest()
+  assert manifest.get_manifest() is manifest.get_manifest()
+
+
+def test_stale_manifest_is_ignored(tmp_path):
+  stale = manifest.build_manifest(["fontbakery.profiles.fontval"])
+  stale["sources"]["fontval.py"] = "0" * 64
+  path = str(tmp_path / "profile-manifest.json")
+  manifest.write_manifest(path, stale)
+  assert manifest.read_manifest(path) is None
+  del stale["sources"]["fontval.py"]
+  manifest.write_manifest(path, stale)
+  assert manifest.read_manifest(path) is None
+  assert manifest.read_manifest(str(tmp_path / "missing.json")) is None
+
+
+def test_select_checks():
+  sections = manifest.get_profile_manifest("googlefonts")
+  assert sections == manifest.get_profile_manifest(
+                                       "fontbakery.profiles.googlefonts")
+  assert manifest.get_profile_manifest("no_such_profile") is None
+
+  selected = manifest.select_checks(sections, ["glyf", "loca"], ["points"])
+  assert [check_id for _, checks in selected for check_id, _ in checks] == [
+      "com.google.fonts/check/loca/maxp_num_glyphs",
+      "com.google.fonts/check/glyf_unused_data"]
+  assert manifest.get_check_modules(selected) == [
+      "fontbakery.profiles.glyf", "fontbakery.profiles.loca"]
+  assert manifest.select_checks(sections) is sections
+
+
+def list_checks(argv, monkeypatch, capsys):
+  monkeypatch.setattr(sys, "argv", ["check-profile"] + argv)
+  with pytest.raises(SystemExit):
+    check_profile.main()
+  return capsys.readouterr().out
+
+
+@pytest.mark.parametrize("argv", [["googlefonts", "-L"],
+                                  ["universal", "-L", "-v"],
+                                  ["opentype", "-L", "-l", "PASS",
+                                   "-c", "name", "-x", "family"]])
+def test_list_checks_without_import(argv, monkeypatch, capsys):
+  """ --list-checks of the manifest is that of the imported profile. """
+  from_manifest = list_checks(argv, monkeypatch, capsys)
+  monkeypatch.setattr(manifest, "MANIFEST_PATH", "missing.json")
+  from_profile = list_checks(argv, monkeypatch, capsys)
+  assert from_manifest
+  assert from_manifest == from_profile
+
+
+def test_list_checks_imports_no_profile():
+  code = ("import sys\n"
+          "from fontbakery.commands.check_googlefonts import main\n"
+          "sys.argv = ['check-googlefonts', '-L', '-c', 'glyf']\n"
+          "try:\n"
+          "  main()\n"
+          "except SystemExit:\n"
+          "  pass\n"
+          "assert not [module for module in sys.modules\n"
+          "                   if module.startswith('fontbakery.profiles')]\n")
+  output = subprocess.run([sys.executable, "-c", code], check=True,
+                          stdout=subprocess.PIPE).stdout.decode()
+  assert "com.google.fonts/check/glyf_unused_data" in output.split()
@@ -0,0 +1,138 @@
+import pytest
+
+from fontbakery.callable import check, condition
+from fontbakery.checkrunner import (
+              Section
+            , CheckRunner
+            , PASS
+            , FAIL
+            , START
+            , END
+            , ENDCHECK
+            )
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.multiproc import MultiprocessingRunner, can_fork
+from fontbakery.utils import TEST_FILE
+
+
+@condition
+def num_glyphs(ttFont):
+  return len(ttFont.getGlyphOrder())
+
+
+@check(id='com.example/check/num_glyphs')
+def check_num_glyphs(num_glyphs):
+  """Font has glyphs?"""
+  if num_glyphs:
+    return PASS, f'{num_glyphs} glyphs'
+  return FAIL, 'No glyphs'
+
+
+@check(id='com.example/check/raises')
+def check_raises(font):
+  """Check that fails with an exception."""
+  raise ValueError(font)
+
+
+@check(id='com.example/check/family')
+def check_family(ttFonts):
+  """Family check."""
+  return PASS, '{} fonts'.format(len(list(ttFonts)))
+
+
+def _get_profile():
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({
+      'num_glyphs': num_glyphs
+    , 'check_num_glyphs': check_num_glyphs
+    , 'check_raises': check_raises
+    , 'check_family': check_family
+  })
+  return profile
+
+
+def _events(runner):
+  return [(status, f'{message}' if status != START else len(message), identity)
+          for status, message, identity in runner.run()]
+
+
+@pytest.mark.skipif(not can_fork(), reason='requires the "fork" start method')
+def test_multiprocessing_runner_matches_serial_run():
+  """ The merged event stream equals the stream of a serial run. """
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf"),
+           TEST_FILE("cabin/Cabin-Italic.ttf")]
+  profile = _get_profile()
+  serial = _events(CheckRunner(profile, values={'fonts': fonts}))
+  parallel = _events(MultiprocessingRunner(profile, values={'fonts': fonts},
+                                           jobs=2))
+  assert serial == parallel
+  assert parallel[-1][0] == END
+  assert len([e for e in parallel if e[0] == ENDCHECK]) == 3 * 2 + 1
+
+
+@pytest.mark.skipif(not can_fork(), reason='requires the "fork" start method')
+def test_validators_run_once_per_font(tmp_path):
+  """ Each worker validates only the fonts of its shards. """
+  from fontbakery.validators import get_validator_stage
+  log = tmp_path / 'validated.log'
+
+  def validate(font):
+    # the workers are processes, they log to a file
+    with open(log, 'a') as f:
+      f.write(f'{font}\n')
+    return font
+
+  @condition
+  def validated_font(font, fonts):
+    return get_validator_stage('log', validate, fonts).result(font)
+
+  @check(id='com.example/check/validated_one')
+  def check_one(font, validated_font):
+    """Font is validated?"""
+    return PASS, validated_font == font
+
+  @check(id='com.example/check/validated_two')
+  def check_two(font, validated_font):
+    """Font is validated again?"""
+    return PASS, validated_font == font
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'validated_font': validated_font,
+                         'check_one': check_one,
+                         'check_two': check_two})
+  fonts = ["a.ttf", "b.ttf", "c.ttf"]
+  runner = MultiprocessingRunner(profile, values={'fonts': fonts}, jobs=2)
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results == [True] * 6
+  assert sorted(log.read_text().split()) == fonts
+
+
+@pytest.mark.skipif(not can_fork(), reason='requires the "fork" start method')
+def test_dead_worker_is_reported():
+  """ The checks of a shard whose worker process died are reported as
+  ERROR, instead of waiting for them forever. """
+  import os
+  from fontbakery.checkrunner import ERROR
+  main_pid = os.getpid()
+
+  @check(id='com.example/check/dies')
+  def check_dies(font):
+    """Worker process survives?"""
+    if font.endswith('Bold.ttf') and os.getpid() != main_pid:
+      os._exit(1)
+    return PASS, 'alive'
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_dies': check_dies})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf"),
+           TEST_FILE("cabin/Cabin-Italic.ttf")]
+  events = _events(MultiprocessingRunner(profile, values={'fonts': fonts},
+                                         jobs=2))
+  assert events[-1][0] == END
+  statuses = {dict(identity[2])['font']: message
+                for status, message, identity in events if status == ENDCHECK}
+  assert statuses[1] == f'{ERROR}'
+  errors = [message for status, message, _ in events if status == ERROR]
+  assert errors and all('BrokenProcessPool' in error for error in errors)
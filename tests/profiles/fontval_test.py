@@ -1,18 +1,47 @@
 import os
+import sys
 import pytest
 
 from fontbakery.utils import TEST_FILE
-from fontbakery.checkrunner import ERROR
+from fontbakery.checkrunner import ERROR, FAIL, PASS, WARN
+
+# writes a report for each -file argument and logs its invocations,
+# crashes on the font named by $FAKE_FONTVALIDATOR_CRASH
+FAKE_FONTVALIDATOR = '''#!{python}
+import os, sys
+args = sys.argv[1:]
+report_dir = args[args.index("-report-dir") + 1]
+fonts = [args[i + 1] for i, arg in enumerate(args) if arg == "-file"]
+with open(os.path.join(os.path.dirname(__file__), "calls.log"), "a") as log:
+  log.write(" ".join(os.path.basename(font) for font in fonts) + "\\n")
+for font in fonts:
+  if os.path.basename(font) == os.environ.get("FAKE_FONTVALIDATOR_CRASH"):
+    print("Crashed on " + os.path.basename(font))
+    sys.exit(1)
+  with open(os.path.join(report_dir, os.path.basename(font) + ".report.xml"),
+            "w") as report:
+    report.write("""<?xml version="1.0" encoding="UTF-8"?>
+<?xml-stylesheet type="text/xsl" href="fval.xsl"?>
+<FontValidatorReport>
+  <Report ErrorType="P" Message="Passed this" Details="" />
+  <Report ErrorType="E" Message="Misoriented contour" Details="Glyph index 1" />
+  <Report ErrorType="E" Message="Misoriented contour" Details="Glyph index 7" />
+  <Report ErrorType="E" Message="Tables are not in optimal order" Details="" />
+  <Report ErrorType="W" Message="Warned about that" Details="" />
+</FontValidatorReport>
+""")
+'''
 
 
 def test_check_fontvalidator():
   """ MS Font Validator checks """
-  from fontbakery.profiles.fontval import com_google_fonts_check_fontvalidator as check
+  from fontbakery.profiles.fontval import (com_google_fonts_check_fontvalidator as check,
+                                           fontvalidator_result)
 
   font = TEST_FILE("mada/Mada-Regular.ttf")
   # we want to run all FValidator checks only once,
   # so here we cache all results:
-  fval_results = list(check(font))
+  fval_results = list(check(font, fontvalidator_result(font, [font])))
 
   # Then we make sure that there wasn't an ERROR
   # which would mean FontValidator is not properly installed:
@@ -23,6 +52,71 @@ def test_check_fontvalidator():
   old_path = os.environ["PATH"]
   os.environ["PATH"] = ""
   with pytest.raises(OSError) as _:
-    status, message = list(check(font))[-1]
+    status, message = list(check(font, fontvalidator_result(font, [font])))[-1]
     assert status == ERROR
   os.environ["PATH"] = old_path
+
+
+def test_fontvalidator_runs_once_per_family(tmp_path, monkeypatch):
+  """ FontValidator is invoked once for all fonts of a run,
+      with the reports in a temporary directory. """
+  from fontbakery.checkrunner import CheckRunner
+  from fontbakery.profiles.fontval import profile
+
+  fake = tmp_path / "FontValidator"
+  fake.write_text(FAKE_FONTVALIDATOR.format(python=sys.executable))
+  fake.chmod(0o755)
+  monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+  fonts = [TEST_FILE("mada/Mada-Regular.ttf"),
+           TEST_FILE("mada/Mada-Black.ttf")]
+  runner = CheckRunner(profile, values={"fonts": fonts},
+                       explicit_checks=["com.google.fonts/check/fontvalidator"])
+  results = [(status, message) for status, message, _ in runner.run()
+                               if status in (PASS, WARN, FAIL, ERROR)]
+  assert (tmp_path / "calls.log").read_text() \
+          == "Mada-Regular.ttf Mada-Black.ttf\n"
+  assert results == 2 * [
+    (PASS, "MS-FonVal: Passed this"),
+    (WARN, "MS-FonVal: Misoriented contour DETAILS: {'Glyph index': [1, 7]}"),
+    (WARN, "MS-FonVal: Warned about that")]
+  assert not [name for name in os.listdir(os.path.dirname(fonts[0]))
+                   if name.endswith((".xml", ".html", ".xsl"))]
+
+
+def test_fontvalidator_failure_is_per_font(tmp_path, monkeypatch):
+  """ A font that makes FontValidator crash doesn't take the reports of
+      the other fonts. """
+  from fontbakery.checkrunner import CheckRunner, INFO
+  from fontbakery.profiles.fontval import profile
+
+  fake = tmp_path / "FontValidator"
+  fake.write_text(FAKE_FONTVALIDATOR.format(python=sys.executable))
+  fake.chmod(0o755)
+  monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+  monkeypatch.setenv("FAKE_FONTVALIDATOR_CRASH", "Mada-Black.ttf")
+
+  fonts = [TEST_FILE("mada/Mada-Regular.ttf"),
+           TEST_FILE("mada/Mada-Black.ttf")]
+  runner = CheckRunner(profile, values={"fonts": fonts},
+                       explicit_checks=["com.google.fonts/check/fontvalidator"])
+  results = {}
+  for status, message, (_, _, iterargs) in runner.run():
+    if status in (INFO, PASS, WARN, FAIL, ERROR):
+      font = fonts[dict(iterargs)["font"]]
+      results.setdefault(os.path.basename(font), []).append((status,
+                                                             f"{message}"))
+  assert (tmp_path / "calls.log").read_text() \
+          == "Mada-Regular.ttf Mada-Black.ttf\nMada-Black.ttf\n"
+  # the error code of the invocation is a normal result for the fonts
+  # with a report, only the font without one is validated again
+  assert results["Mada-Regular.ttf"] == [
+    (INFO, "Microsoft Font Validator returned an error code."
+           " Output follows :\n\nCrashed on Mada-Black.ttf\n\n\n"),
+    (PASS, "MS-FonVal: Passed this"),
+    (WARN, "MS-FonVal: Misoriented contour DETAILS: {'Glyph index': [1, 7]}"),
+    (WARN, "MS-FonVal: Warned about that")]
+  assert results["Mada-Black.ttf"] == [
+    (INFO, "Microsoft Font Validator returned an error code."
+           " Output follows :\n\nCrashed on Mada-Black.ttf\n\n\n"),
+    (ERROR, "Microsoft Font Validator did not write a report for this font.")]
@@ -18,17 +18,17 @@ def empty_ufo_font(tmpdir):
 
 def test_check_ufolint(empty_ufo_font):
     from fontbakery.profiles.ufo_sources import (
-        com_daltonmaag_check_ufolint as check)
+        com_daltonmaag_check_ufolint as check, ufolint_result)
     _, ufo_path = empty_ufo_font
 
     print('Test PASS with empty UFO.')
-    c = list(check(ufo_path))
+    c = list(check(ufolint_result(ufo_path, [ufo_path])))
     status, _ = c[-1]
     assert status == PASS
 
     print('Test FAIL with maimed UFO.')
     os.remove(os.path.join(ufo_path, "metainfo.plist"))
-    c = list(check(ufo_path))
+    c = list(check(ufolint_result(ufo_path, [ufo_path])))
     status, message = c[-1]
     assert status == FAIL
     assert type(message) == str
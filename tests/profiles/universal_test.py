@@ -70,14 +70,17 @@ def NOT_IMPLEMENTED_test_check_ftxvalidator():
 
 def test_check_ots():
   """ Checking with ots-sanitize. """
-  from fontbakery.profiles.universal import com_google_fonts_check_ots as check
+  from fontbakery.profiles.universal import (com_google_fonts_check_ots as check,
+                                             ots_sanitize_result)
 
   sanitary_font = TEST_FILE("cabin/Cabin-Regular.ttf")
-  status, _ = list(check(sanitary_font))[-1]
+  result = ots_sanitize_result(sanitary_font, [sanitary_font])
+  status, _ = list(check(result))[-1]
   assert status == PASS
 
   bogus_font = TEST_FILE("README.txt")
-  status, output = list(check(bogus_font))[-1]
+  result = ots_sanitize_result(bogus_font, [bogus_font])
+  status, output = list(check(result))[-1]
   assert status == FAIL
   assert "invalid version tag" in output
   assert "Failed to sanitize file!" in output
@@ -476,20 +479,29 @@ def DISABLED_test_check_glyphnames_max_length():
   assert status == PASS
 
 
-def test_check_ttx_roundtrip(): 
-  """ Checking with fontTools.ttx """ 
-  from fontbakery.profiles.universal import com_google_fonts_check_ttx_roundtrip as check 
- 
-  good_font_path = TEST_FILE("mada/Mada-Regular.ttf") 
-  status, _ = list(check(good_font_path))[-1] 
-  assert status == PASS 
- 
-  # TODO: Can anyone show us a font file that fails ttx roundtripping?! 
-  #bad_font_path = TEST_FILE("...") 
-  #status, _ = list(check(bad_font_path))[-1] 
-  #assert status == FAIL 
- 
- 
+def test_check_ttx_roundtrip(tmp_path):
+  """ Checking with fontTools.ttx """
+  from fontTools.ttLib.tables.DefaultTable import DefaultTable
+  from fontbakery.profiles.universal import com_google_fonts_check_ttx_roundtrip as check
+
+  good_font_path = TEST_FILE("mada/Mada-Regular.ttf")
+  status, _ = list(check(good_font_path))[-1]
+  assert status == PASS
+  # nothing is written next to the font
+  assert not os.path.exists(good_font_path + ".xml")
+
+  # fontTools warns about trailing data in the hmtx table
+  ttFont = TTFont(good_font_path)
+  hmtx = DefaultTable("hmtx")
+  hmtx.data = ttFont.reader["hmtx"] + b"\0\0\0\0"
+  ttFont["hmtx"] = hmtx
+  bad_font_path = str(tmp_path / "Mada-Regular.ttf")
+  ttFont.save(bad_font_path)
+  results = list(check(bad_font_path))
+  assert (FAIL, "too much 'hmtx' table data") in results
+  assert PASS not in [status for status, _ in results]
+
+
 def test_is_up_to_date(): 
   from fontbakery.profiles.universal import is_up_to_date 
   # is_up_to_date(installed, latest) 
@@ -589,14 +601,17 @@ def NOT_IMPLEMENTED_test_check_ftxvalidator():
 
 def test_check_ots():
   """ Checking with ots-sanitize. """
-  from fontbakery.profiles.universal import com_google_fonts_check_ots as check
+  from fontbakery.profiles.universal import (com_google_fonts_check_ots as check,
+                                             ots_sanitize_result)
 
   sanitary_font = TEST_FILE("cabin/Cabin-Regular.ttf")
-  status, _ = list(check(sanitary_font))[-1]
+  result = ots_sanitize_result(sanitary_font, [sanitary_font])
+  status, _ = list(check(result))[-1]
   assert status == PASS
 
   bogus_font = TEST_FILE("README.txt")
-  status, output = list(check(bogus_font))[-1]
+  result = ots_sanitize_result(bogus_font, [bogus_font])
+  status, output = list(check(result))[-1]
   assert status == FAIL
   assert "invalid version tag" in output
   assert "Failed to sanitize file!" in output
@@ -0,0 +1,48 @@
+from fontbakery.callable import check, condition
+from fontbakery.checkrunner import Section, CheckRunner, PASS
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.reporters.trace import TraceReporter
+from fontbakery.utils import TEST_FILE
+
+
+@condition
+def num_glyphs(ttFont):
+  return len(ttFont.getGlyphOrder())
+
+
+@check(id='com.example/check/num_glyphs')
+def check_num_glyphs(num_glyphs):
+  """Font has glyphs?"""
+  yield PASS, f'{num_glyphs} glyphs'
+
+
+def test_trace_reporter():
+  """ Checks and the conditions evaluated for them are trace spans. """
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({
+      'num_glyphs': num_glyphs
+    , 'check_num_glyphs': check_num_glyphs
+  })
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts}, timing=True)
+  reporter = TraceReporter(runner=runner)
+  reporter.run()
+  events = reporter.getdoc()['traceEvents']
+
+  spans = {event['name']: event for event in events
+                               if event['ph'] == 'X' and event['cat'] != 'load'}
+  assert set(spans) == {'com.example/check/num_glyphs', 'ttFont', 'num_glyphs'}
+  # the tables decompiled for the glyph order
+  assert {event['name'] for event in events if event.get('cat') == 'load'} \
+                                                        == {'maxp', 'post'}
+  check_span = spans['com.example/check/num_glyphs']
+  assert check_span['args']['iterargs'] == {'font[0]': fonts[0]}
+  # conditions are nested within the check span
+  for name in ('ttFont', 'num_glyphs'):
+    span = spans[name]
+    assert span['cat'] == 'condition'
+    assert span['pid'] == check_span['pid'] and span['tid'] == check_span['tid']
+    assert check_span['ts'] <= span['ts']
+    assert span['ts'] + span['dur'] <= check_span['ts'] + check_span['dur'] + 1
+  assert [event['args']['name'] for event in events if event['ph'] == 'M'] \
+                                                          == ['main process']
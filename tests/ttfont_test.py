@@ -0,0 +1,91 @@
+import shutil
+from io import BytesIO
+
+from fontbakery.callable import check
+from fontbakery.checkrunner import Section, CheckRunner, PASS
+from fontbakery.fonts_profile import profile_factory
+from fontTools.ttLib import TTFont
+
+from fontbakery.ttfont import (FontRegistry,
+                               LazyTTFont,
+                               get_font,
+                               get_registry)
+from fontbakery.utils import TEST_FILE
+
+
+def test_font_registry(tmp_path):
+  """ Fonts are parsed again only when the file changed. """
+  font = str(tmp_path / "Cabin-Regular.ttf")
+  shutil.copy(TEST_FILE("cabin/Cabin-Regular.ttf"), font)
+  registry = FontRegistry()
+  first = registry.get(font)
+  assert registry.get(font) is first
+  assert registry.parse_counts == {font: 1}
+
+  shutil.copy(TEST_FILE("cabin/Cabin-Bold.ttf"), font)
+  assert registry.get(font) is not first
+  assert registry.parse_counts == {font: 2}
+
+
+def test_mapped_font():
+  """ Mapped fonts use views of the file for the glyph data. """
+  path = TEST_FILE("mada/Mada-Regular.ttf")
+  mapped = LazyTTFont(path, mapped=True)
+  read = LazyTTFont(path)
+  glyph_name = mapped.getGlyphOrder()[5]
+  assert isinstance(mapped['glyf'].glyphs[glyph_name].data, memoryview)
+  assert mapped.reader.file.name == path
+  for name in mapped.getGlyphOrder():
+    assert mapped['glyf'][name].getCoordinates(mapped['glyf'])[0] \
+               == read['glyf'][name].getCoordinates(read['glyf'])[0]
+
+  registry = FontRegistry()
+  with open(path, 'rb') as f:
+    assert registry.get_buffer(path) == f.read()
+
+
+def test_get_font_is_runner_scoped():
+  """ Checks and conditions of a run share the parsed fonts. """
+  registries = []
+
+  @check(id='com.example/check/same_font')
+  def check_same_font(font, ttFont):
+    """The ttFont condition is the registered font?"""
+    registries.append(get_registry())
+    yield PASS, get_font(font) is ttFont
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_same_font': check_same_font})
+  fonts = [TEST_FILE("cabin/Cabin-Regular.ttf"),
+           TEST_FILE("cabin/Cabin-Bold.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts})
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results == [True, True]
+  first, second = registries
+  assert first is second
+  assert sorted(first.parse_counts.values()) == [1, 1]
+
+  # without a runner, each call parses the font
+  assert get_registry() is not first
+  assert get_font(fonts[0]) is not get_font(fonts[0])
+
+
+def test_save_registry_font():
+  """ The fonts of a run can be saved before their glyf table is
+  decompiled, e.g. by a check that generates an instance of the font.
+  """
+  @check(id='com.example/check/save_font')
+  def check_save_font(ttFont):
+    """The font can be saved?"""
+    saved = BytesIO()
+    ttFont.save(saved)
+    saved.seek(0)
+    yield PASS, len(TTFont(saved).getGlyphOrder())
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'check_save_font': check_save_font})
+  fonts = [TEST_FILE("mada/Mada-Regular.ttf"),
+           TEST_FILE("cabinvfbeta/Cabin-VF.ttf")]
+  runner = CheckRunner(profile, values={'fonts': fonts})
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results == [len(TTFont(font).getGlyphOrder()) for font in fonts]
@@ -0,0 +1,85 @@
+import sys
+import threading
+
+from fontbakery.callable import check, condition
+from fontbakery.checkrunner import Section, CheckRunner, PASS
+from fontbakery.fonts_profile import profile_factory
+from fontbakery.validators import (ValidatorBatch,
+                                   ValidatorStage,
+                                   get_validator_stage,
+                                   run_command)
+
+
+def test_run_command():
+  result = run_command([sys.executable, "-c", "print('hello')"])
+  assert result.returncode == 0
+  assert result.stdout.strip() == b"hello"
+
+  result = run_command(["fontbakery-no-such-validator"])
+  assert result.returncode is None
+
+
+def test_validator_stage_runs_items_concurrently():
+  """ All items are validated at the same time. """
+  items = ["a", "b", "c"]
+  barrier = threading.Barrier(len(items), timeout=10)
+
+  def validate(item):
+    # only passes if all items are validated at the same time
+    barrier.wait()
+    return item.upper()
+
+  stage = ValidatorStage(validate, items, max_workers=len(items))
+  assert [stage.result(item) for item in items] == ["A", "B", "C"]
+  # not an item of the stage
+  assert ValidatorStage(str.upper, []).result("d") == "D"
+
+
+def test_validator_batch():
+  """ The items are validated in one call. """
+  calls = []
+  def validate_all(items):
+    calls.append(items)
+    return {item: item.upper() for item in items}
+
+  batch = ValidatorBatch(validate_all, ["a", "b", "a"])
+  assert [batch.result(item) for item in "ab"] == ["A", "B"]
+  assert batch.result("c") == "C"
+  assert calls == [["a", "b"], ["c"]]
+
+
+def test_validator_stage_is_runner_scoped():
+  """ The validator runs once per font, for all checks of a run. """
+  validated = []
+  def validate(font):
+    validated.append(font)
+    return font.upper()
+
+  @condition
+  def validated_font(font, fonts):
+    return get_validator_stage('upper', validate, fonts).result(font)
+
+  @check(id='com.example/check/validated_one')
+  def check_one(font, validated_font):
+    """The validator result is there?"""
+    yield PASS, validated_font == font.upper()
+
+  @check(id='com.example/check/validated_two')
+  def check_two(font, validated_font):
+    """The validator result is there again?"""
+    yield PASS, validated_font == font.upper()
+
+  profile = profile_factory(default_section=Section('Testing'))
+  profile.auto_register({'validated_font': validated_font,
+                         'check_one': check_one,
+                         'check_two': check_two})
+  fonts = ["a.ttf", "b.ttf", "c.ttf"]
+  runner = CheckRunner(profile, values={'fonts': fonts})
+  results = [message for status, message, _ in runner.run() if status == PASS]
+  assert results == [True] * 6
+  assert sorted(validated) == fonts
+
+  # without a runner, only the requested item is validated
+  del validated[:]
+  assert get_validator_stage('upper', validate, fonts).result("b.ttf") == "B.TTF"
+  assert validated == ["b.ttf"]
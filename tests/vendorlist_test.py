@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+from fontbakery.vendorlist import (VENDOR_LIST_HTML_PATH,
+                                   get_registered_vendor_ids,
+                                   parse_vendor_list)
+
+
+def test_vendor_ids_are_up_to_date():
+  """ The shipped JSON file is the conversion of the cached vendor list. """
+  with open(VENDOR_LIST_HTML_PATH, encoding="utf-8") as f:
+    expected = parse_vendor_list(f.read())
+  assert get_registered_vendor_ids() == expected
+  assert get_registered_vendor_ids() is get_registered_vendor_ids()
+
+
+def test_vendor_ids_without_bs4():
+  """ Loading the vendor IDs doesn't import BeautifulSoup. """
+  code = ("import sys\n"
+          "from fontbakery.profiles.googlefonts import registered_vendor_ids\n"
+          "assert 'ADBE' in registered_vendor_ids()\n"
+          "assert 'bs4' not in sys.modules\n")
+  subprocess.run([sys.executable, "-c", code], check=True)